@@ -0,0 +1,48 @@
+"""add_daily_rollups
+
+Revision ID: a7b9c3d5e6f8
+Revises: f6a8b2c4d5e7
+Create Date: 2026-10-18 19:12:40.305118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a7b9c3d5e6f8'
+down_revision = 'f6a8b2c4d5e7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'daily_rollups',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('entry_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('mood_sum', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('focus_sum', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('focus_count', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'date', 'project_id')
+    )
+
+    # Backfill; scripts/rebuild_rollups.py can re-check or redo this per user
+    op.execute("""
+        INSERT INTO daily_rollups (user_id, date, project_id, entry_count, mood_sum, focus_sum, focus_count)
+        SELECT user_id,
+               date,
+               coalesce(project_id, 0),
+               count(id),
+               sum(mood),
+               coalesce(sum(focus_score), 0),
+               count(focus_score)
+        FROM entries
+        GROUP BY user_id, date, coalesce(project_id, 0)
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('daily_rollups')
@@ -0,0 +1,36 @@
+"""add_entry_search_vector
+
+Revision ID: b2c41d7e9a10
+Revises: f474e175bf8d
+Create Date: 2026-10-18 09:12:41.503118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b2c41d7e9a10'
+down_revision = 'f474e175bf8d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Full-text search is Postgres-only; other backends use the in-memory index in app/services/search.py
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("""
+        ALTER TABLE entries ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(body, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(looking_ahead, '')), 'C')
+        ) STORED
+    """)
+    op.create_index('ix_entries_search_vector', 'entries', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_entries_search_vector', table_name='entries')
+    op.drop_column('entries', 'search_vector')
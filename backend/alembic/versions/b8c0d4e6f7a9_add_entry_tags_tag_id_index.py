@@ -0,0 +1,23 @@
+"""add_entry_tags_tag_id_index
+
+Revision ID: b8c0d4e6f7a9
+Revises: a7b9c3d5e6f8
+Create Date: 2026-10-18 20:03:27.914552
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b8c0d4e6f7a9'
+down_revision = 'a7b9c3d5e6f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_entry_tags_tag_id_entry_id', 'entry_tags', ['tag_id', 'entry_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_entry_tags_tag_id_entry_id', table_name='entry_tags')
@@ -0,0 +1,32 @@
+"""add_user_summaries
+
+Revision ID: c3d5e8f1a2b4
+Revises: b2c41d7e9a10
+Create Date: 2026-10-18 11:03:27.418290
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c3d5e8f1a2b4'
+down_revision = 'b2c41d7e9a10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Rows are filled lazily on first read or on the user's next entry write
+    op.create_table(
+        'user_summaries',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('last_entry_date', sa.Date(), nullable=True),
+        sa.Column('streak_start', sa.Date(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_summaries')
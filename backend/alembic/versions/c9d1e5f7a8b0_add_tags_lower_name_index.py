@@ -0,0 +1,28 @@
+"""add_tags_lower_name_index
+
+Revision ID: c9d1e5f7a8b0
+Revises: b8c0d4e6f7a9
+Create Date: 2026-10-18 20:41:55.208163
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c9d1e5f7a8b0'
+down_revision = 'b8c0d4e6f7a9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # text_pattern_ops makes LIKE 'prefix%' indexable under any collation
+    if op.get_bind().dialect.name == "postgresql":
+        lower_name = sa.text('lower(name) text_pattern_ops')
+    else:
+        lower_name = sa.text('lower(name)')
+    op.create_index('ix_tags_user_id_lower_name', 'tags', ['user_id', lower_name], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tags_user_id_lower_name', table_name='tags')
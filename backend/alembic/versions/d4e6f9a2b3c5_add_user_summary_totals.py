@@ -0,0 +1,50 @@
+"""add_user_summary_totals
+
+Revision ID: d4e6f9a2b3c5
+Revises: c3d5e8f1a2b4
+Create Date: 2026-10-18 13:40:02.771954
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'd4e6f9a2b3c5'
+down_revision = 'c3d5e8f1a2b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    for column in ('total_entries', 'mood_sum', 'mood_count', 'focus_sum', 'focus_count'):
+        op.add_column('user_summaries', sa.Column(column, sa.Integer(), server_default='0', nullable=False))
+    op.add_column('user_summaries', sa.Column('first_entry_date', sa.Date(), nullable=True))
+
+    # Backfill rows that already exist; missing rows are built on first read
+    op.execute("""
+        UPDATE user_summaries SET
+            total_entries = totals.total_entries,
+            mood_sum = totals.mood_sum,
+            mood_count = totals.mood_count,
+            focus_sum = totals.focus_sum,
+            focus_count = totals.focus_count,
+            first_entry_date = totals.first_entry_date
+        FROM (
+            SELECT user_id,
+                   count(id) AS total_entries,
+                   coalesce(sum(mood), 0) AS mood_sum,
+                   count(mood) AS mood_count,
+                   coalesce(sum(focus_score), 0) AS focus_sum,
+                   count(focus_score) AS focus_count,
+                   min(date) AS first_entry_date
+            FROM entries
+            GROUP BY user_id
+        ) AS totals
+        WHERE totals.user_id = user_summaries.user_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('user_summaries', 'first_entry_date')
+    for column in ('focus_count', 'focus_sum', 'mood_count', 'mood_sum', 'total_entries'):
+        op.drop_column('user_summaries', column)
@@ -0,0 +1,25 @@
+"""add_entries_user_date_indexes
+
+Revision ID: e5f7a1b3c4d6
+Revises: d4e6f9a2b3c5
+Create Date: 2026-10-18 15:22:48.106533
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e5f7a1b3c4d6'
+down_revision = 'd4e6f9a2b3c5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_entries_user_id_date', 'entries', ['user_id', 'date'], unique=False)
+    op.create_index('ix_entries_user_id_project_id_date', 'entries', ['user_id', 'project_id', 'date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_entries_user_id_project_id_date', table_name='entries')
+    op.drop_index('ix_entries_user_id_date', table_name='entries')
@@ -0,0 +1,23 @@
+"""add_user_data_version
+
+Revision ID: f6a8b2c4d5e7
+Revises: e5f7a1b3c4d6
+Create Date: 2026-10-18 17:05:12.418230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f6a8b2c4d5e7'
+down_revision = 'e5f7a1b3c4d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('data_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'data_version')
@@ -1,57 +1,144 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal, Optional
 from datetime import date, datetime
 from calendar import monthrange
-from app.db.session import get_db
-from app.db.models.user import User
-from app.schemas.calendar import CalendarMonthResponse, CalendarDay
-from app.core.auth import get_current_user
-from app.services.calendar import get_calendar_month_data
+from app.db.session import get_async_db
+from app.schemas.calendar import CalendarMonthResponse, CalendarDay, CalendarRangeResponse
+from app.core.auth import get_current_principal, Principal
+from app.core.conditional import conditional_get
+from app.services.calendar import get_calendar_month_data, get_calendar_range_data
+from app.services.entries import parse_tags
+from app.services.insight_cache import insight_cache, months_between
+
+MAX_RANGE_DAYS = 366
 
 router = APIRouter()
 
 
-@router.get("/month", response_model=CalendarMonthResponse)
+@router.get("/month", response_model=CalendarMonthResponse, dependencies=[Depends(conditional_get)])
 async def get_calendar_month(
-    year: int = Query(...),
-    month: int = Query(...),
+    year: int = Query(..., ge=1, le=9999),
+    month: int = Query(..., ge=1, le=12),
     project_id: Optional[int] = Query(None),
     tag: Optional[str] = Query(None),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    tags: Optional[str] = Query(None, description="Comma-separated tag names, combined per tag_mode"),
+    tag_mode: Literal["all", "any"] = Query("all"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get calendar month view data."""
-    # Get aggregated data for days with entries
-    day_data = get_calendar_month_data(
-        db=db,
-        user_id=current_user.id,
-        year=year,
-        month=month,
-        project_id=project_id,
-        tag=tag
-    )
+    async def compute():
+        # Get aggregated data for days with entries
+        day_data = await db.run_sync(
+            get_calendar_month_data,
+            user_id=current_user.id,
+            year=year,
+            month=month,
+            project_id=project_id,
+            tag=tag,
+            tags=parse_tags(tags),
+            tag_mode=tag_mode
+        )
     
-    # Get number of days in the month
-    _, num_days = monthrange(year, month)
+        # Get number of days in the month
+        _, num_days = monthrange(year, month)
     
-    # Build response with all days in month
-    days = []
-    for day in range(1, num_days + 1):
-        current_date = date(year, month, day)
-        if current_date in day_data:
-            days.append(CalendarDay(
-                date=current_date,
-                entry_count=day_data[current_date]['entry_count'],
-                average_mood=day_data[current_date]['average_mood']
-            ))
-        else:
-            days.append(CalendarDay(
-                date=current_date,
-                entry_count=0,
-                average_mood=None
-            ))
+        # Build response with all days in month
+        days = []
+        for day in range(1, num_days + 1):
+            current_date = date(year, month, day)
+            if current_date in day_data:
+                days.append(CalendarDay(
+                    date=current_date,
+                    entry_count=day_data[current_date]['entry_count'],
+                    average_mood=day_data[current_date]['average_mood']
+                ))
+            else:
+                days.append(CalendarDay(
+                    date=current_date,
+                    entry_count=0,
+                    average_mood=None
+                ))
     
-    return CalendarMonthResponse(year=year, month=month, days=days)
+        return CalendarMonthResponse(year=year, month=month, days=days)
+    
+    start = date(year, month, 1)
+    return await insight_cache.get_or_compute(
+        current_user.id,
+        "calendar-month",
+        (year, month, project_id, tag, parse_tags(tags), tag_mode),
+        months_between(start, start),
+        compute
+    )
 
 
+@router.get("/range", response_model=CalendarRangeResponse, dependencies=[Depends(conditional_get)])
+async def get_calendar_range(
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    project_id: Optional[int] = Query(None),
+    tag: Optional[str] = Query(None),
+    tags: Optional[str] = Query(None, description="Comma-separated tag names, combined per tag_mode"),
+    tag_mode: Literal["all", "any"] = Query("all"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get per-day counts and mood for up to a year (inclusive range), e.g. for a heatmap."""
+    if date_to < date_from:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'to' must not be before 'from'"
+        )
+    if (date_to - date_from).days + 1 > MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range cannot exceed {MAX_RANGE_DAYS} days"
+        )
+    
+    return await insight_cache.get_or_compute(
+        current_user.id,
+        "calendar-range",
+        (date_from, date_to, project_id, tag, parse_tags(tags), tag_mode),
+        months_between(date_from, date_to),
+        lambda: db.run_sync(
+            get_calendar_range_data,
+            user_id=current_user.id,
+            start=date_from,
+            end=date_to,
+            project_id=project_id,
+            tag=tag,
+            tags=parse_tags(tags),
+            tag_mode=tag_mode
+        )
+    )
+
+
+@router.get("/year", response_model=CalendarRangeResponse, dependencies=[Depends(conditional_get)])
+async def get_calendar_year(
+    year: int = Query(..., ge=1, le=9999),
+    project_id: Optional[int] = Query(None),
+    tag: Optional[str] = Query(None),
+    tags: Optional[str] = Query(None, description="Comma-separated tag names, combined per tag_mode"),
+    tag_mode: Literal["all", "any"] = Query("all"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get per-day counts and mood for a whole calendar year."""
+    start, end = date(year, 1, 1), date(year, 12, 31)
+    return await insight_cache.get_or_compute(
+        current_user.id,
+        "calendar-range",
+        (start, end, project_id, tag, parse_tags(tags), tag_mode),
+        months_between(start, end),
+        lambda: db.run_sync(
+            get_calendar_range_data,
+            user_id=current_user.id,
+            start=start,
+            end=end,
+            project_id=project_id,
+            tag=tag,
+            tags=parse_tags(tags),
+            tag_mode=tag_mode
+        )
+    )
@@ -1,53 +1,183 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, UploadFile, File
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from typing import Optional, List, Literal, Tuple
 from datetime import date
-from app.db.session import get_db
-from app.db.models.user import User
+import io
+from app.db.session import SessionLocal, get_db, get_async_db
 from app.db.models.entry import Entry
-from app.db.models.tag import Tag
 from app.db.models.entry_tag import entry_tags
-from app.schemas.entry import EntryCreate, EntryUpdate, EntryResponse
-from app.core.auth import get_current_user
-from app.services.entries import filter_entries
+from app.db.models.project import Project
+from app.schemas.entry import EntryCreate, EntryUpdate, EntryResponse, ImportReport, sparse_entry_model
+from app.core.auth import get_current_principal, Principal
+from app.core.conditional import conditional_get
+from app.core.serialization import json_list_response
+from app.services.entries import (
+    filter_entries,
+    get_entries_page,
+    stream_entries,
+    get_user_entry,
+    decode_cursor,
+    parse_fields,
+    parse_tags,
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE
+)
+from app.services.tags import add_entry_tags, set_entry_tags
+from app.services.insights import record_entry_changes, entry_stats
+from app.services.versions import bump_data_version
+from app.services.insight_cache import insight_cache
+from app.services.transfer import import_entries, is_utf8, parse_csv, parse_jsonl, export_csv, export_jsonl
 
 router = APIRouter()
 
 
-@router.get("", response_model=List[EntryResponse])
+@router.get("", response_model=List[EntryResponse], dependencies=[Depends(conditional_get)])
 async def get_entries(
+    response: Response,
     project_id: Optional[int] = Query(None),
     tag: Optional[str] = Query(None),
+    tags: Optional[str] = Query(None, description="Comma-separated tag names, combined per tag_mode"),
+    tag_mode: Literal["all", "any"] = Query("all"),
     search: Optional[str] = Query(None),
     date_from: Optional[date] = Query(None),
     date_to: Optional[date] = Query(None),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    stream: bool = Query(False),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,date,title,mood,excerpt"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get entries with optional filters."""
-    entries = filter_entries(
-        db=db,
-        user_id=current_user.id,
+    """Get entries with optional filters.
+
+    Passing `limit` or `cursor` switches to keyset pagination: the cursor for the
+    next page is returned in the `X-Next-Cursor` header. Passing `stream=true`
+    returns the full result as NDJSON, one entry per line, starting after
+    `cursor` if one is given; it cannot be combined with `limit`. Passing `fields`
+    returns (and loads) only those fields; `excerpt` is a short preview of the body.
+    """
+    fieldset = None
+    if fields is not None:
+        try:
+            fieldset = parse_fields(fields)
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(exc)
+            )
+    model = sparse_entry_model(fieldset) if fieldset else EntryResponse
+
+    filters = dict(
         project_id=project_id,
         tag=tag,
+        tags=parse_tags(tags),
+        tag_mode=tag_mode,
         search=search,
         date_from=date_from,
-        date_to=date_to
+        date_to=date_to,
+        fields=fieldset
+    )
+
+    if cursor is not None:
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+
+    if stream and limit is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'limit' cannot be combined with 'stream'"
+        )
+
+    if stream:
+        # The response outlives this handler, so it gets its own sync session
+        # and is iterated in the threadpool
+        def generate():
+            with SessionLocal() as stream_db:
+                for entry in stream_entries(stream_db, current_user.id, cursor=cursor, **filters):
+                    yield model.model_validate(entry).model_dump_json() + "\n"
+
+        return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+    if limit is None and cursor is None:
+        entries = await db.run_sync(filter_entries, user_id=current_user.id, **filters)
+        return json_list_response(model, entries, response)
+
+    entries, next_cursor = await db.run_sync(
+        get_entries_page,
+        current_user.id,
+        limit=limit or DEFAULT_PAGE_SIZE,
+        cursor=cursor,
+        **filters
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return json_list_response(model, entries, response)
+
+
+@router.post("/import", response_model=ImportReport)
+async def import_entries_file(
+    file: UploadFile = File(...),
+    format: Optional[Literal["jsonl", "csv"]] = Query(None),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Bulk import entries from a JSON-lines or CSV upload.
+
+    The format is taken from `format`, else from the file name (.csv means CSV,
+    anything else JSON lines). Valid rows are imported; invalid ones are reported
+    by line number.
+    """
+    if format is None:
+        format = "csv" if (file.filename or "").lower().endswith(".csv") else "jsonl"
+
+    if not await run_in_threadpool(is_utf8, file.file):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be UTF-8 encoded"
+        )
+
+    # utf-8-sig drops the byte-order mark Excel puts in front of CSV exports
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    rows = parse_csv(stream) if format == "csv" else parse_jsonl(stream)
+    return await run_in_threadpool(import_entries, db, current_user.id, rows)
+
+
+@router.get("/export")
+async def export_entries(
+    format: Literal["jsonl", "csv"] = Query("jsonl"),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Stream all of the user's entries as JSON lines or CSV."""
+    if format == "csv":
+        body, media_type = export_csv(db, current_user.id), "text/csv"
+    else:
+        body, media_type = export_jsonl(db, current_user.id), "application/x-ndjson"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="entries.{format}"'}
     )
-    return entries
 
 
-@router.get("/{entry_id}", response_model=EntryResponse)
+@router.get("/{entry_id}", response_model=EntryResponse, dependencies=[Depends(conditional_get)])
 async def get_entry(
     entry_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific entry by ID."""
-    entry = db.query(Entry).filter(
-        Entry.id == entry_id,
-        Entry.user_id == current_user.id
-    ).first()
+    entry = await db.run_sync(get_user_entry, current_user.id, entry_id)
     
     if not entry:
         raise HTTPException(
@@ -58,29 +188,43 @@ async def get_entry(
     return entry
 
 
-@router.post("", response_model=EntryResponse, status_code=status.HTTP_201_CREATED)
-async def create_entry(
-    entry_data: EntryCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Create a new entry."""
+def _require_project(db: Session, user_id: int, project_id: int) -> None:
+    project = db.query(Project.id).filter(
+        Project.id == project_id,
+        Project.user_id == user_id
+    ).first()
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+
+def _require_entry(db: Session, user_id: int, entry_id: int) -> Entry:
+    """The user's entry, locked for the rest of the write transaction."""
+    entry = db.query(Entry).filter(
+        Entry.id == entry_id,
+        Entry.user_id == user_id
+    ).with_for_update().first()
+    if not entry:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Entry not found"
+        )
+    return entry
+
+
+def _create_entry(db: Session, user_id: int, entry_data: EntryCreate) -> Entry:
+    # First, so the streak computed below sees every other committed write
+    bump_data_version(db, user_id)
+    
     # Verify project belongs to user if provided
     if entry_data.project_id:
-        from app.db.models.project import Project
-        project = db.query(Project).filter(
-            Project.id == entry_data.project_id,
-            Project.user_id == current_user.id
-        ).first()
-        if not project:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Project not found"
-            )
+        _require_project(db, user_id, entry_data.project_id)
     
     # Create entry
     new_entry = Entry(
-        user_id=current_user.id,
+        user_id=user_id,
         project_id=entry_data.project_id,
         date=entry_data.date,
         title=entry_data.title,
@@ -94,46 +238,19 @@ async def create_entry(
     
     # Handle tags
     if entry_data.tags:
-        for tag_name in entry_data.tags:
-            # Get or create tag
-            tag = db.query(Tag).filter(
-                Tag.user_id == current_user.id,
-                Tag.name == tag_name
-            ).first()
-            
-            if not tag:
-                tag = Tag(user_id=current_user.id, name=tag_name)
-                db.add(tag)
-                db.flush()
-            
-            # Associate tag with entry
-            db.execute(
-                entry_tags.insert().values(entry_id=new_entry.id, tag_id=tag.id)
-            )
+        add_entry_tags(db, user_id, {new_entry.id: entry_data.tags})
     
+    record_entry_changes(db, user_id, added=[entry_stats(new_entry)])
     db.commit()
-    db.refresh(new_entry)
-    return new_entry
+    return get_user_entry(db, user_id, new_entry.id)
 
 
-@router.put("/{entry_id}", response_model=EntryResponse)
-async def update_entry(
-    entry_id: int,
-    entry_data: EntryUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Update an existing entry."""
-    entry = db.query(Entry).filter(
-        Entry.id == entry_id,
-        Entry.user_id == current_user.id
-    ).first()
-    
-    if not entry:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Entry not found"
-        )
+def _update_entry(db: Session, user_id: int, entry_id: int, entry_data: EntryUpdate) -> Tuple[Entry, date]:
+    """Update an entry. Returns it and the date it had before the update."""
+    # Serializes the user's writes, so `before` can't be read while another update is in flight
+    bump_data_version(db, user_id)
+    entry = _require_entry(db, user_id, entry_id)
+    before = entry_stats(entry)
     
     # Update fields
     if entry_data.date is not None:
@@ -154,71 +271,69 @@ async def update_entry(
         if entry_data.project_id == 0:  # Allow clearing project
             entry.project_id = None
         else:
-            from app.db.models.project import Project
-            project = db.query(Project).filter(
-                Project.id == entry_data.project_id,
-                Project.user_id == current_user.id
-            ).first()
-            if not project:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Project not found"
-                )
+            _require_project(db, user_id, entry_data.project_id)
             entry.project_id = entry_data.project_id
     
     # Update tags if provided
     if entry_data.tags is not None:
-        # Remove all existing tags
-        db.execute(
-            entry_tags.delete().where(entry_tags.c.entry_id == entry.id)
-        )
-        
-        # Add new tags
-        for tag_name in entry_data.tags:
-            tag = db.query(Tag).filter(
-                Tag.user_id == current_user.id,
-                Tag.name == tag_name
-            ).first()
-            
-            if not tag:
-                tag = Tag(user_id=current_user.id, name=tag_name)
-                db.add(tag)
-                db.flush()
-            
-            db.execute(
-                entry_tags.insert().values(entry_id=entry.id, tag_id=tag.id)
-            )
+        set_entry_tags(db, user_id, entry.id, entry_data.tags)
     
+    record_entry_changes(db, user_id, removed=[before], added=[entry_stats(entry)])
     db.commit()
-    db.refresh(entry)
-    return entry
+    return get_user_entry(db, user_id, entry.id), before.date
 
 
-@router.delete("/{entry_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_entry(
-    entry_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Delete an entry."""
-    entry = db.query(Entry).filter(
-        Entry.id == entry_id,
-        Entry.user_id == current_user.id
-    ).first()
-    
-    if not entry:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Entry not found"
-        )
+def _delete_entry(db: Session, user_id: int, entry_id: int) -> date:
+    """Delete an entry. Returns its date."""
+    bump_data_version(db, user_id)
+    entry = _require_entry(db, user_id, entry_id)
     
     # Delete associated tags
     db.execute(
         entry_tags.delete().where(entry_tags.c.entry_id == entry.id)
     )
     
-    db.delete(entry)
+    before = entry_stats(entry)
+    deleted = db.execute(delete(Entry).where(Entry.id == entry.id, Entry.user_id == user_id)).rowcount
+    # Only the request that actually removed the row takes it out of the totals
+    if deleted == 1:
+        record_entry_changes(db, user_id, removed=[before])
     db.commit()
-    return None
+    return before.date
 
 
+@router.post("", response_model=EntryResponse, status_code=status.HTTP_201_CREATED)
+async def create_entry(
+    entry_data: EntryCreate,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create a new entry."""
+    entry = await db.run_sync(_create_entry, current_user.id, entry_data)
+    await insight_cache.invalidate_entry_dates(current_user.id, [entry.date])
+    return entry
+
+
+@router.put("/{entry_id}", response_model=EntryResponse)
+async def update_entry(
+    entry_id: int,
+    entry_data: EntryUpdate,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Update an existing entry."""
+    entry, previous_date = await db.run_sync(_update_entry, current_user.id, entry_id, entry_data)
+    await insight_cache.invalidate_entry_dates(current_user.id, [previous_date, entry.date])
+    return entry
+
+
+@router.delete("/{entry_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_entry(
+    entry_id: int,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Delete an entry."""
+    entry_date = await db.run_sync(_delete_entry, current_user.id, entry_id)
+    await insight_cache.invalidate_entry_dates(current_user.id, [entry_date])
+    return None
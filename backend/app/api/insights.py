@@ -1,30 +1,108 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from typing import List, Dict
-from app.db.session import get_db
-from app.db.models.user import User
-from app.core.auth import get_current_user
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Literal, Optional
+from datetime import date, timedelta
+from app.db.session import get_async_db
+from app.core.auth import get_current_principal, Principal
+from app.core.conditional import conditional_get
 from app.services.insights import get_summary, get_mood_trend
+from app.services.trends import get_trend, trend_window
+from app.services.insight_cache import insight_cache, months_between, ALL_ENTRIES
+
+# Longest range a trend can cover; longer day-bucket series are downsampled anyway
+MAX_TREND_DAYS = 20 * 366
 
 router = APIRouter()
 
 
-@router.get("/summary")
+@router.get("/summary", dependencies=[Depends(conditional_get)])
 async def get_insights_summary(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get summary insights (streak, entry count, average mood)."""
-    return get_summary(db, current_user.id)
+    return await insight_cache.get_or_compute(
+        current_user.id,
+        "summary",
+        (date.today(),),
+        [ALL_ENTRIES],
+        lambda: db.run_sync(get_summary, current_user.id)
+    )
 
 
-@router.get("/mood-trend")
+@router.get("/mood-trend", dependencies=[Depends(conditional_get)])
 async def get_mood_trend_data(
     days: int = Query(30, ge=1, le=365),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get mood trend data for the last N days."""
-    return get_mood_trend(db, current_user.id, days)
+    today = date.today()
+    # Same window as get_mood_trend: the last N days through tomorrow
+    return await insight_cache.get_or_compute(
+        current_user.id,
+        "mood-trend",
+        (days, today),
+        months_between(today - timedelta(days=days), today + timedelta(days=1)),
+        lambda: db.run_sync(get_mood_trend, current_user.id, days)
+    )
+
+
+@router.get("/trends", dependencies=[Depends(conditional_get)])
+async def get_trends(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    # The default range runs `days` days back from tomorrow, so it spans days + 1 days
+    days: int = Query(90, ge=1, le=MAX_TREND_DAYS - 1, description="Days back from 'to' when 'from' is not given"),
+    bucket: Literal["day", "week", "month"] = Query("day"),
+    window: int = Query(1, ge=1, le=366, description="Buckets per rolling average"),
+    metric: Literal["mood", "focus"] = Query("mood", description="Series shape kept when downsampling"),
+    max_points: int = Query(365, ge=10, le=5000),
+    group_by: Optional[Literal["project", "tag"]] = Query(None),
+    limit: int = Query(10, ge=1, le=50, description="Most active projects or tags to return series for"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Gap-filled mood and focus trend with rolling averages, optionally per project or tag.
 
+    The range defaults to the last `days` days through tomorrow (like mood-trend)
+    and is widened to whole buckets.
+    """
+    date_to = date_to or date.today() + timedelta(days=1)
+    date_from = date_from or date_to - timedelta(days=min(days, (date_to - date.min).days))
+    if date_to < date_from:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'to' must not be before 'from'"
+        )
+    if (date_to - date_from).days + 1 > MAX_TREND_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range cannot exceed {MAX_TREND_DAYS} days"
+        )
 
+    try:
+        first, last = trend_window(date_from, date_to, bucket, window)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+    return await insight_cache.get_or_compute(
+        current_user.id,
+        "trends",
+        (date_from, date_to, bucket, window, metric, max_points, group_by, limit),
+        months_between(first, last),
+        lambda: db.run_sync(
+            get_trend,
+            user_id=current_user.id,
+            start=date_from,
+            end=date_to,
+            bucket=bucket,
+            window=window,
+            metric=metric,
+            max_points=max_points,
+            group_by=group_by,
+            limit=limit
+        )
+    )
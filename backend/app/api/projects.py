@@ -1,32 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.db.session import get_db
-from app.db.models.user import User
+from datetime import date
+from app.db.session import get_async_db
 from app.db.models.project import Project
-from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectResponse
-from app.core.auth import get_current_user
+from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectResponse, ProjectActivityResponse
+from app.core.auth import get_current_principal, Principal
+from app.core.conditional import conditional_get
+from app.core.serialization import json_list_response
+from app.services.rollups import move_project_rollups
+from app.services.versions import bump_data_version
+from app.services.insight_cache import insight_cache, ALL_ENTRIES, PROJECTS
+from app.services.projects import get_project_activity
 
 router = APIRouter()
 
 
-@router.get("", response_model=List[ProjectResponse])
+@router.get("", response_model=List[ProjectResponse], dependencies=[Depends(conditional_get)])
 async def get_projects(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all projects for the current user."""
-    projects = db.query(Project).filter(
-        Project.user_id == current_user.id
-    ).order_by(Project.created_at.desc()).all()
-    return projects
+    projects = await db.scalars(
+        select(Project).where(
+            Project.user_id == current_user.id
+        ).order_by(Project.created_at.desc())
+    )
+    return json_list_response(ProjectResponse, projects.all(), response)
+
+
+@router.get("/activity", response_model=List[ProjectActivityResponse], dependencies=[Depends(conditional_get)])
+async def get_projects_activity(
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get all projects with entry count, last entry date, average mood and a 12-week sparkline."""
+    today = date.today()
+    return await insight_cache.get_or_compute(
+        current_user.id,
+        "project-activity",
+        (today,),
+        [PROJECTS, ALL_ENTRIES],
+        lambda: db.run_sync(get_project_activity, current_user.id, today)
+    )
 
 
 @router.post("", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
 async def create_project(
     project_data: ProjectCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new project."""
     new_project = Project(
@@ -35,8 +61,10 @@ async def create_project(
         description=project_data.description
     )
     db.add(new_project)
-    db.commit()
-    db.refresh(new_project)
+    await db.run_sync(bump_data_version, current_user.id)
+    await db.commit()
+    await insight_cache.invalidate(current_user.id, [PROJECTS])
+    await db.refresh(new_project)
     return new_project
 
 
@@ -44,14 +72,16 @@ async def create_project(
 async def update_project(
     project_id: int,
     project_data: ProjectUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update an existing project."""
-    project = db.query(Project).filter(
-        Project.id == project_id,
-        Project.user_id == current_user.id
-    ).first()
+    project = await db.scalar(
+        select(Project).where(
+            Project.id == project_id,
+            Project.user_id == current_user.id
+        )
+    )
     
     if not project:
         raise HTTPException(
@@ -64,22 +94,27 @@ async def update_project(
     if project_data.description is not None:
         project.description = project_data.description
     
-    db.commit()
-    db.refresh(project)
+    await db.run_sync(bump_data_version, current_user.id)
+    await db.commit()
+    # Per-project trend series carry the name
+    await insight_cache.invalidate_user(current_user.id)
+    await db.refresh(project)
     return project
 
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_project(
     project_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a project."""
-    project = db.query(Project).filter(
-        Project.id == project_id,
-        Project.user_id == current_user.id
-    ).first()
+    project = await db.scalar(
+        select(Project).where(
+            Project.id == project_id,
+            Project.user_id == current_user.id
+        )
+    )
     
     if not project:
         raise HTTPException(
@@ -87,7 +122,13 @@ async def delete_project(
             detail="Project not found"
         )
     
-    db.delete(project)
-    db.commit()
+    # Taken before reading the rollups to move, so no entry write lands in between
+    await db.run_sync(bump_data_version, current_user.id)
+    await db.delete(project)
+    # Its entries are detached, not deleted
+    await db.run_sync(move_project_rollups, current_user.id, project_id)
+    await db.commit()
+    # Cached project-filtered calendars, per-project trends and activity still count this project
+    await insight_cache.invalidate_user(current_user.id)
     return None
 
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from app.db.session import get_async_db
+from app.schemas.search import SearchResult
+from app.core.auth import get_current_principal, Principal
+from app.core.conditional import conditional_get
+from app.services.search import search_entries, DEFAULT_SEARCH_LIMIT
+
+router = APIRouter()
+
+
+@router.get("", response_model=List[SearchResult], dependencies=[Depends(conditional_get)])
+async def search(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=100),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Full-text search over entry titles, bodies and looking-ahead notes, best match first."""
+    results = await db.run_sync(search_entries, current_user.id, q, limit=limit)
+    return [
+        SearchResult(entry=entry, rank=rank, snippet=snippet)
+        for entry, rank, snippet in results
+    ]
@@ -1,39 +1,94 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.db.session import get_db
-from app.db.models.user import User
+from app.db.session import get_async_db
 from app.db.models.tag import Tag
-from app.schemas.tag import TagCreate, TagResponse
-from app.core.auth import get_current_user
+from app.schemas.tag import TagCreate, TagResponse, TagStatsResponse
+from app.core.auth import get_current_principal, Principal
+from app.core.conditional import conditional_get
+from app.core.serialization import json_list_response
+from app.services.versions import bump_data_version
+from app.services.insight_cache import insight_cache, ALL_ENTRIES, TAGS
+from app.services.tags import get_tag_stats, tag_index_cache, TagIndex
+
+# Tag usage changes with entry writes and with the tag list
+TAG_STATS_DEPENDENCIES = [TAGS, ALL_ENTRIES]
 
 router = APIRouter()
 
 
-@router.get("", response_model=List[TagResponse])
+@router.get("", response_model=List[TagResponse], dependencies=[Depends(conditional_get)])
 async def get_tags(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all tags for the current user."""
-    tags = db.query(Tag).filter(
-        Tag.user_id == current_user.id
-    ).order_by(Tag.name).all()
-    return tags
+    tags = await db.scalars(
+        select(Tag).where(
+            Tag.user_id == current_user.id
+        ).order_by(Tag.name)
+    )
+    return json_list_response(TagResponse, tags.all(), response)
+
+
+async def _tag_stats(user_id: int, db: AsyncSession):
+    return await insight_cache.get_or_compute(
+        user_id,
+        "tag-stats",
+        (),
+        TAG_STATS_DEPENDENCIES,
+        lambda: db.run_sync(get_tag_stats, user_id)
+    )
+
+
+@router.get("/stats", response_model=List[TagStatsResponse], dependencies=[Depends(conditional_get)])
+async def get_tags_stats(
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get all tags with usage count and last-used date, most used first."""
+    return await _tag_stats(current_user.id, db)
+
+
+@router.get("/autocomplete", response_model=List[TagStatsResponse])
+async def autocomplete_tags(
+    q: str = Query("", max_length=100, description="Prefix to match, ignoring case"),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the most used tags starting with `q`.
+
+    Answered from an in-memory sorted array of the user's tags, rebuilt after
+    tag or entry writes; with that cache disabled, from an indexed prefix query.
+    """
+    if not tag_index_cache.enabled:
+        return await db.run_sync(get_tag_stats, current_user.id, prefix=q, limit=limit)
+
+    key = await insight_cache.key(current_user.id, "tag-index", (), TAG_STATS_DEPENDENCIES)
+    index = tag_index_cache.get(key)
+    if index is None:
+        index = TagIndex(await _tag_stats(current_user.id, db))
+        tag_index_cache.set(key, index)
+    return index.complete(q, limit)
 
 
 @router.post("", response_model=TagResponse, status_code=status.HTTP_201_CREATED)
 async def create_tag(
     tag_data: TagCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new tag."""
     # Check if tag already exists for this user
-    existing_tag = db.query(Tag).filter(
-        Tag.user_id == current_user.id,
-        Tag.name == tag_data.name
-    ).first()
+    existing_tag = await db.scalar(
+        select(Tag).where(
+            Tag.user_id == current_user.id,
+            Tag.name == tag_data.name
+        )
+    )
     
     if existing_tag:
         raise HTTPException(
@@ -46,22 +101,26 @@ async def create_tag(
         name=tag_data.name
     )
     db.add(new_tag)
-    db.commit()
-    db.refresh(new_tag)
+    await db.run_sync(bump_data_version, current_user.id)
+    await db.commit()
+    await insight_cache.invalidate(current_user.id, [TAGS])
+    await db.refresh(new_tag)
     return new_tag
 
 
 @router.delete("/{tag_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_tag(
     tag_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a tag."""
-    tag = db.query(Tag).filter(
-        Tag.id == tag_id,
-        Tag.user_id == current_user.id
-    ).first()
+    tag = await db.scalar(
+        select(Tag).where(
+            Tag.id == tag_id,
+            Tag.user_id == current_user.id
+        )
+    )
     
     if not tag:
         raise HTTPException(
@@ -69,8 +128,11 @@ async def delete_tag(
             detail="Tag not found"
         )
     
-    db.delete(tag)
-    db.commit()
+    await db.delete(tag)
+    await db.run_sync(bump_data_version, current_user.id)
+    await db.commit()
+    # Cached tag-filtered calendars, per-tag trends and tag stats still count this tag
+    await insight_cache.invalidate_user(current_user.id)
     return None
 
 
@@ -1,42 +1,112 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from dataclasses import dataclass
 from typing import Optional
-from app.db.session import get_db
+import hashlib
+from app.db.session import get_async_db
 from app.db.models.user import User
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.profiling import phase
 from app.core.security import get_user_id_from_token
 
 security = HTTPBearer(auto_error=False)
 
 
-async def get_current_user(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user from JWT token."""
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as far as most endpoints care: just who they are."""
+    id: int
+    email: str
+
+
+# Verified principals keyed by (user_id, token digest). Per process, so the TTL
+# bounds how long another worker may keep serving a deleted user.
+principal_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_SIZE,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def invalidate_user(user_id: int) -> None:
+    """Forget cached principals for a user (password change, deletion)."""
+    principal_cache.discard_where(lambda key: key[0] == user_id)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_on_password_change(mapper, connection, target):
+    if inspect(target).attrs.password_hash.history.has_changes():
+        invalidate_user(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_on_delete(mapper, connection, target):
+    invalidate_user(target.id)
+
+
+def _user_id_from_credentials(credentials: Optional[HTTPAuthorizationCredentials]) -> int:
     if credentials is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    token = credentials.credentials
-    user_id = get_user_id_from_token(token, token_type="access")
-    
+
+    user_id = get_user_id_from_token(credentials.credentials, token_type="access")
+
     if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    user = db.query(User).filter(User.id == user_id).first()
+
+    return user_id
+
+
+async def _load_user(db: AsyncSession, user_id: int) -> User:
+    user = await db.get(User, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
     return user
+
+
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Get the current authenticated user from JWT token."""
+    with phase("auth"):
+        user_id = _user_id_from_credentials(credentials)
+        return await _load_user(db, user_id)
+
+
+async def get_current_principal(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """Get the current authenticated principal, skipping the users lookup on cache hits.
+
+    Use this instead of get_current_user when the endpoint only needs the user's id.
+    """
+    with phase("auth"):
+        user_id = _user_id_from_credentials(credentials)
+        key = (user_id, token_digest(credentials.credentials))
+
+        principal = principal_cache.get(key)
+        if principal is None:
+            user = await _load_user(db, user_id)
+            principal = Principal(id=user.id, email=user.email)
+            principal_cache.set(key, principal)
+
+    return principal
@@ -0,0 +1,178 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, List, Optional
+import json
+import time
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache whose entries also expire after a TTL.
+
+    A ttl of 0 (or a maxsize of 0) disables caching: every get is a miss.
+    Hit, miss and eviction counters are available through stats().
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                value, expires_at = item
+                if expires_at > self._clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value; `ttl` may shorten (never extend) the cache-wide TTL for this entry."""
+        if not self.enabled:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, self._clock() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def discard_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every key matching the predicate. Linear in cache size; meant for rare invalidations."""
+        with self._lock:
+            doomed = [key for key in self._data if predicate(key)]
+            for key in doomed:
+                del self._data[key]
+            return len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class MemoryCacheBackend:
+    """Per-process cache backend: values and counters in bounded TTL caches.
+
+    Counters that are missing (never set, expired or evicted) come back as a
+    fresh, never-before-used value, so losing one can only cause misses, never
+    resurrect stale entries keyed on an old value.
+    """
+
+    def __init__(self, maxsize: int, counter_ttl: float):
+        self.values = TTLCache(maxsize=maxsize, ttl=float("inf"))
+        self.counters = TTLCache(maxsize=maxsize, ttl=counter_ttl)
+        self._counter_lock = Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.values.get(key)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self.values.set(key, value, ttl=ttl)
+
+    def get_counters(self, keys: List[str]) -> List[int]:
+        result = []
+        with self._counter_lock:
+            for key in keys:
+                value = self.counters.get(key)
+                if value is None:
+                    value = time.time_ns()
+                    self.counters.set(key, value)
+                result.append(value)
+        return result
+
+    def incr(self, key: str) -> None:
+        with self._counter_lock:
+            value = self.counters.get(key)
+            self.counters.set(key, value + 1 if value is not None else time.time_ns())
+
+    def clear(self) -> None:
+        self.values.clear()
+        self.counters.clear()
+
+
+class RedisCacheBackend:
+    """Cache backend over any client speaking the redis-py API (get/set/mget/pipeline).
+
+    Values are stored as JSON, so cached data must be JSON-compatible. Counters
+    follow the same never-reuse rule as MemoryCacheBackend. The client is
+    synchronous; `blocking` tells InsightCache to call it from a worker thread
+    so network round trips never stall the event loop.
+    """
+
+    blocking = True
+
+    def __init__(self, client, counter_ttl: float, prefix: str = "devdiary:"):
+        self.client = client
+        self.counter_ttl = int(counter_ttl)
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, counter_ttl: float) -> "RedisCacheBackend":
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("The redis cache backend needs the 'redis' package installed") from exc
+        return cls(redis.Redis.from_url(url), counter_ttl)
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self.client.set(self.prefix + key, json.dumps(value), ex=max(1, int(ttl)))
+
+    def get_counters(self, keys: List[str]) -> List[int]:
+        names = [self.prefix + key for key in keys]
+        values = self.client.mget(names)
+        missing = [name for name, value in zip(names, values) if value is None]
+        if missing:
+            pipe = self.client.pipeline()
+            for name in missing:
+                pipe.set(name, time.time_ns(), ex=self.counter_ttl, nx=True)
+            pipe.execute()
+            values = self.client.mget(names)
+        return [int(value) for value in values]
+
+    def incr(self, key: str) -> None:
+        name = self.prefix + key
+        pipe = self.client.pipeline()
+        pipe.set(name, time.time_ns(), ex=self.counter_ttl, nx=True)
+        pipe.incr(name)
+        pipe.execute()
+
+    def clear(self) -> None:
+        names = list(self.client.scan_iter(match=self.prefix + "*"))
+        if names:
+            self.client.delete(*names)
@@ -0,0 +1,180 @@
+from typing import Dict, List, Optional, Tuple
+import zlib
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """Encodings this server can produce, most preferred first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str, available: Tuple[str, ...]) -> Optional[str]:
+    """Pick the client's highest-q encoding we support; ties go to our preference order."""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name:
+            weights[name.lower()] = q
+
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+            self._zlib = None
+        else:
+            # wbits 16+: gzip container
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        """Compress a chunk. Non-final chunks are flushed so streamed lines arrive promptly."""
+        if self._zlib is not None:
+            out = self._zlib.compress(data)
+            return out + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+        out = self._brotli.process(data)
+        return out + (self._brotli.finish() if final else self._brotli.flush())
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing JSON, NDJSON and text responses with brotli or gzip.
+
+    Bodies under `minimum_size` bytes go out as-is. Streamed responses are
+    compressed chunk by chunk. When the client accepts an encoding, ETags of
+    compressible responses (and of 304s) are made weak: the bytes differ from
+    the identity encoding's, and a 304 can't know whether the body would have
+    been compressed. If-None-Match compares weakly, so revalidation still works.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = b",".join(value for name, value in scope["headers"] if name == b"accept-encoding")
+        encoding = choose_encoding(accept.decode("latin-1"), available_encodings())
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                headers = _Headers(start_message.get("headers", []))
+                status = start_message["status"]
+                if status == 304:
+                    # Must carry the ETag the full response would have had
+                    headers.add_vary()
+                    headers.weaken_etag()
+                if not self._compressible(status, headers):
+                    passthrough = True
+                    await send({**start_message, "headers": headers.raw})
+                    await send(message)
+                    return
+                headers.add_vary()
+                headers.weaken_etag()
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send({**start_message, "headers": headers.raw})
+                    await send(message)
+                    return
+
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                body = compressor.compress(body, final=not more_body)
+                headers.set("content-encoding", encoding)
+                if more_body:
+                    headers.remove("content-length")
+                else:
+                    headers.set("content-length", str(len(body)))
+                await send({**start_message, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                return
+
+            await send({
+                "type": "http.response.body",
+                "body": compressor.compress(body, final=not more_body),
+                "more_body": more_body,
+            })
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _compressible(status: int, headers: "_Headers") -> bool:
+        if status < 200 or status in (204, 304) or headers.get("content-encoding"):
+            return False
+        content_type = headers.get("content-type") or ""
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class _Headers:
+    """Minimal editor for ASGI raw header lists."""
+
+    def __init__(self, raw: List[Tuple[bytes, bytes]]):
+        self.raw = list(raw)
+
+    def get(self, name: str) -> Optional[str]:
+        key = name.encode()
+        for header, value in self.raw:
+            if header == key:
+                return value.decode("latin-1")
+        return None
+
+    def remove(self, name: str) -> None:
+        key = name.encode()
+        self.raw = [(header, value) for header, value in self.raw if header != key]
+
+    def set(self, name: str, value: str) -> None:
+        self.remove(name)
+        self.raw.append((name.encode(), value.encode("latin-1")))
+
+    def add_vary(self) -> None:
+        vary = self.get("vary")
+        if vary is None:
+            self.set("vary", "Accept-Encoding")
+        elif "accept-encoding" not in vary.lower():
+            self.set("vary", f"{vary}, Accept-Encoding")
+
+    def weaken_etag(self) -> None:
+        etag = self.get("etag")
+        if etag and not etag.startswith("W/"):
+            self.set("etag", f"W/{etag}")
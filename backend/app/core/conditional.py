@@ -0,0 +1,53 @@
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from typing import Optional
+import hashlib
+from app.core.auth import get_current_principal, Principal
+from app.db.session import get_async_db
+from app.services.versions import get_data_version
+
+# Clients must revalidate, but may keep (and reuse after a 304) their copy
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(user_id: int, version: int, request: Request) -> str:
+    """Strong ETag for a read of the user's data at a given data version.
+
+    The URL (with normalized query) picks the representation, and today's date
+    covers responses that depend on it, such as streaks and trailing windows.
+    """
+    query = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    key = f"{user_id}:{version}:{date.today().isoformat()}:{request.url.path}?{query}"
+    return '"' + hashlib.sha256(key.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses the weak comparison: W/ prefixes are ignored."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+async def conditional_get(
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+) -> None:
+    """Route dependency adding an ETag, answering a matching If-None-Match with 304.
+
+    Costs one primary-key lookup; the 304 is raised before the endpoint runs,
+    so none of its queries or serialization happen.
+    """
+    version = await db.run_sync(get_data_version, current_user.id)
+    etag = make_etag(current_user.id, version or 0, request)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
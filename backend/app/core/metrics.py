@@ -0,0 +1,298 @@
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+import bisect
+import time
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, Mapping[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_sample(name: str, labels: Mapping[str, str], value: float) -> str:
+    if labels:
+        rendered = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+        return f"{name}{{{rendered}}} {_format_value(value)}"
+    return f"{name} {_format_value(value)}"
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            return [
+                (self.name, dict(zip(self.labelnames, key)), value)
+                for key, value in sorted(self._values.items())
+            ]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels, as Prometheus expects."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._values: Dict[LabelValues, list] = {}
+        self._lock = Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def count(self, **labels: str) -> int:
+        state = self._values.get(tuple(str(labels[name]) for name in self.labelnames))
+        return sum(state[0]) if state else 0
+
+    def samples(self) -> List[Sample]:
+        samples: List[Sample] = []
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                labels = dict(zip(self.labelnames, key))
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+                samples.append((f"{self.name}_sum", labels, total))
+                samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+# A collector returns (name, type, help, samples) families, read at scrape time
+Family = Tuple[str, str, str, List[Tuple[Mapping[str, str], float]]]
+Collector = Callable[[], Iterable[Family]]
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Collector] = []
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(_format_sample(*sample) for sample in metric.samples())
+        for collector in self._collectors:
+            for name, kind, help, samples in collector():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(_format_sample(name, labels, value) for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route and status code.", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency, until the last body chunk is sent.", ("method", "route")
+)
+http_request_queries = registry.histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request.", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+http_request_query_duration = registry.histogram(
+    "http_request_db_duration_seconds", "Time spent in SQL statements per HTTP request.", ("method", "route")
+)
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds", "SQL statement execution time.", ("engine",)
+)
+
+
+class QueryStats:
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+# Set by the middleware for the duration of a request. The stats object is
+# mutated in place, so queries made from threadpool copies of the context
+# (or SQLAlchemy's async greenlets) are still counted.
+_request_queries: ContextVar[Optional[QueryStats]] = ContextVar("request_queries", default=None)
+
+
+def instrument_engine(engine: Engine, label: str) -> None:
+    """Time every statement on an engine. Pass `async_engine.sync_engine` for async engines."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # On the statement's own context: a failing statement never reaches
+        # after_cursor_execute, and must not leave a start time on the connection
+        context.query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context.query_started
+        db_query_duration.observe(elapsed, engine=label)
+        stats = _request_queries.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += elapsed
+
+
+def route_template(app, scope) -> str:
+    """The path template of the route a request matched, e.g. /api/v1/entries/{entry_id}.
+
+    Raw paths would give every entry id its own time series.
+    """
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status codes and SQL usage per route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stats = QueryStats()
+        token = _request_queries.set(stats)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_queries.reset(token)
+            method = scope["method"]
+            route = route_template(scope["app"], scope)
+            http_requests.inc(method=method, route=route, status=str(status))
+            http_request_duration.observe(time.perf_counter() - started, method=method, route=route)
+            http_request_queries.observe(stats.count, method=method, route=route)
+            http_request_query_duration.observe(stats.seconds, method=method, route=route)
+
+
+def cache_collector(caches: Mapping[str, object]) -> Collector:
+    """Expose TTLCache stats() for each named cache."""
+
+    def collect() -> Iterable[Family]:
+        stats = {name: cache.stats() for name, cache in caches.items()}
+        for key, kind, help in (
+            ("hits", "counter", "Cache lookups that found a live entry."),
+            ("misses", "counter", "Cache lookups that found nothing or an expired entry."),
+            ("evictions", "counter", "Entries evicted to stay within maxsize."),
+        ):
+            yield f"cache_{key}_total", kind, help, [({"cache": name}, s[key]) for name, s in stats.items()]
+        yield "cache_entries", "gauge", "Entries currently cached.", [({"cache": name}, s["size"]) for name, s in stats.items()]
+
+    return collect
+
+
+def password_pool_collector(pool) -> Collector:
+    """Expose PasswordHasherPool stats()."""
+
+    def collect() -> Iterable[Family]:
+        stats = pool.stats()
+        yield "password_hash_workers", "gauge", "bcrypt worker threads (0 = inline).", [({}, stats["workers"])]
+        yield "password_hash_queued", "gauge", "Hashes waiting for a worker.", [({}, stats["queued"])]
+        yield "password_hash_running", "gauge", "Hashes being computed.", [({}, stats["running"])]
+        yield "password_hash_completed_total", "counter", "Hashes computed.", [({}, stats["completed"])]
+        yield "password_hash_rejected_total", "counter", "Hashes rejected because the queue was full.", [({}, stats["rejected"])]
+        yield "password_hash_wait_seconds_max", "gauge", "Longest queue wait for a hash.", [({}, stats["max_wait_seconds"])]
+
+    return collect
+
+
+def db_pool_collector(monitors: Mapping[str, object]) -> Collector:
+    """Expose PoolMonitor stats() for each engine."""
+
+    def collect() -> Iterable[Family]:
+        stats = {name: monitor.stats() for name, monitor in monitors.items()}
+        for key, kind, help in (
+            ("in_use", "gauge", "Connections checked out of the pool."),
+            ("idle", "gauge", "Connections idle in the pool."),
+            ("overflow", "gauge", "Open connections beyond pool_size."),
+            ("connects", "counter", "New database connections opened."),
+            ("overflow_events", "counter", "Connections opened beyond pool_size."),
+            ("invalidations", "counter", "Connections invalidated, e.g. after a failed pre-ping."),
+            ("checkouts", "counter", "Connection checkouts."),
+            ("checkout_timeouts", "counter", "Checkouts that timed out waiting for a connection."),
+            ("checkout_seconds_total", "counter", "Time spent checking out connections."),
+            ("checkout_seconds_max", "gauge", "Slowest connection checkout."),
+        ):
+            name = f"db_pool_{key}" if key.endswith("_total") or kind == "gauge" else f"db_pool_{key}_total"
+            yield name, kind, help, [({"engine": engine}, s[key]) for engine, s in stats.items()]
+
+    return collect
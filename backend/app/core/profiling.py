@@ -0,0 +1,281 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from fastapi.routing import APIRoute
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+from threading import Lock
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Union
+import asyncio
+import functools
+import inspect
+import logging
+import time
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("app.slow_queries")
+
+EXPLAINABLE = ("select", "with", "insert", "update", "delete")
+MAX_LOGGED_STATEMENT = 2000
+# Slow queries waiting for a plan; beyond this they are logged without one
+MAX_PENDING_EXPLAINS = 16
+
+
+class StatementTiming(NamedTuple):
+    engine: str
+    statement: str
+    parameters: str
+    seconds: float
+
+
+class RequestProfile:
+    """Statements and phase timings collected for one profiled request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements: List[StatementTiming] = []
+        self.phases: Dict[str, float] = {}
+        self.endpoint_started: Optional[float] = None
+        self.endpoint_finished: Optional[float] = None
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @property
+    def db_seconds(self) -> float:
+        return sum(statement.seconds for statement in self.statements)
+
+    def server_timing(self, now: float) -> str:
+        """Server-Timing header value. Phases overlap: auth and app include their own DB time."""
+        metrics = [("db", self.db_seconds, f"{len(self.statements)} queries")]
+        if "auth" in self.phases:
+            metrics.append(("auth", self.phases["auth"], None))
+        if self.endpoint_started is not None and self.endpoint_finished is not None:
+            metrics.append(("app", self.endpoint_finished - self.endpoint_started, None))
+            metrics.append(("serialize", now - self.endpoint_finished, None))
+        metrics.append(("total", now - self.started, None))
+        return ", ".join(
+            f'{name};dur={seconds * 1000:.2f}' + (f';desc="{desc}"' if desc else "")
+            for name, seconds, desc in metrics
+        )
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current_profile.get()
+
+
+@contextmanager
+def phase(name: str):
+    """Time a block into the current request's profile, if it is being profiled."""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(name, time.perf_counter() - started)
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> str:
+    """Describe bound parameters by type only, so no values end up in logs."""
+    if executemany:
+        rows = list(parameters or ())
+        return f"{len(rows)} x {parameter_shape(rows[0])}" if rows else "[]"
+    if isinstance(parameters, Mapping):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+# Plans are fetched on one background thread over unpooled connections, so a
+# slow database never makes requests wait for EXPLAIN or compete with it for
+# pooled connections
+explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+_explain_engines: Dict[str, Union[Engine, AsyncEngine]] = {}
+_pending_explains = 0
+_pending_lock = Lock()
+
+
+def _explain_engine(engine: Engine) -> Union[Engine, AsyncEngine]:
+    """A NullPool engine on the same database and driver as `engine`, without its instrumentation."""
+    key = engine.url.render_as_string(hide_password=False)
+    if key not in _explain_engines:
+        factory = create_async_engine if engine.dialect.is_async else create_engine
+        _explain_engines[key] = factory(engine.url, poolclass=NullPool)
+    return _explain_engines[key]
+
+
+def explain(engine: Engine, statement: str, parameters: Any) -> Optional[str]:
+    """The plan for a statement, fetched on a separate, unpooled connection so a failure can't abort the caller's transaction.
+
+    Blocks; the slow-query log calls it from `explain_executor`.
+    """
+    if not statement.lstrip().lower().startswith(EXPLAINABLE):
+        return None
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    target = _explain_engine(engine)
+    try:
+        if isinstance(target, AsyncEngine):
+            async def fetch():
+                async with target.connect() as conn:
+                    return (await conn.exec_driver_sql(prefix + statement, parameters)).fetchall()
+            rows = asyncio.run(fetch())
+        else:
+            with target.connect() as conn:
+                rows = conn.exec_driver_sql(prefix + statement, parameters).fetchall()
+        return "\n".join(str(row[-1]) for row in rows)
+    except Exception as exc:
+        return f"(EXPLAIN failed: {exc.__class__.__name__})"
+
+
+def _log_slow_query(label: str, seconds: float, statement: str, shape: str, plan: Optional[str]) -> None:
+    slow_query_logger.warning(
+        "Slow query (%.1f ms, %s engine) params=%s\n%s%s",
+        seconds * 1000,
+        label,
+        shape,
+        statement[:MAX_LOGGED_STATEMENT],
+        f"\nPlan:\n{plan}" if plan else "",
+    )
+
+
+def _explain_and_log(engine: Engine, label: str, seconds: float, statement: str, parameters: Any, shape: str) -> None:
+    global _pending_explains
+    try:
+        _log_slow_query(label, seconds, statement, shape, explain(engine, statement, parameters))
+    finally:
+        with _pending_lock:
+            _pending_explains -= 1
+
+
+def _queue_explain(engine: Engine, label: str, seconds: float, statement: str, parameters: Any, shape: str) -> bool:
+    """Hand a slow query to the explain thread. False if too many are already waiting."""
+    global _pending_explains
+    with _pending_lock:
+        if _pending_explains >= MAX_PENDING_EXPLAINS:
+            return False
+        _pending_explains += 1
+    explain_executor.submit(_explain_and_log, engine, label, seconds, statement, parameters, shape)
+    return True
+
+
+def instrument_engine(engine: Engine, label: str) -> None:
+    """Capture statements for profiled requests and log slow ones, with their plan if SLOW_QUERY_EXPLAIN is set.
+
+    Pass `async_engine.sync_engine` for async engines.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # Kept on the statement's own context, so a failed statement leaves nothing behind
+        context.profile_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context.profile_started
+        shape = parameter_shape(parameters, executemany)
+
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.statements.append(StatementTiming(label, statement, shape, elapsed))
+
+        threshold = settings.SLOW_QUERY_MS
+        if threshold > 0 and elapsed * 1000 >= threshold:
+            if settings.SLOW_QUERY_EXPLAIN and not executemany and _queue_explain(
+                engine, label, elapsed, statement, parameters, shape
+            ):
+                return
+            _log_slow_query(label, elapsed, statement, shape, None)
+
+
+def _profiled(endpoint):
+    @functools.wraps(endpoint)
+    async def profiled(*args, **kwargs):
+        profile = _current_profile.get()
+        if profile is None:
+            return await endpoint(*args, **kwargs)
+        profile.endpoint_started = time.perf_counter()
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            profile.endpoint_finished = time.perf_counter()
+
+    profiled.__profiled__ = True
+    return profiled
+
+
+def instrument_routes(routes) -> None:
+    """Wrap async endpoint functions so profiles can tell handler time from serialization.
+
+    Call once after all routers are included.
+    """
+    for route in routes:
+        if not isinstance(route, APIRoute):
+            continue
+        endpoint = route.dependant.call
+        if inspect.iscoroutinefunction(endpoint) and not getattr(endpoint, "__profiled__", False):
+            route.dependant.call = _profiled(endpoint)
+
+
+def _wants_profile(scope) -> bool:
+    if settings.PROFILING:
+        return True
+    header = settings.PROFILING_HEADER.lower().encode()
+    return bool(header) and any(
+        name == header and value not in (b"", b"0", b"false")
+        for name, value in scope.get("headers", ())
+    )
+
+
+def _log_profile(scope, profile: RequestProfile, total: float) -> None:
+    logger.info(
+        "%s %s: %.1f ms total, %d queries, %.1f ms in SQL",
+        scope["method"], scope["path"], total * 1000, len(profile.statements), profile.db_seconds * 1000
+    )
+    for statement in profile.statements:
+        logger.info(
+            "  %.2f ms [%s] %s params=%s",
+            statement.seconds * 1000,
+            statement.engine,
+            " ".join(statement.statement.split())[:MAX_LOGGED_STATEMENT],
+            statement.parameters,
+        )
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles opted-in requests (PROFILING or the PROFILING_HEADER request header).
+
+    Profiled responses get a Server-Timing header and their statements are logged.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                timing = profile.server_timing(time.perf_counter())
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", timing.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_profile.reset(token)
+            _log_profile(scope, profile, time.perf_counter() - profile.started)
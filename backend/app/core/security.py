@@ -1,11 +1,23 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Callable, Dict, Optional, TypeVar
+import asyncio
+import hashlib
+import time
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Verified JWT claims keyed by sha256(token), each kept no longer than its exp
+token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl=settings.TOKEN_CACHE_TTL_SECONDS,
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
@@ -17,6 +29,93 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+T = TypeVar("T")
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when too many password hashes are already queued."""
+
+
+class PasswordHasherPool:
+    """Runs bcrypt hashing/verification on worker threads instead of the event loop.
+
+    bcrypt releases the GIL, so hashes proceed in parallel while the loop keeps
+    serving other requests. At most `max_pending` calls may be queued or running;
+    beyond that calls fail fast with PasswordHashingBusy. With workers=0 calls
+    run inline on the caller's thread (the old behaviour).
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash") if workers > 0 else None
+        self._lock = Lock()
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        if self._executor is None:
+            return fn(*args)
+        
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHashingBusy()
+            self.pending += 1
+        queued_at = time.perf_counter()
+        
+        def task() -> T:
+            wait = time.perf_counter() - queued_at
+            with self._lock:
+                self.running += 1
+                self.total_wait_seconds += wait
+                self.max_wait_seconds = max(self.max_wait_seconds, wait)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+        
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, task)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queued": self.pending - self.running,
+                "running": self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "average_wait_seconds": self.total_wait_seconds / self.completed if self.completed else 0.0,
+                "max_wait_seconds": self.max_wait_seconds,
+            }
+
+
+password_pool = PasswordHasherPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the password hashing pool."""
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the password hashing pool."""
+    return await password_pool.run(get_password_hash, password)
+
+
 def create_access_token(user_id: int, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token. user_id is always converted to string for JWT compatibility."""
     if expires_delta:
@@ -46,20 +145,41 @@ def create_refresh_token(user_id: int) -> str:
     return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
-def decode_token(token: str, token_type: str = "access") -> Optional[dict]:
-    """Decode and verify a JWT token. Returns None if invalid."""
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        
-        # Verify token type
-        if payload.get("type") != token_type:
+def _verify_token(token: str) -> Optional[dict]:
+    """Verify signature and expiry, using the cache for tokens seen before."""
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    
+    if payload is None:
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError:
+            return None
+        except Exception:
             return None
         
-        return payload
-    except JWTError:
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            token_cache.set(key, payload, ttl=exp - time.time())
+    elif payload["exp"] <= time.time():
+        # Cache expiry uses a different clock; never hand out an expired token
+        token_cache.pop(key)
         return None
-    except Exception:
+    
+    return payload
+
+
+def decode_token(token: str, token_type: str = "access") -> Optional[dict]:
+    """Decode and verify a JWT token. Returns None if invalid."""
+    payload = _verify_token(token)
+    if payload is None:
+        return None
+    
+    # Verify token type
+    if payload.get("type") != token_type:
         return None
+    
+    return dict(payload)
 
 
 def get_user_id_from_token(token: str, token_type: str = "access") -> Optional[int]:
@@ -3,7 +3,9 @@ from app.db.models.project import Project
 from app.db.models.entry import Entry
 from app.db.models.tag import Tag
 from app.db.models.entry_tag import entry_tags
+from app.db.models.user_summary import UserSummary
+from app.db.models.daily_rollup import DailyRollup
 
-__all__ = ["User", "Project", "Entry", "Tag", "entry_tags"]
+__all__ = ["User", "Project", "Entry", "Tag", "entry_tags", "UserSummary", "DailyRollup"]
 
 
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey
+from app.db.base import Base
+
+# project_id of rollups for entries without a project. Part of the primary key,
+# so it can't be NULL (and has no foreign key).
+NO_PROJECT = 0
+
+
+class DailyRollup(Base):
+    """Entry totals per user, day and project, maintained alongside entry writes."""
+    __tablename__ = "daily_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    project_id = Column(Integer, primary_key=True, default=NO_PROJECT)
+    entry_count = Column(Integer, nullable=False, default=0, server_default="0")
+    mood_sum = Column(Integer, nullable=False, default=0, server_default="0")  # mood is required, so its count is entry_count
+    focus_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    focus_count = Column(Integer, nullable=False, default=0, server_default="0")
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, query_expression
 from app.db.base import Base
 
 
@@ -19,9 +19,18 @@ class Entry(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
+    # Only loaded when a query asks for it with with_expression() (sparse fieldsets)
+    excerpt = query_expression()
+    
     # Relationships
     user = relationship("User", backref="entries")
     project = relationship("Project", back_populates="entries")
     tags = relationship("Tag", secondary="entry_tags", back_populates="entries")
 
+    __table_args__ = (
+        # Per-user date-range scans (calendar, trends, streaks, list ordering)
+        Index("ix_entries_user_id_date", "user_id", "date"),
+        Index("ix_entries_user_id_project_id_date", "user_id", "project_id", "date"),
+    )
+
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Table
+from sqlalchemy import Column, Integer, ForeignKey, Index, Table
 from app.db.base import Base
 
 entry_tags = Table(
@@ -6,6 +6,8 @@ entry_tags = Table(
     Base.metadata,
     Column("entry_id", Integer, ForeignKey("entries.id"), primary_key=True),
     Column("tag_id", Integer, ForeignKey("tags.id"), primary_key=True),
+    # Reverse of the primary key: a tag's entries (its posting list) for tag filters
+    Index("ix_entry_tags_tag_id_entry_id", "tag_id", "entry_id"),
 )
 
 
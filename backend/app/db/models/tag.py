@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, ForeignKey, Index, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
@@ -11,7 +11,17 @@ class Tag(Base):
     name = Column(String, nullable=False)
     
     # Unique constraint: name must be unique per user
-    __table_args__ = (UniqueConstraint("user_id", "name", name="unique_user_tag"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "name", name="unique_user_tag"),
+        # Case-insensitive prefix lookups (autocomplete); text_pattern_ops lets
+        # PostgreSQL use it for LIKE 'prefix%' whatever the collation
+        Index(
+            "ix_tags_user_id_lower_name",
+            "user_id",
+            func.lower(name).label("name_lower"),
+            postgresql_ops={"name_lower": "text_pattern_ops"},
+        ),
+    )
     
     # Relationships
     user = relationship("User", backref="tags")
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class UserSummary(Base):
+    """Per-user dashboard figures, refreshed whenever the user's entries change."""
+    __tablename__ = "user_summaries"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    total_entries = Column(Integer, nullable=False, default=0, server_default="0")
+    mood_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    mood_count = Column(Integer, nullable=False, default=0, server_default="0")
+    focus_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    focus_count = Column(Integer, nullable=False, default=0, server_default="0")
+    first_entry_date = Column(Date, nullable=True)
+    last_entry_date = Column(Date, nullable=True)
+    streak_start = Column(Date, nullable=True)  # First day of the run of consecutive days ending at last_entry_date
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
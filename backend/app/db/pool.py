@@ -0,0 +1,157 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, Pool, QueuePool
+from threading import Lock
+from typing import Any, Dict, Optional, Type
+import time
+from app.core.config import settings
+
+
+class PoolMonitor:
+    """Checkout latency and connection counts for one engine's pool.
+
+    Latency covers the whole checkout: waiting for a free connection, opening a
+    new one when the pool is short, and the pre-ping if enabled.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = Lock()
+        self.checkouts = 0
+        self.checkout_seconds_total = 0.0
+        self.checkout_seconds_max = 0.0
+        self.checkout_timeouts = 0
+        self.in_use = 0
+        self.connects = 0
+        self.overflow_events = 0
+        self.invalidations = 0
+        self._pool: Optional[Pool] = None
+
+    def record_checkout(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_seconds_total += seconds
+            self.checkout_seconds_max = max(self.checkout_seconds_max, seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.checkout_timeouts += 1
+
+    def attach(self, engine: Engine) -> None:
+        """Start monitoring an engine. Pass `async_engine.sync_engine` for async engines."""
+        engine.pool.monitor = self
+        self._pool = engine.pool
+
+        @event.listens_for(engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            with self._lock:
+                self.connects += 1
+                # A new connection past pool_size is an overflow connection
+                if isinstance(self._pool, QueuePool) and self._pool.overflow() > 0:
+                    self.overflow_events += 1
+
+        @event.listens_for(engine, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            with self._lock:
+                self.in_use += 1
+
+        @event.listens_for(engine, "checkin")
+        def on_checkin(dbapi_connection, connection_record):
+            with self._lock:
+                self.in_use -= 1
+
+        @event.listens_for(engine, "invalidate")
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            with self._lock:
+                self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        pool = self._pool
+        idle = pool.checkedin() if isinstance(pool, QueuePool) else 0
+        with self._lock:
+            return {
+                "pool": type(pool).__name__ if pool is not None else None,
+                "size": pool.size() if isinstance(pool, QueuePool) else None,
+                "in_use": self.in_use,
+                "idle": idle,
+                "overflow": max(pool.overflow(), 0) if isinstance(pool, QueuePool) else 0,
+                "connects": self.connects,
+                "overflow_events": self.overflow_events,
+                "invalidations": self.invalidations,
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "checkout_seconds_total": round(self.checkout_seconds_total, 6),
+                "checkout_seconds_max": round(self.checkout_seconds_max, 6),
+            }
+
+
+class _TimedCheckout:
+    """Pool mixin that reports checkout latency to the pool's monitor."""
+
+    monitor: Optional[PoolMonitor] = None
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            if self.monitor is not None:
+                self.monitor.record_timeout()
+            raise
+        if self.monitor is not None:
+            self.monitor.record_checkout(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep reporting to the same monitor
+        pool = super().recreate()
+        pool.monitor = self.monitor
+        return pool
+
+
+_instrumented_classes: Dict[Type[Pool], Type[Pool]] = {}
+
+
+def instrumented_pool_class(pool_class: Type[Pool]) -> Type[Pool]:
+    if pool_class not in _instrumented_classes:
+        _instrumented_classes[pool_class] = type(
+            f"Timed{pool_class.__name__}", (_TimedCheckout, pool_class), {}
+        )
+    return _instrumented_classes[pool_class]
+
+
+def _statement_timeout_args(driver: str, timeout_ms: int) -> Dict[str, Any]:
+    if driver == "asyncpg":
+        return {"server_settings": {"statement_timeout": str(timeout_ms)}}
+    return {"options": f"-c statement_timeout={timeout_ms}"}
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """Keyword arguments for create_engine / create_async_engine from the DB_* settings."""
+    parsed = make_url(url)
+    dialect = parsed.get_dialect()
+    is_postgres = parsed.get_backend_name() == "postgresql"
+
+    pool_class = NullPool if settings.DB_NULL_POOL else dialect.get_pool_class(parsed)
+    options: Dict[str, Any] = {
+        "poolclass": instrumented_pool_class(pool_class),
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
+    if issubclass(pool_class, QueuePool):
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        )
+
+    connect_args: Dict[str, Any] = {}
+    if is_postgres and settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        connect_args.update(_statement_timeout_args(parsed.get_driver_name(), settings.DB_STATEMENT_TIMEOUT_MS))
+    if is_postgres and settings.DB_NULL_POOL and parsed.get_driver_name() == "asyncpg":
+        # PgBouncer in transaction mode cannot keep server-side prepared statements
+        connect_args["statement_cache_size"] = 0
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
@@ -1,10 +1,57 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from typing import AsyncIterator
 from app.core.config import settings
+from app.core import profiling
+from app.db.pool import PoolMonitor, engine_options
 
-engine = create_engine(settings.DATABASE_URL)
+# Async drivers for the sync drivers DATABASE_URL may name
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Swap the sync DBAPI in a database URL for its asyncio counterpart."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+    parsed = parsed.set(drivername=ASYNC_DRIVERS[backend])
+    if backend == "postgresql" and "sslmode" in parsed.query:
+        # asyncpg spells libpq's sslmode as ssl
+        parsed = parsed.update_query_dict({"ssl": parsed.query["sslmode"]}).difference_update_query(["sslmode"])
+    if backend == "postgresql" and settings.DB_NULL_POOL:
+        # Behind PgBouncer, don't cache prepared statements on server connections
+        parsed = parsed.update_query_dict({"prepared_statement_cache_size": "0"})
+    return parsed.render_as_string(hide_password=False)
+
+
+# Sync engine: Alembic, scripts, tests and endpoints that stream from a worker thread
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine: request handlers, so database round trips never block the event loop
+ASYNC_DATABASE_URL = async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+# Objects outlive the commit so responses can be serialized without lazy loads
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Checkout latency, in-use/idle counts and overflow events, served by /health/pool
+pool_monitors = {
+    "sync": PoolMonitor("sync"),
+    "async": PoolMonitor("async"),
+}
+pool_monitors["sync"].attach(engine)
+pool_monitors["async"].attach(async_engine.sync_engine)
+
+# Slow-query log and per-request statement capture (see app.core.profiling)
+profiling.instrument_engine(engine, "sync")
+profiling.instrument_engine(async_engine.sync_engine, "async")
+
 
 def get_db():
     """Dependency for getting database session."""
@@ -15,3 +62,11 @@ def get_db():
         db.close()
 
 
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Dependency for getting an async database session.
+
+    Sync service functions run against it with `await db.run_sync(fn, *args)`,
+    which drives their queries through the async driver.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
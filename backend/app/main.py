@@ -1,14 +1,22 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 from app.core.config import settings
-from app.api import auth, entries, projects, tags, calendar, insights
+from app.core import compression, metrics, profiling
+from app.core.auth import principal_cache
+from app.core.security import token_cache, password_pool
+from app.services.tags import tag_index_cache
+from app.services.search import search_index_cache
+from app.db.session import engine, async_engine, pool_monitors
+from app.api import auth, entries, projects, tags, calendar, insights, search
 
 # Configure logging
 logging.basicConfig(
     level=logging.ERROR,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
+logging.getLogger("app.slow_queries").setLevel(logging.WARNING)
+logging.getLogger("app.core.profiling").setLevel(logging.INFO)
 
 
 app = FastAPI(
@@ -29,6 +37,31 @@ app.add_middleware(
     max_age=3600,
 )
 
+# gzip/brotli for large JSON and NDJSON bodies
+if settings.COMPRESSION_MIN_SIZE > 0:
+    app.add_middleware(
+        compression.CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.GZIP_LEVEL,
+        brotli_quality=settings.BROTLI_QUALITY,
+    )
+
+# Opt-in request profiling (Server-Timing header, statement log)
+app.add_middleware(profiling.ProfilingMiddleware)
+
+# Request and SQL metrics, served by /metrics
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.instrument_engine(engine, "sync")
+metrics.instrument_engine(async_engine.sync_engine, "async")
+metrics.registry.add_collector(metrics.cache_collector({
+    "principal": principal_cache,
+    "token": token_cache,
+    "tag_index": tag_index_cache,
+    "search_index": search_index_cache,
+}))
+metrics.registry.add_collector(metrics.password_pool_collector(password_pool))
+metrics.registry.add_collector(metrics.db_pool_collector(pool_monitors))
+
 # Include routers
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(entries.router, prefix="/api/v1/entries", tags=["entries"])
@@ -36,6 +69,8 @@ app.include_router(projects.router, prefix="/api/v1/projects", tags=["projects"]
 app.include_router(tags.router, prefix="/api/v1/tags", tags=["tags"])
 app.include_router(calendar.router, prefix="/api/v1/calendar", tags=["calendar"])
 app.include_router(insights.router, prefix="/api/v1/insights", tags=["insights"])
+app.include_router(search.router, prefix="/api/v1/search", tags=["search"])
+profiling.instrument_routes(app.routes)
 
 
 @app.get("/")
@@ -48,3 +83,13 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/health/pool")
+async def pool_health():
+    """Connection pool usage and checkout latency for each database engine."""
+    return {name: monitor.stats() for name, monitor in pool_monitors.items()}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Request, SQL, cache and pool metrics in the Prometheus text format."""
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
@@ -15,3 +15,13 @@ class CalendarMonthResponse(BaseModel):
     days: List[CalendarDay]
 
 
+class CalendarRangeResponse(BaseModel):
+    """Days with entries between start and end (inclusive), as parallel arrays.
+
+    Day i is start + offsets[i] days, with entry_counts[i] entries and average_moods[i] mood.
+    """
+    start: date
+    end: date
+    offsets: List[int]
+    entry_counts: List[int]
+    average_moods: List[Optional[float]]
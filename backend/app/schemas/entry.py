@@ -1,6 +1,10 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, AfterValidator, ConfigDict, create_model
 from datetime import date, datetime
-from typing import Optional, List
+from datetime import date as date_type
+from functools import lru_cache
+from typing import Annotated, Optional, List, Tuple, Type
+
+EXCERPT_LENGTH = 160
 
 
 class EntryCreate(BaseModel):
@@ -15,7 +19,8 @@ class EntryCreate(BaseModel):
 
 
 class EntryUpdate(BaseModel):
-    date: Optional[date] = None
+    # date_type alias: `date: Optional[date] = None` would see the field's own None default
+    date: Optional[date_type] = None
     title: Optional[str] = None
     body: Optional[str] = None
     looking_ahead: Optional[str] = None
@@ -61,3 +66,42 @@ class EntryResponse(BaseModel):
         from_attributes = True
 
 
+def trim_excerpt(text: Optional[str]) -> Optional[str]:
+    """Shorten to EXCERPT_LENGTH characters at a word boundary, marking the cut with an ellipsis."""
+    if text is None or len(text) <= EXCERPT_LENGTH:
+        return text
+    cut = text[:EXCERPT_LENGTH]
+    if " " in cut:
+        cut = cut[:cut.rindex(" ")]
+    return cut.rstrip() + "…"
+
+
+@lru_cache(maxsize=256)
+def sparse_entry_model(fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """An EntryResponse narrowed to `fields` (see app.services.entries.parse_fields).
+
+    `excerpt` is the start of the body, as loaded by the sparse entries query.
+    """
+    definitions = {}
+    for name in fields:
+        if name == "excerpt":
+            definitions[name] = (Annotated[Optional[str], AfterValidator(trim_excerpt)], None)
+        else:
+            field = EntryResponse.model_fields[name]
+            definitions[name] = (field.annotation, field)
+    return create_model(
+        "EntryFields_" + "_".join(fields),
+        __config__=ConfigDict(from_attributes=True),
+        **definitions
+    )
+
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    imported: int
+    failed: int
+    errors: List[ImportRowError] = []
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import List, Optional
 
 
 class ProjectCreate(BaseModel):
@@ -24,3 +24,9 @@ class ProjectResponse(BaseModel):
         from_attributes = True
 
 
+class ProjectActivityResponse(ProjectResponse):
+    entry_count: int
+    last_entry_date: Optional[date] = None
+    average_mood: Optional[float] = None
+    sparkline_start: date  # Monday of the first week in weekly_entries
+    weekly_entries: List[int]  # Entries per week, oldest first, ending with the current week
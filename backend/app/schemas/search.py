@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+from typing import Optional
+from app.schemas.entry import EntryResponse
+
+
+class SearchResult(BaseModel):
+    entry: EntryResponse
+    rank: float
+    snippet: Optional[str] = None
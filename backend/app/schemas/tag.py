@@ -1,4 +1,6 @@
 from pydantic import BaseModel
+from datetime import date
+from typing import Optional
 
 
 class TagCreate(BaseModel):
@@ -13,3 +15,8 @@ class TagResponse(BaseModel):
         from_attributes = True
 
 
+class TagStatsResponse(BaseModel):
+    id: int
+    name: str
+    usage_count: int
+    last_used: Optional[date] = None
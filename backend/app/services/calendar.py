@@ -1,38 +1,79 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, cast, Float
+from calendar import monthrange
 from datetime import date
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Sequence, Tuple
 from app.db.models.entry import Entry
-from app.db.models.tag import Tag
+from app.db.models.daily_rollup import DailyRollup
+from app.services.entries import tag_names, tag_predicate
 
 
-def get_calendar_month_data(
+def month_bounds(year: int, month: int) -> Tuple[date, date]:
+    """First and last day of the month (inclusive, so December 9999 needs no later date)."""
+    return date(year, month, 1), date(year, month, monthrange(year, month)[1])
+
+
+def _daily_aggregates(
     db: Session,
     user_id: int,
-    year: int,
-    month: int,
+    start: date,
+    end: date,
     project_id: Optional[int] = None,
-    tag: Optional[str] = None
-) -> Dict:
-    """Get calendar month data with entry counts and average mood per day."""
-    # Build query
+    tag: Optional[str] = None,
+    tags: Sequence[str] = (),
+    tag_mode: str = "all"
+) -> List:
+    """(date, entry_count, average_mood) rows for days in [start, end] that have entries.
+
+    Read from the daily rollups, except with a tag filter, which they can't answer.
+    """
+    names = tag_names(tag, tags)
+    if not names:
+        query = db.query(
+            DailyRollup.date,
+            func.sum(DailyRollup.entry_count).label('entry_count'),
+            (cast(func.sum(DailyRollup.mood_sum), Float) / func.sum(DailyRollup.entry_count)).label('average_mood')
+        ).filter(
+            DailyRollup.user_id == user_id,
+            DailyRollup.date >= start,
+            DailyRollup.date <= end
+        )
+        if project_id:
+            query = query.filter(DailyRollup.project_id == project_id)
+        return query.group_by(DailyRollup.date).order_by(DailyRollup.date).all()
+    
+    # Plain range on date so (user_id, date) index can be used
     query = db.query(
         Entry.date,
         func.count(Entry.id).label('entry_count'),
         func.avg(Entry.mood).label('average_mood')
     ).filter(
         Entry.user_id == user_id,
-        func.extract('year', Entry.date) == year,
-        func.extract('month', Entry.date) == month
+        Entry.date >= start,
+        Entry.date <= end
     )
     
     if project_id:
         query = query.filter(Entry.project_id == project_id)
     
-    if tag:
-        query = query.join(Entry.tags).filter(Tag.name == tag)
+    query = query.filter(tag_predicate(user_id, names, tag_mode))
     
-    results = query.group_by(Entry.date).all()
+    return query.group_by(Entry.date).order_by(Entry.date).all()
+
+
+def get_calendar_month_data(
+    db: Session,
+    user_id: int,
+    year: int,
+    month: int,
+    project_id: Optional[int] = None,
+    tag: Optional[str] = None,
+    tags: Sequence[str] = (),
+    tag_mode: str = "all"
+) -> Dict:
+    """Get calendar month data with entry counts and average mood per day."""
+    start, end = month_bounds(year, month)
+    results = _daily_aggregates(db, user_id, start, end, project_id=project_id, tag=tag, tags=tags, tag_mode=tag_mode)
     
     # Convert to dictionary for easy lookup
     day_data = {row.date: {'entry_count': row.entry_count, 'average_mood': float(row.average_mood) if row.average_mood else None} for row in results}
@@ -40,3 +81,27 @@ def get_calendar_month_data(
     return day_data
 
 
+def get_calendar_range_data(
+    db: Session,
+    user_id: int,
+    start: date,
+    end: date,
+    project_id: Optional[int] = None,
+    tag: Optional[str] = None,
+    tags: Sequence[str] = (),
+    tag_mode: str = "all"
+) -> Dict:
+    """Per-day entry counts and average mood for [start, end] in columnar form.
+
+    Only days with entries are listed; `offsets` holds each day's distance in days
+    from `start`, aligned with `entry_counts` and `average_moods`.
+    """
+    results = _daily_aggregates(db, user_id, start, end, project_id=project_id, tag=tag, tags=tags, tag_mode=tag_mode)
+    
+    return {
+        'start': start,
+        'end': end,
+        'offsets': [(row.date - start).days for row in results],
+        'entry_counts': [row.entry_count for row in results],
+        'average_moods': [round(float(row.average_mood), 2) if row.average_mood else None for row in results]
+    }
@@ -1,43 +1,243 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
-from datetime import date
-from typing import Optional, List
+from sqlalchemy.orm import Session, Query, selectinload, joinedload, load_only, with_expression
+from sqlalchemy import or_, and_, select, func, literal
+from datetime import date, datetime
+from typing import Optional, List, Tuple, Iterator, Sequence
+import base64
+import json
 from app.db.models.entry import Entry
 from app.db.models.tag import Tag
+from app.db.models.entry_tag import entry_tags
+from app.schemas.entry import EXCERPT_LENGTH
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+STREAM_BATCH_SIZE = 100
+TAG_MODES = ("all", "any")
 
-def filter_entries(
+# Names accepted by the `fields` parameter: EntryResponse's fields plus a
+# server-computed excerpt of the body
+RELATIONSHIP_FIELDS = ("tags", "project")
+ENTRY_FIELDS = (
+    "id", "user_id", "project_id", "date", "title", "body", "excerpt", "looking_ahead",
+    "mood", "focus_score", "created_at", "updated_at", *RELATIONSHIP_FIELDS
+)
+
+
+def parse_fields(value: str) -> Tuple[str, ...]:
+    """Parse a comma-separated sparse fieldset, in ENTRY_FIELDS order. Raises ValueError on unknown names."""
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = requested.difference(ENTRY_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    if not requested:
+        raise ValueError("No fields requested")
+    return tuple(name for name in ENTRY_FIELDS if name in requested)
+
+
+def entry_load_options(fields: Optional[Sequence[str]] = None) -> tuple:
+    """Eager-load options for everything EntryResponse serializes.
+
+    Tags come from one extra SELECT ... IN per batch of entries and the project
+    is joined in, so serializing a list never lazy-loads per entry. With a
+    sparse fieldset only the requested columns and relationships are loaded
+    (plus id, date and created_at, which keyset cursors need); the excerpt is cut in SQL
+    so full bodies never leave the database.
+    """
+    if fields is None:
+        return (selectinload(Entry.tags), joinedload(Entry.project))
+
+    columns = {"id", "date", "created_at"} | {
+        name for name in fields if name not in RELATIONSHIP_FIELDS and name != "excerpt"
+    }
+    options = [load_only(*(getattr(Entry, name) for name in sorted(columns)), raiseload=True)]
+    if "tags" in fields:
+        options.append(selectinload(Entry.tags))
+    if "project" in fields:
+        options.append(joinedload(Entry.project))
+    if "excerpt" in fields:
+        # One character more than the excerpt, so truncation can be detected
+        options.append(with_expression(Entry.excerpt, func.substr(Entry.body, 1, EXCERPT_LENGTH + 1)))
+    return tuple(options)
+
+
+def parse_tags(value: Optional[str]) -> Tuple[str, ...]:
+    """Tag names from a comma-separated list, without blanks or repeats."""
+    if not value:
+        return ()
+    return tuple(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+
+
+def tag_names(tag: Optional[str], tags: Sequence[str] = ()) -> Tuple[str, ...]:
+    """The single-tag filter and the multi-tag filter as one list of names."""
+    return tuple(dict.fromkeys([*tags, *([tag] if tag else [])]))
+
+
+def tag_predicate(user_id: int, names: Sequence[str], mode: str = "all"):
+    """Filter for entries having all (or any) of the named tags.
+
+    Each tag's posting list is read through the (tag_id, entry_id) index and
+    applied as a semi-join (IN), so entries never repeat and no DISTINCT is
+    needed. "all" intersects one posting list per tag; unknown names match nothing.
+    """
+    def posting(condition):
+        return select(entry_tags.c.entry_id).join(Tag, Tag.id == entry_tags.c.tag_id).where(
+            Tag.user_id == user_id, condition
+        )
+
+    if mode == "any":
+        return Entry.id.in_(posting(Tag.name.in_(names)))
+    return and_(*(Entry.id.in_(posting(Tag.name == name)) for name in names))
+
+
+def get_user_entry(db: Session, user_id: int, entry_id: int) -> Optional[Entry]:
+    """Get a single entry owned by the user with its relationships loaded."""
+    return db.query(Entry).options(*entry_load_options()).filter(
+        Entry.id == entry_id,
+        Entry.user_id == user_id
+    ).first()
+
+
+def encode_cursor(entry: Entry) -> str:
+    """Encode the position of an entry in the list ordering as an opaque cursor."""
+    raw = json.dumps(
+        {"d": entry.date.isoformat(), "c": entry.created_at.isoformat(), "i": entry.id},
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[date, datetime, int]:
+    """Decode a cursor into (date, created_at, entry_id). Raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return date.fromisoformat(data["d"]), datetime.fromisoformat(data["c"]), int(data["i"])
+    except (ValueError, TypeError, KeyError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def _created_at_key(db: Session, value: Optional[datetime] = None):
+    """created_at (or a bound `value`) as the list ordering compares it.
+
+    SQLite keeps timestamps as text, with or without fractional seconds
+    depending on who wrote them, so there they are compared as Julian days.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return func.julianday(Entry.created_at if value is None else value.isoformat(sep=" "))
+    return Entry.created_at if value is None else literal(value, Entry.created_at.type)
+
+
+def _after_cursor(db: Session, cursor: str):
+    """Keyset predicate selecting rows that sort after the cursor position.
+
+    Only the values in the cursor are compared, so the page boundary holds even
+    if the entry it was taken from has since been deleted.
+    """
+    cursor_date, cursor_created_at, cursor_id = decode_cursor(cursor)
+    created_at, anchor_created_at = _created_at_key(db), _created_at_key(db, cursor_created_at)
+    return or_(
+        Entry.date < cursor_date,
+        and_(
+            Entry.date == cursor_date,
+            or_(
+                created_at < anchor_created_at,
+                and_(created_at == anchor_created_at, Entry.id < cursor_id)
+            )
+        )
+    )
+
+
+def build_entries_query(
     db: Session,
     user_id: int,
     project_id: Optional[int] = None,
     tag: Optional[str] = None,
     search: Optional[str] = None,
     date_from: Optional[date] = None,
-    date_to: Optional[date] = None
-) -> List[Entry]:
-    """Filter entries based on various criteria."""
-    query = db.query(Entry).filter(Entry.user_id == user_id)
-    
+    date_to: Optional[date] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    tags: Sequence[str] = (),
+    tag_mode: str = "all"
+) -> Query:
+    """Build the ordered entries query for the given filters, loading only `fields` if given.
+
+    `tag` and `tags` combine: entries must have all (tag_mode "all") or any of them.
+    """
+    query = db.query(Entry).options(*entry_load_options(fields)).filter(Entry.user_id == user_id)
+
     if project_id:
         query = query.filter(Entry.project_id == project_id)
-    
+
     if date_from:
         query = query.filter(Entry.date >= date_from)
-    
+
     if date_to:
         query = query.filter(Entry.date <= date_to)
-    
+
     if search:
-        search_filter = or_(
-            Entry.title.ilike(f"%{search}%"),
-            Entry.body.ilike(f"%{search}%")
-        )
-        query = query.filter(search_filter)
-    
-    if tag:
-        # Filter by tag name
-        query = query.join(Entry.tags).filter(Tag.name == tag)
-    
-    return query.order_by(Entry.date.desc(), Entry.created_at.desc()).all()
+        from app.services.search import search_predicate
+        query = query.filter(search_predicate(db, user_id, search))
+
+    names = tag_names(tag, tags)
+    if names:
+        query = query.filter(tag_predicate(user_id, names, tag_mode))
+
+    if cursor:
+        query = query.filter(_after_cursor(db, cursor))
+
+    return query.order_by(Entry.date.desc(), _created_at_key(db).desc(), Entry.id.desc())
+
+
+def filter_entries(
+    db: Session,
+    user_id: int,
+    project_id: Optional[int] = None,
+    tag: Optional[str] = None,
+    search: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    fields: Optional[Sequence[str]] = None,
+    tags: Sequence[str] = (),
+    tag_mode: str = "all"
+) -> List[Entry]:
+    """Filter entries based on various criteria."""
+    return build_entries_query(
+        db, user_id,
+        project_id=project_id,
+        tag=tag,
+        search=search,
+        date_from=date_from,
+        date_to=date_to,
+        fields=fields,
+        tags=tags,
+        tag_mode=tag_mode
+    ).all()
 
 
+def get_entries_page(
+    db: Session,
+    user_id: int,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    **filters
+) -> Tuple[List[Entry], Optional[str]]:
+    """Get one page of entries and the cursor for the next page (None on the last page)."""
+    rows = build_entries_query(db, user_id, cursor=cursor, **filters).limit(limit + 1).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+
+def stream_entries(
+    db: Session,
+    user_id: int,
+    cursor: Optional[str] = None,
+    batch_size: int = STREAM_BATCH_SIZE,
+    **filters
+) -> Iterator[Entry]:
+    """Yield entries in list order, fetching them from a server-side cursor in batches."""
+    query = build_entries_query(db, user_id, cursor=cursor, **filters)
+    yield from query.yield_per(batch_size)
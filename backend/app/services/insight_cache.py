@@ -0,0 +1,108 @@
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
+from datetime import date
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Sequence
+import json
+from app.core.cache import MemoryCacheBackend, RedisCacheBackend
+from app.core.config import settings
+
+# Counters outlive cached values; losing one only costs a miss (see MemoryCacheBackend)
+COUNTER_TTL_SECONDS = 7 * 24 * 3600
+
+# Dependency names. Every cached value depends on the user's epoch, bumped by
+# writes whose footprint is not tied to dates (deleting a project or tag).
+EPOCH = "epoch"
+ALL_ENTRIES = "entries"
+TAGS = "tags"  # the tag list itself; tags created by entry writes also bump ALL_ENTRIES
+PROJECTS = "projects"  # the project list itself
+
+
+def month_key(day: date) -> str:
+    return f"m:{day.year:04d}-{day.month:02d}"
+
+
+def months_between(start: date, end: date) -> List[str]:
+    """Dependency names for every month overlapping [start, end]."""
+    months = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        months.append(f"m:{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+class InsightCache:
+    """Cache for derived per-user data (calendar aggregates, trends, summaries).
+
+    Values are keyed by user, kind and parameters, plus the current counter of
+    every dependency they were computed from: one per calendar month they read,
+    or ALL_ENTRIES for whole-history aggregates. A write bumps the counters of
+    what it touched (e.g. the months of an edited entry's old and new dates), so
+    only the values depending on those change keys; the rest keep hitting.
+    """
+
+    def __init__(self, backend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Call into the backend, on a worker thread if it does network I/O (Redis)."""
+        if getattr(self.backend, "blocking", False):
+            return await run_in_threadpool(fn, *args)
+        return fn(*args)
+
+    def _counter_keys(self, user_id: int, dependencies: Iterable[str]) -> List[str]:
+        return [f"gen:{user_id}:{name}" for name in dependencies]
+
+    async def key(self, user_id: int, kind: str, params: Sequence[Any], dependencies: Sequence[str]) -> str:
+        names = [EPOCH, *dependencies]
+        counters = await self._run(self.backend.get_counters, self._counter_keys(user_id, names))
+        return f"insight:{user_id}:{kind}:{json.dumps(jsonable_encoder(list(params)))}:{'.'.join(map(str, counters))}"
+
+    async def get_or_compute(
+        self,
+        user_id: int,
+        kind: str,
+        params: Sequence[Any],
+        dependencies: Sequence[str],
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Return the cached value, or compute, store and return it.
+
+        Values are stored in JSON-compatible form, so hits look the same
+        whichever backend is in use.
+        """
+        key = await self.key(user_id, kind, params, dependencies)
+        value = await self._run(self.backend.get, key)
+        if value is None:
+            value = jsonable_encoder(await compute())
+            await self._run(self.backend.set, key, value, self.ttl)
+        return value
+
+    def _incr_all(self, counter_keys: List[str]) -> None:
+        for counter_key in counter_keys:
+            self.backend.incr(counter_key)
+
+    async def invalidate(self, user_id: int, dependencies: Iterable[str]) -> None:
+        await self._run(self._incr_all, self._counter_keys(user_id, dependencies))
+
+    async def invalidate_entry_dates(self, user_id: int, dates: Iterable[Optional[date]]) -> None:
+        """Call after committing entry writes, with the old and new dates of every touched entry."""
+        months = {month_key(day) for day in dates if day is not None}
+        await self.invalidate(user_id, [ALL_ENTRIES, *sorted(months)])
+
+    async def invalidate_user(self, user_id: int) -> None:
+        """Drop everything cached for a user."""
+        await self.invalidate(user_id, [EPOCH])
+
+
+def create_backend():
+    if settings.INSIGHT_CACHE_BACKEND == "redis":
+        return RedisCacheBackend.from_url(settings.REDIS_URL, counter_ttl=COUNTER_TTL_SECONDS)
+    return MemoryCacheBackend(maxsize=settings.INSIGHT_CACHE_MAX_SIZE, counter_ttl=COUNTER_TTL_SECONDS)
+
+
+insight_cache = InsightCache(
+    create_backend(),
+    ttl=settings.INSIGHT_CACHE_TTL_SECONDS if settings.INSIGHT_CACHE_BACKEND != "none" else 0,
+)
@@ -1,69 +1,213 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, cast, literal, select, update, Date, Float, Integer
+from sqlalchemy.dialects import postgresql, sqlite
 from datetime import date, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Optional, Iterable, NamedTuple
 from app.db.models.entry import Entry
+from app.db.models.user_summary import UserSummary
+from app.db.models.daily_rollup import DailyRollup
+from app.services.rollups import apply_rollup_changes
 
+# Distinct entry dates scanned per pass when looking for the current streak
+STREAK_TAIL_DAYS = 64
 
-def calculate_streak(db: Session, user_id: int) -> int:
-    """Calculate the current streak of consecutive days with entries."""
-    # Get all unique entry dates for the user, ordered by date descending
-    entry_dates = db.query(Entry.date).filter(
-        Entry.user_id == user_id
-    ).distinct().order_by(Entry.date.desc()).all()
-    
-    if not entry_dates:
+
+def _day_number(db: Session, column):
+    """Integer day number of a date column, for consecutive-day arithmetic in SQL."""
+    if db.get_bind().dialect.name == "postgresql":
+        return column - literal(date(1970, 1, 1), Date)
+    return cast(func.julianday(column), Integer)
+
+
+def latest_streak_span(
+    db: Session,
+    user_id: int,
+    until: Optional[date] = None
+) -> Optional[Tuple[date, date]]:
+    """Find the most recent run of consecutive entry days as (first_day, last_day).
+
+    Gaps-and-islands: within a run, day_number + row_number (counting back from
+    the newest date) is constant. Only the newest `tail` distinct dates are
+    scanned; the tail is widened only if the whole window is one run.
+    """
+    tail = STREAK_TAIL_DAYS
+    while True:
+        dates = db.query(Entry.date.label("date")).filter(Entry.user_id == user_id)
+        if until is not None:
+            dates = dates.filter(Entry.date <= until)
+        dates = dates.distinct().order_by(Entry.date.desc()).limit(tail).subquery()
+
+        islands = db.query(
+            dates.c.date,
+            (_day_number(db, dates.c.date) + func.row_number().over(order_by=dates.c.date.desc())).label("island")
+        ).subquery()
+
+        row = db.query(
+            func.min(islands.c.date).label("first_day"),
+            func.max(islands.c.date).label("last_day"),
+            func.count().label("days")
+        ).group_by(islands.c.island).order_by(func.max(islands.c.date).desc()).first()
+
+        if row is None:
+            return None
+        if row.days < tail:
+            return row.first_day, row.last_day
+        tail *= 4
+
+
+def calculate_streak(db: Session, user_id: int, today: Optional[date] = None) -> int:
+    """Calculate the current streak of consecutive days with entries.
+
+    The streak counts back from today, or from yesterday if there is no entry today yet.
+    """
+    today = today or date.today()
+    span = latest_streak_span(db, user_id, until=today)
+    if span is None or span[1] < today - timedelta(days=1):
         return 0
-    
-    # Convert to list of dates
-    dates = [row.date for row in entry_dates]
-    
-    # Check if today or yesterday has an entry
-    today = date.today()
-    yesterday = today - timedelta(days=1)
-    
-    streak = 0
-    current_date = today
-    
-    # If today has an entry, start from today
-    # Otherwise, if yesterday has an entry, start from yesterday
-    if today in dates:
-        check_date = today
-    elif yesterday in dates:
-        check_date = yesterday
-        streak = 1
-        current_date = yesterday
-    else:
+    return (span[1] - span[0]).days + 1
+
+
+class EntryStats(NamedTuple):
+    """The fields of an entry that feed the user summary and daily rollups."""
+    date: date
+    mood: int
+    focus_score: Optional[int]
+    project_id: Optional[int] = None
+
+
+def entry_stats(entry: Entry) -> EntryStats:
+    return EntryStats(entry.date, entry.mood, entry.focus_score, entry.project_id)
+
+
+def _refresh_streak(db: Session, summary: UserSummary) -> None:
+    span = latest_streak_span(db, summary.user_id)
+    summary.streak_start, summary.last_entry_date = span if span else (None, None)
+
+
+def _ensure_summary_row(db: Session, user_id: int) -> UserSummary:
+    """The user's summary row, inserted if missing.
+
+    The insert ignores conflicts, so concurrent first requests for the same
+    user both end up with the one row instead of a primary-key error.
+    """
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    db.execute(dialect.insert(UserSummary.__table__).values(user_id=user_id).on_conflict_do_nothing(
+        index_elements=[UserSummary.__table__.c.user_id]
+    ))
+    return db.get(UserSummary, user_id, populate_existing=True)
+
+
+def rebuild_user_summary(db: Session, user_id: int) -> UserSummary:
+    """Recompute the user's summary row from scratch."""
+    db.flush()
+    summary = _ensure_summary_row(db, user_id)
+
+    totals = db.query(
+        func.count(Entry.id).label('total_entries'),
+        func.coalesce(func.sum(Entry.mood), 0).label('mood_sum'),
+        func.count(Entry.mood).label('mood_count'),
+        func.coalesce(func.sum(Entry.focus_score), 0).label('focus_sum'),
+        func.count(Entry.focus_score).label('focus_count'),
+        func.min(Entry.date).label('first_entry_date')
+    ).filter(Entry.user_id == user_id).one()
+
+    summary.total_entries = totals.total_entries
+    summary.mood_sum = totals.mood_sum
+    summary.mood_count = totals.mood_count
+    summary.focus_sum = totals.focus_sum
+    summary.focus_count = totals.focus_count
+    summary.first_entry_date = totals.first_entry_date
+    _refresh_streak(db, summary)
+    return summary
+
+
+def record_entry_changes(
+    db: Session,
+    user_id: int,
+    removed: Iterable[EntryStats] = (),
+    added: Iterable[EntryStats] = ()
+) -> UserSummary:
+    """Apply entry writes to the user's summary row and daily rollups. Call after the write, before commit.
+
+    An update is a removal of the old values plus an addition of the new ones.
+    The streak and first entry date are recomputed from the entries, so the
+    transaction must hold the user's write lock (bump_data_version, called
+    first) or a concurrent write on a neighbouring day could be missed.
+    """
+    removed, added = list(removed), list(added)
+    db.flush()
+    apply_rollup_changes(db, user_id, removed=removed, added=added)
+    if db.get(UserSummary, user_id) is None:
+        # A fresh rebuild already reflects the flushed write
+        return rebuild_user_summary(db, user_id)
+
+    # Relative SQL updates, not read-modify-write: overlapping requests or imports all count
+    deltas = [0] * 5  # total_entries, mood_sum, mood_count, focus_sum, focus_count
+    for stats, sign in [*((stats, -1) for stats in removed), *((stats, 1) for stats in added)]:
+        focused = stats.focus_score is not None
+        for i, value in enumerate((1, stats.mood, 1, stats.focus_score or 0, focused)):
+            deltas[i] += sign * value
+
+    span = latest_streak_span(db, user_id)
+    streak_start, last_entry_date = span if span else (None, None)
+    db.execute(
+        update(UserSummary).where(UserSummary.user_id == user_id).values(
+            total_entries=UserSummary.total_entries + deltas[0],
+            mood_sum=UserSummary.mood_sum + deltas[1],
+            mood_count=UserSummary.mood_count + deltas[2],
+            focus_sum=UserSummary.focus_sum + deltas[3],
+            focus_count=UserSummary.focus_count + deltas[4],
+            # An index lookup on (user_id, date)
+            first_entry_date=select(func.min(Entry.date)).where(Entry.user_id == user_id).scalar_subquery(),
+            streak_start=streak_start,
+            last_entry_date=last_entry_date
+        ).execution_options(synchronize_session=False)
+    )
+    return db.get(UserSummary, user_id, populate_existing=True)
+
+
+def get_user_summary(db: Session, user_id: int) -> UserSummary:
+    """Get the user's summary row, building it on first use."""
+    summary = db.get(UserSummary, user_id)
+    if summary is None:
+        # Users who have not written since the summary table was introduced
+        summary = rebuild_user_summary(db, user_id)
+        db.commit()
+    return summary
+
+
+def streak_from_summary(db: Session, summary: UserSummary, today: Optional[date] = None) -> int:
+    """Current streak from a summary row, without scanning entries."""
+    today = today or date.today()
+    if summary.last_entry_date is None or summary.last_entry_date < today - timedelta(days=1):
         return 0
-    
-    # Count consecutive days
-    for entry_date in dates:
-        if entry_date == current_date:
-            streak += 1
-            current_date -= timedelta(days=1)
-        elif entry_date < current_date:
-            # Gap found, streak is broken
-            break
-    
-    return streak
+    if summary.last_entry_date > today:
+        # Entries dated in the future: the stored run may not be the one covering today
+        return calculate_streak(db, summary.user_id, today=today)
+    return (summary.last_entry_date - summary.streak_start).days + 1
+
+
+def get_streak(db: Session, user_id: int, today: Optional[date] = None) -> int:
+    """Current streak from the maintained summary row (a primary-key lookup)."""
+    return streak_from_summary(db, get_user_summary(db, user_id), today=today)
 
 
 def get_mood_trend(db: Session, user_id: int, days: int = 30) -> List[Dict]:
-    """Get mood trend data for the last N days."""
+    """Get mood trend data for the last N days, from the daily rollups."""
     today = date.today()
     # Include up to "tomorrow" so entries dated "today" in timezones ahead of server are included
     end_date = today + timedelta(days=1)
     start_date = today - timedelta(days=days)
     
     results = db.query(
-        Entry.date,
-        func.avg(Entry.mood).label('average_mood'),
-        func.count(Entry.id).label('entry_count')
+        DailyRollup.date,
+        (cast(func.sum(DailyRollup.mood_sum), Float) / func.sum(DailyRollup.entry_count)).label('average_mood'),
+        func.sum(DailyRollup.entry_count).label('entry_count')
     ).filter(
-        Entry.user_id == user_id,
-        Entry.date >= start_date,
-        Entry.date <= end_date
-    ).group_by(Entry.date).order_by(Entry.date).all()
+        DailyRollup.user_id == user_id,
+        DailyRollup.date >= start_date,
+        DailyRollup.date <= end_date
+    ).group_by(DailyRollup.date).order_by(DailyRollup.date).all()
     
     return [
         {
@@ -76,24 +220,14 @@ def get_mood_trend(db: Session, user_id: int, days: int = 30) -> List[Dict]:
 
 
 def get_summary(db: Session, user_id: int) -> Dict:
-    """Get summary statistics for the user."""
-    # Total entry count
-    total_entries = db.query(func.count(Entry.id)).filter(
-        Entry.user_id == user_id
-    ).scalar()
-    
-    # Average mood (overall)
-    avg_mood = db.query(func.avg(Entry.mood)).filter(
-        Entry.user_id == user_id
-    ).scalar()
-    
-    # Streak
-    streak = calculate_streak(db, user_id)
+    """Get summary statistics for the user from the maintained summary row."""
+    summary = get_user_summary(db, user_id)
     
     return {
-        'total_entries': total_entries or 0,
-        'average_mood': float(avg_mood) if avg_mood else None,
-        'streak': streak
+        'total_entries': summary.total_entries,
+        'average_mood': summary.mood_sum / summary.mood_count if summary.mood_count else None,
+        'average_focus': summary.focus_sum / summary.focus_count if summary.focus_count else None,
+        'first_entry_date': summary.first_entry_date.isoformat() if summary.first_entry_date else None,
+        'last_entry_date': summary.last_entry_date.isoformat() if summary.last_entry_date else None,
+        'streak': streak_from_summary(db, summary)
     }
-
-
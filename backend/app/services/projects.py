@@ -0,0 +1,58 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, and_, case, cast, Float
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from app.db.models.project import Project
+from app.db.models.daily_rollup import DailyRollup
+from app.services.trends import bucket_start
+
+SPARKLINE_WEEKS = 12
+
+
+def sparkline_weeks(today: date) -> List[date]:
+    """Monday of each of the last SPARKLINE_WEEKS weeks, oldest first, ending with this week."""
+    this_week = bucket_start(today, "week")
+    return [this_week - timedelta(weeks=SPARKLINE_WEEKS - 1 - i) for i in range(SPARKLINE_WEEKS)]
+
+
+def get_project_activity(db: Session, user_id: int, today: Optional[date] = None) -> List[Dict]:
+    """Every project of the user with its entry count, last entry date, average mood
+    and weekly entry counts for the sparkline, newest project first.
+
+    One grouped query over the daily rollups; each sparkline week is a
+    conditional sum, so no per-project or per-week queries are needed.
+    """
+    weeks = sparkline_weeks(today or date.today())
+    entry_count = func.coalesce(func.sum(DailyRollup.entry_count), 0)
+    weekly = [
+        func.coalesce(func.sum(case(
+            (and_(DailyRollup.date >= start, DailyRollup.date < start + timedelta(weeks=1)), DailyRollup.entry_count),
+            else_=0
+        )), 0).label(f"week_{i}")
+        for i, start in enumerate(weeks)
+    ]
+    query = select(
+        Project.id,
+        Project.user_id,
+        Project.name,
+        Project.description,
+        Project.created_at,
+        entry_count.label("entry_count"),
+        func.max(DailyRollup.date).label("last_entry_date"),
+        (cast(func.sum(DailyRollup.mood_sum), Float) / func.sum(DailyRollup.entry_count)).label("average_mood"),
+        *weekly
+    ).select_from(Project).outerjoin(
+        DailyRollup,
+        and_(DailyRollup.user_id == Project.user_id, DailyRollup.project_id == Project.id)
+    ).where(
+        Project.user_id == user_id
+    ).group_by(
+        Project.id, Project.user_id, Project.name, Project.description, Project.created_at
+    ).order_by(Project.created_at.desc(), Project.id.desc())
+
+    projects = []
+    for row in db.execute(query):
+        fields = dict(row._mapping)
+        counts = [fields.pop(f"week_{i}") for i in range(len(weeks))]
+        projects.append({**fields, "sparkline_start": weeks[0], "weekly_entries": counts})
+    return projects
@@ -0,0 +1,125 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, delete, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from datetime import date
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from app.db.models.entry import Entry
+from app.db.models.daily_rollup import DailyRollup, NO_PROJECT
+
+ROLLUP_COLUMNS = ("entry_count", "mood_sum", "focus_sum", "focus_count")
+
+RollupKey = Tuple[date, int]
+
+
+class RollupMismatch(NamedTuple):
+    date: date
+    project_id: int
+    expected: Tuple[int, int, int, int]  # ROLLUP_COLUMNS, from entries
+    actual: Tuple[int, int, int, int]  # ROLLUP_COLUMNS, from daily_rollups
+
+
+def _delta(stats, sign: int) -> Tuple[RollupKey, List[int]]:
+    key = (stats.date, stats.project_id or NO_PROJECT)
+    focused = stats.focus_score is not None
+    return key, [sign, sign * stats.mood, sign * (stats.focus_score or 0), sign * focused]
+
+
+def _apply_deltas(db: Session, user_id: int, deltas: Dict[RollupKey, List[int]]) -> None:
+    """Add deltas to the rollup rows, creating missing rows and dropping emptied ones."""
+    rows = [
+        {"user_id": user_id, "date": day, "project_id": project_id, **dict(zip(ROLLUP_COLUMNS, values))}
+        for (day, project_id), values in sorted(deltas.items())
+        if any(values)
+    ]
+    if not rows:
+        return
+
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    # Increments happen in SQL, so concurrent writers to the same day never lose an update
+    table = DailyRollup.__table__
+    stmt = dialect.insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.date, table.c.project_id],
+        set_={name: table.c[name] + stmt.excluded[name] for name in ROLLUP_COLUMNS}
+    )
+    db.execute(stmt, rows)
+    db.execute(
+        delete(DailyRollup).where(
+            DailyRollup.user_id == user_id,
+            DailyRollup.date.in_({row["date"] for row in rows}),
+            DailyRollup.entry_count <= 0
+        )
+    )
+
+
+def apply_rollup_changes(db: Session, user_id: int, removed: Iterable = (), added: Iterable = ()) -> None:
+    """Apply entry writes (as EntryStats) to the user's daily rollups, in the caller's transaction.
+
+    An update is a removal of the old values plus an addition of the new ones,
+    which moves totals between days or projects; unchanged keys cancel out.
+    """
+    deltas: Dict[RollupKey, List[int]] = {}
+    for stats, sign in [*((stats, -1) for stats in removed), *((stats, 1) for stats in added)]:
+        key, values = _delta(stats, sign)
+        totals = deltas.setdefault(key, [0] * len(ROLLUP_COLUMNS))
+        for i, value in enumerate(values):
+            totals[i] += value
+    _apply_deltas(db, user_id, deltas)
+
+
+def move_project_rollups(db: Session, user_id: int, project_id: int, to_project_id: int = NO_PROJECT) -> None:
+    """Reassign a project's rollups, e.g. to NO_PROJECT when deleting the project detaches its entries."""
+    deltas: Dict[RollupKey, List[int]] = {}
+    for row in db.execute(
+        select(DailyRollup.date, *(getattr(DailyRollup, name) for name in ROLLUP_COLUMNS)).where(
+            DailyRollup.user_id == user_id,
+            DailyRollup.project_id == project_id
+        )
+    ):
+        day, *values = row
+        deltas[(day, project_id)] = [-value for value in values]
+        deltas[(day, to_project_id)] = list(values)
+    _apply_deltas(db, user_id, deltas)
+
+
+def _entry_totals(user_id: int):
+    """The rollups a user's entries add up to, as a SELECT matching DailyRollup's columns."""
+    return select(
+        Entry.user_id,
+        Entry.date,
+        func.coalesce(Entry.project_id, NO_PROJECT).label("project_id"),
+        func.count(Entry.id).label("entry_count"),
+        func.sum(Entry.mood).label("mood_sum"),
+        func.coalesce(func.sum(Entry.focus_score), 0).label("focus_sum"),
+        func.count(Entry.focus_score).label("focus_count"),
+    ).where(Entry.user_id == user_id).group_by(
+        Entry.user_id, Entry.date, func.coalesce(Entry.project_id, NO_PROJECT)
+    )
+
+
+def rebuild_rollups(db: Session, user_id: int) -> None:
+    """Recompute the user's rollups from scratch. Call before commit."""
+    db.flush()
+    db.execute(delete(DailyRollup).where(DailyRollup.user_id == user_id))
+    db.execute(
+        insert(DailyRollup).from_select(["user_id", "date", "project_id", *ROLLUP_COLUMNS], _entry_totals(user_id))
+    )
+
+
+def check_rollups(db: Session, user_id: int, limit: Optional[int] = None) -> List[RollupMismatch]:
+    """Compare the user's rollups with their entries. Returns the rows that differ, by date."""
+    expected = {
+        (row.date, row.project_id): tuple(getattr(row, name) for name in ROLLUP_COLUMNS)
+        for row in db.execute(_entry_totals(user_id))
+    }
+    actual = {
+        (row.date, row.project_id): tuple(getattr(row, name) for name in ROLLUP_COLUMNS)
+        for row in db.execute(select(DailyRollup.__table__).where(DailyRollup.user_id == user_id))
+    }
+    empty = (0,) * len(ROLLUP_COLUMNS)
+    mismatches = [
+        RollupMismatch(day, project_id, expected.get((day, project_id), empty), actual.get((day, project_id), empty))
+        for day, project_id in sorted(expected.keys() | actual.keys())
+        if expected.get((day, project_id)) != actual.get((day, project_id))
+    ]
+    return mismatches[:limit] if limit is not None else mismatches
@@ -0,0 +1,222 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, literal_column
+from typing import Optional, List, Dict, Tuple
+from bisect import bisect_left
+from functools import reduce
+import html
+import re
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.models.entry import Entry
+from app.services.entries import entry_load_options
+from app.services.versions import get_data_version
+
+SEARCH_CONFIG = "english"
+# ts_headline marks matches with private-use characters; the snippet is
+# HTML-escaped before they are swapped for <mark> tags
+MARK_START, MARK_STOP = "\ue000", "\ue001"
+HEADLINE_OPTIONS = f"StartSel={MARK_START}, StopSel={MARK_STOP}, MaxWords=35, MinWords=15, MaxFragments=1"
+SNIPPET_RADIUS = 12
+DEFAULT_SEARCH_LIMIT = 20
+
+# Field weights mirror ts_rank's defaults for the A/B/C labels set by the migration
+FIELD_WEIGHTS = (("title", 1.0), ("body", 0.4), ("looking_ahead", 0.2))
+
+# Generated tsvector column, only present on PostgreSQL (see migration b2c41d7e9a10)
+search_vector = literal_column("entries.search_vector")
+
+# Runs of Unicode letters and digits (\w without the underscore)
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+# Per-process fallback indexes, as {user_id: (data_version, InvertedIndex)}.
+# Every write bumps the user's data version, so a stale index is never used.
+search_index_cache = TTLCache(
+    maxsize=settings.SEARCH_INDEX_CACHE_MAX_SIZE,
+    ttl=settings.INSIGHT_CACHE_TTL_SECONDS,
+)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into lowercase tokens of letters and digits, in any script."""
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def stem(token: str) -> str:
+    """Light suffix stripping so the fallback roughly tracks Postgres' english stemmer."""
+    for suffix in ("ing", "ed", "es", "s", "e"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)]
+    return token
+
+
+def query_terms(q: str) -> List[str]:
+    """Distinct query words, in order. Every term must match (as a word prefix)."""
+    return list(dict.fromkeys(tokenize(q)))
+
+
+def uses_fulltext_index(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _tsquery(terms: List[str]):
+    """Prefix query requiring every term.
+
+    Each term is quoted with quote_literal in SQL, so to_tsquery reads it as
+    one lexeme to prefix-match, whatever characters it contains.
+    """
+    queries = [func.to_tsquery(SEARCH_CONFIG, func.concat(func.quote_literal(term), ":*")) for term in terms]
+    return reduce(lambda left, right: left.op("&&")(right), queries)
+
+
+def _document(title: Optional[str], body: Optional[str], looking_ahead: Optional[str]) -> str:
+    return " ".join(part for part in (title, body, looking_ahead) if part)
+
+
+class InvertedIndex:
+    """In-memory inverted index over a user's entries.
+
+    Used when the database has no full-text support (SQLite test runs). Matching
+    and ranking follow the Postgres path: every query term must prefix-match a
+    stemmed word, and scores add up the field weights of each match.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self._vocabulary: Optional[List[str]] = None
+
+    @classmethod
+    def for_user(cls, db: Session, user_id: int) -> "InvertedIndex":
+        index = cls()
+        rows = db.query(Entry.id, Entry.title, Entry.body, Entry.looking_ahead).filter(
+            Entry.user_id == user_id
+        ).all()
+        for row in rows:
+            index.add(row.id, title=row.title, body=row.body, looking_ahead=row.looking_ahead)
+        return index
+
+    @classmethod
+    def cached_for_user(cls, db: Session, user_id: int) -> "InvertedIndex":
+        """The user's index, rebuilt only when their data version has moved on."""
+        version = get_data_version(db, user_id)
+        cached = search_index_cache.get(user_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        index = cls.for_user(db, user_id)
+        search_index_cache.set(user_id, (version, index))
+        return index
+
+    def add(self, entry_id: int, **fields: Optional[str]) -> None:
+        for field, weight in FIELD_WEIGHTS:
+            for token in tokenize(fields.get(field)):
+                postings = self.postings.setdefault(stem(token), {})
+                postings[entry_id] = postings.get(entry_id, 0.0) + weight
+        self._vocabulary = None
+
+    def _expand(self, term: str) -> List[str]:
+        """All indexed words that start with the (stemmed) term."""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        prefix = stem(term)
+        start = bisect_left(self._vocabulary, prefix)
+        matches = []
+        for word in self._vocabulary[start:]:
+            if not word.startswith(prefix):
+                break
+            matches.append(word)
+        return matches
+
+    def search(self, terms: List[str]) -> Dict[int, float]:
+        """Return {entry_id: score} for entries matching every term."""
+        scores: Optional[Dict[int, float]] = None
+        for term in terms:
+            term_scores: Dict[int, float] = {}
+            for word in self._expand(term):
+                for entry_id, weight in self.postings[word].items():
+                    term_scores[entry_id] = term_scores.get(entry_id, 0.0) + weight
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {
+                    entry_id: score + term_scores[entry_id]
+                    for entry_id, score in scores.items()
+                    if entry_id in term_scores
+                }
+            if not scores:
+                return {}
+        return scores or {}
+
+
+def escape_headline(headline: Optional[str]) -> Optional[str]:
+    """HTML-escape a ts_headline result, then turn its match markers into <mark> tags."""
+    if headline is None:
+        return None
+    return html.escape(headline).replace(MARK_START, "<mark>").replace(MARK_STOP, "</mark>")
+
+
+def make_snippet(text: str, terms: List[str], radius: int = SNIPPET_RADIUS) -> Optional[str]:
+    """Highlight matching words with <mark> around the first match, like ts_headline.
+
+    The entry text is HTML-escaped, so only the <mark> tags are markup.
+    """
+    words = text.split()
+    if not words:
+        return None
+    prefixes = [stem(term) for term in terms]
+
+    def matches(word: str) -> bool:
+        return any(stem(token).startswith(prefix) for token in tokenize(word) for prefix in prefixes)
+
+    first = next((i for i, word in enumerate(words) if matches(word)), 0)
+    start = max(0, first - radius)
+    window = words[start:first + radius + 1]
+    return " ".join(
+        f"<mark>{html.escape(word)}</mark>" if matches(word) else html.escape(word) for word in window
+    )
+
+
+def search_predicate(db: Session, user_id: int, q: str):
+    """WHERE clause matching entries for a search string, for use in list filters."""
+    terms = query_terms(q)
+    if not terms:
+        return Entry.id.is_(None)
+    if uses_fulltext_index(db):
+        return search_vector.op("@@")(_tsquery(terms))
+    return Entry.id.in_(list(InvertedIndex.cached_for_user(db, user_id).search(terms)))
+
+
+def search_entries(
+    db: Session,
+    user_id: int,
+    q: str,
+    limit: int = DEFAULT_SEARCH_LIMIT
+) -> List[Tuple[Entry, float, Optional[str]]]:
+    """Ranked full-text search over title, body and looking_ahead.
+
+    Returns (entry, rank, snippet) tuples, best match first.
+    """
+    terms = query_terms(q)
+    if not terms:
+        return []
+
+    if uses_fulltext_index(db):
+        tsquery = _tsquery(terms)
+        rank = func.ts_rank(search_vector, tsquery).label("rank")
+        document = func.concat_ws(" ", Entry.title, Entry.body, Entry.looking_ahead)
+        snippet = func.ts_headline(SEARCH_CONFIG, document, tsquery, HEADLINE_OPTIONS).label("snippet")
+        rows = db.query(Entry, rank, snippet).options(*entry_load_options()).filter(
+            Entry.user_id == user_id,
+            search_vector.op("@@")(tsquery)
+        ).order_by(rank.desc(), Entry.date.desc(), Entry.id.desc()).limit(limit).all()
+        return [(row[0], float(row.rank), escape_headline(row.snippet)) for row in rows]
+
+    scores = InvertedIndex.cached_for_user(db, user_id).search(terms)
+    if not scores:
+        return []
+    entries = db.query(Entry).options(*entry_load_options()).filter(
+        Entry.id.in_(list(scores))
+    ).all()
+    entries.sort(key=lambda e: (scores[e.id], e.date, e.id), reverse=True)
+    return [
+        (entry, scores[entry.id], make_snippet(_document(entry.title, entry.body, entry.looking_ahead), terms))
+        for entry in entries[:limit]
+    ]
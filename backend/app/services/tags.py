@@ -0,0 +1,206 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, select, delete, func, and_
+from sqlalchemy.dialects import postgresql, sqlite
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+import heapq
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.models.entry import Entry
+from app.db.models.tag import Tag
+from app.db.models.entry_tag import entry_tags
+
+tags_table = Tag.__table__
+
+# Sorts after any character a tag name will contain, bounding prefix ranges
+MAX_CHAR = "\U0010ffff"
+
+# Per-process sorted tag arrays for autocomplete, keyed by the insight cache
+# key of the data they were built from (so writes invalidate them everywhere)
+tag_index_cache = TTLCache(
+    maxsize=settings.TAG_INDEX_CACHE_MAX_SIZE,
+    ttl=settings.INSIGHT_CACHE_TTL_SECONDS,
+)
+
+
+def _unique(names: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(names))
+
+
+def _insert_missing_tags(db: Session, user_id: int, names: List[str]) -> Dict[str, int]:
+    """Insert tags in one statement, skipping any that a concurrent writer created."""
+    rows = [{"user_id": user_id, "name": name} for name in names]
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        stmt = postgresql.insert(tags_table).values(rows).on_conflict_do_nothing(
+            constraint="unique_user_tag"
+        )
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(tags_table).values(rows).on_conflict_do_nothing(
+            index_elements=["user_id", "name"]
+        )
+    else:
+        stmt = insert(tags_table).values(rows)
+
+    result = db.execute(stmt.returning(tags_table.c.id, tags_table.c.name))
+    return {row.name: row.id for row in result}
+
+
+def resolve_tags(db: Session, user_id: int, names: Iterable[str]) -> Dict[str, int]:
+    """Map tag names to ids for a user, creating missing tags.
+
+    Costs one SELECT for the existing tags and one multi-row upsert for the rest,
+    however many names are passed.
+    """
+    names = _unique(names)
+    if not names:
+        return {}
+
+    tag_ids = {
+        row.name: row.id
+        for row in db.execute(
+            select(tags_table.c.id, tags_table.c.name).where(
+                tags_table.c.user_id == user_id,
+                tags_table.c.name.in_(names)
+            )
+        )
+    }
+
+    missing = [name for name in names if name not in tag_ids]
+    if missing:
+        tag_ids.update(_insert_missing_tags(db, user_id, missing))
+        # Lost an insert race: the conflicting rows exist now, so read them back
+        raced = [name for name in missing if name not in tag_ids]
+        if raced:
+            tag_ids.update(resolve_tags(db, user_id, raced))
+
+    return tag_ids
+
+
+def add_entry_tags(db: Session, user_id: int, tags_by_entry: Mapping[int, Iterable[str]]) -> None:
+    """Attach tags to entries that have none yet, e.g. freshly created ones.
+
+    All names are resolved together and the associations are written with a
+    single multi-row insert.
+    """
+    tags_by_entry = {entry_id: _unique(names) for entry_id, names in tags_by_entry.items()}
+    tag_ids = resolve_tags(db, user_id, (name for names in tags_by_entry.values() for name in names))
+
+    rows = [
+        {"entry_id": entry_id, "tag_id": tag_ids[name]}
+        for entry_id, names in tags_by_entry.items()
+        for name in names
+    ]
+    if rows:
+        db.execute(insert(entry_tags), rows)
+
+
+def set_entry_tags(db: Session, user_id: int, entry_id: int, names: Iterable[str]) -> None:
+    """Make an entry's tags exactly `names`, touching only associations that change."""
+    wanted = set(resolve_tags(db, user_id, names).values())
+    current = set(db.scalars(
+        select(entry_tags.c.tag_id).where(entry_tags.c.entry_id == entry_id)
+    ))
+
+    to_remove = current - wanted
+    if to_remove:
+        db.execute(
+            delete(entry_tags).where(
+                entry_tags.c.entry_id == entry_id,
+                entry_tags.c.tag_id.in_(to_remove)
+            )
+        )
+
+    to_add = wanted - current
+    if to_add:
+        db.execute(
+            insert(entry_tags),
+            [{"entry_id": entry_id, "tag_id": tag_id} for tag_id in sorted(to_add)]
+        )
+
+
+def _prefix_predicate(db: Session, prefix: str):
+    """Case-insensitive prefix match that can use the (user_id, lower(name)) index.
+
+    PostgreSQL's index uses text_pattern_ops, which serves LIKE 'prefix%'; SQLite
+    compares bytewise, so a range on lower(name) is an exact prefix match there.
+    """
+    lowered = func.lower(Tag.name)
+    prefix = prefix.lower()
+    if db.get_bind().dialect.name == "postgresql":
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return lowered.like(escaped + "%", escape="\\")
+    return and_(lowered >= prefix, lowered < prefix + MAX_CHAR)
+
+
+def get_tag_stats(
+    db: Session,
+    user_id: int,
+    prefix: Optional[str] = None,
+    limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Tags with their usage count and last-used entry date, most used first.
+
+    One aggregated query; each tag's entries are read through the
+    (tag_id, entry_id) index. `prefix` narrows to names starting with it,
+    ignoring case.
+    """
+    usage_count = func.count(entry_tags.c.entry_id)
+    query = select(
+        Tag.id,
+        Tag.name,
+        usage_count.label("usage_count"),
+        func.max(Entry.date).label("last_used")
+    ).select_from(Tag).outerjoin(
+        entry_tags, entry_tags.c.tag_id == Tag.id
+    ).outerjoin(
+        Entry, Entry.id == entry_tags.c.entry_id
+    ).where(Tag.user_id == user_id)
+    if prefix:
+        query = query.where(_prefix_predicate(db, prefix))
+    query = query.group_by(Tag.id, Tag.name).order_by(usage_count.desc(), Tag.name)
+    if limit is not None:
+        query = query.limit(limit)
+    return [dict(row._mapping) for row in db.execute(query)]
+
+
+def _by_usage(stats: Mapping[str, Any]):
+    return -stats["usage_count"], stats["name"]
+
+
+class TagIndex:
+    """A user's tag stats sorted by lowercase name, answering prefix queries by bisection.
+
+    Narrow prefixes take the top k of the bisected range; broad ones walk the
+    tags in usage order and stop at the k-th match. Either way typeahead needs
+    no database round trip once the index is built.
+    """
+
+    def __init__(self, stats: Sequence[Mapping[str, Any]]):
+        self.stats = sorted(stats, key=lambda tag: (tag["name"].lower(), tag["name"]))
+        self.keys = [tag["name"].lower() for tag in self.stats]
+        # Positions in self.stats, most used first
+        self.by_usage = sorted(range(len(self.stats)), key=lambda i: _by_usage(self.stats[i]))
+
+    def __len__(self) -> int:
+        return len(self.stats)
+
+    def complete(self, prefix: str, limit: int) -> List[Mapping[str, Any]]:
+        """The `limit` most used tags starting with `prefix` (ignoring case), ties by name."""
+        prefix = prefix.lower()
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_right(self.keys, prefix + MAX_CHAR, lo)
+        matches = hi - lo
+        if matches <= limit:
+            return sorted(self.stats[lo:hi], key=_by_usage)
+        if limit * len(self.stats) < matches * matches:
+            # Expected scan length is about limit * len / matches
+            found = []
+            for i in self.by_usage:
+                if lo <= i < hi:
+                    found.append(self.stats[i])
+                    if len(found) == limit:
+                        break
+            return found
+        return heapq.nsmallest(limit, self.stats[lo:hi], key=_by_usage)
@@ -0,0 +1,215 @@
+from anyio import from_thread
+from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from pydantic import ValidationError
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Tuple, TextIO
+import codecs
+import csv
+import io
+import json
+from app.db.models.entry import Entry
+from app.db.models.project import Project
+from app.schemas.entry import EntryCreate
+from app.services.entries import stream_entries
+from app.services.tags import add_entry_tags
+from app.services.insights import record_entry_changes, EntryStats
+from app.services.versions import bump_data_version
+from app.services.insight_cache import insight_cache
+
+IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+CSV_TAG_SEPARATOR = ";"
+EXPORT_FIELDS = [
+    "id", "date", "title", "body", "looking_ahead", "mood", "focus_score",
+    "project_id", "tags", "created_at", "updated_at"
+]
+
+entries_table = Entry.__table__
+
+
+def is_utf8(file: BinaryIO, chunk_size: int = 1 << 16) -> bool:
+    """Check a seekable upload decodes as UTF-8, in bounded chunks, and rewind it.
+
+    Imports commit batch by batch, so a decode error must be found before the
+    first batch rather than partway through the file.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        while chunk := file.read(chunk_size):
+            decoder.decode(chunk)
+        decoder.decode(b"", final=True)
+        return True
+    except UnicodeDecodeError:
+        return False
+    finally:
+        file.seek(0)
+
+
+def parse_jsonl(stream: TextIO) -> Iterator[Tuple[int, Any]]:
+    """Yield (line_number, object) per non-blank line; unparseable lines yield the error."""
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_number, ValueError(f"Invalid JSON: {exc.msg}")
+
+
+def parse_csv(stream: TextIO) -> Iterator[Tuple[int, Any]]:
+    """Yield (line_number, row) for a CSV with a header row. Tags are ';'-separated."""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        row = {key: (value if value != "" else None) for key, value in row.items() if key}
+        tags = row.pop("tags", None)
+        row["tags"] = [tag.strip() for tag in tags.split(CSV_TAG_SEPARATOR) if tag.strip()] if tags else []
+        yield reader.line_num, row
+
+
+def _describe(exc: Exception) -> str:
+    if isinstance(exc, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+            for error in exc.errors()
+        )
+    return str(exc)
+
+
+def _insert_batch(db: Session, user_id: int, batch: List[Tuple[int, EntryCreate]]) -> None:
+    """Insert one batch of validated rows and their tags in a single transaction."""
+    bump_data_version(db, user_id)
+    rows = [
+        {
+            "user_id": user_id,
+            "project_id": data.project_id,
+            "date": data.date,
+            "title": data.title,
+            "body": data.body,
+            "looking_ahead": data.looking_ahead,
+            "mood": data.mood,
+            "focus_score": data.focus_score,
+        }
+        for _, data in batch
+    ]
+    result = db.execute(
+        insert(entries_table).returning(entries_table.c.id, sort_by_parameter_order=True),
+        rows
+    )
+    entry_ids = result.scalars().all()
+    add_entry_tags(db, user_id, {
+        entry_id: data.tags
+        for entry_id, (_, data) in zip(entry_ids, batch)
+        if data.tags
+    })
+    record_entry_changes(db, user_id, added=[
+        EntryStats(data.date, data.mood, data.focus_score, data.project_id) for _, data in batch
+    ])
+    db.commit()
+    from_thread.run(insight_cache.invalidate_entry_dates, user_id, [data.date for _, data in batch])
+
+
+def import_entries(
+    db: Session,
+    user_id: int,
+    rows: Iterable[Tuple[int, Any]],
+    batch_size: int = IMPORT_BATCH_SIZE
+) -> Dict:
+    """Validate and insert parsed rows in bounded batches.
+
+    Each batch is committed on its own, so a failing batch only loses its own
+    rows. Returns counts plus per-row errors keyed by line number. Blocks; run
+    it in a worker thread (run_in_threadpool), which it calls back into the
+    event loop from to invalidate cached insights.
+    """
+    project_ids = {
+        project_id for (project_id,) in
+        db.query(Project.id).filter(Project.user_id == user_id)
+    }
+    imported = 0
+    failed = 0
+    errors: List[Dict] = []
+
+    def record_error(line: int, message: str) -> None:
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"line": line, "error": message})
+
+    def flush(batch: List[Tuple[int, EntryCreate]]) -> None:
+        nonlocal imported
+        if not batch:
+            return
+        try:
+            _insert_batch(db, user_id, batch)
+            imported += len(batch)
+        except SQLAlchemyError as exc:
+            db.rollback()
+            message = f"Database error: {exc.__class__.__name__}"
+            for line, _ in batch:
+                record_error(line, message)
+
+    batch: List[Tuple[int, EntryCreate]] = []
+    for line, raw in rows:
+        try:
+            if isinstance(raw, Exception):
+                raise raw
+            if not isinstance(raw, dict):
+                raise ValueError("Expected an object")
+            data = EntryCreate.model_validate(raw)
+            if data.project_id and data.project_id not in project_ids:
+                raise ValueError("Project not found")
+        except (ValueError, ValidationError) as exc:
+            record_error(line, _describe(exc))
+            continue
+
+        batch.append((line, data))
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    flush(batch)
+
+    return {"imported": imported, "failed": failed, "errors": errors}
+
+
+def export_record(entry: Entry) -> Dict:
+    """Flat, re-importable representation of an entry."""
+    return {
+        "id": entry.id,
+        "date": entry.date.isoformat(),
+        "title": entry.title,
+        "body": entry.body,
+        "looking_ahead": entry.looking_ahead,
+        "mood": entry.mood,
+        "focus_score": entry.focus_score,
+        "project_id": entry.project_id,
+        "tags": [tag.name for tag in entry.tags],
+        "created_at": entry.created_at.isoformat() if entry.created_at else None,
+        "updated_at": entry.updated_at.isoformat() if entry.updated_at else None,
+    }
+
+
+def export_jsonl(db: Session, user_id: int) -> Iterator[str]:
+    """Yield the user's entries as JSON lines, fetching them in batches."""
+    for entry in stream_entries(db, user_id):
+        yield json.dumps(export_record(entry)) + "\n"
+
+
+def export_csv(db: Session, user_id: int) -> Iterator[str]:
+    """Yield the user's entries as CSV chunks, header first."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+
+    def drain() -> str:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    writer.writeheader()
+    yield drain()
+    for entry in stream_entries(db, user_id):
+        record = export_record(entry)
+        record["tags"] = CSV_TAG_SEPARATOR.join(record["tags"])
+        writer.writerow(record)
+        yield drain()
@@ -0,0 +1,254 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+from app.db.models.entry import Entry
+from app.db.models.entry_tag import entry_tags
+from app.db.models.daily_rollup import DailyRollup, NO_PROJECT
+from app.db.models.project import Project
+from app.db.models.tag import Tag
+
+BUCKETS = ("day", "week", "month")
+METRICS = ("mood", "focus")
+GROUPS = ("project", "tag")
+
+# Per-bucket totals: entries, mood sum, mood count, focus sum, focus count
+ENTRIES, MOOD_SUM, MOOD_COUNT, FOCUS_SUM, FOCUS_COUNT = range(5)
+
+
+def bucket_start(day: date, bucket: str) -> date:
+    """First day of the bucket containing `day`. Weeks start on Monday."""
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def shift_buckets(start: date, bucket: str, count: int) -> date:
+    """Start of the bucket `count` buckets after (or before, if negative) the one starting at `start`."""
+    if bucket == "week":
+        return start + timedelta(weeks=count)
+    if bucket == "month":
+        months = start.year * 12 + start.month - 1 + count
+        return date(months // 12, months % 12 + 1, 1)
+    return start + timedelta(days=count)
+
+
+def bucket_index(day: date, first: date, bucket: str) -> int:
+    """Position of `day`'s bucket, counting from the bucket starting at `first`."""
+    if bucket == "week":
+        return (bucket_start(day, bucket) - first).days // 7
+    if bucket == "month":
+        return (day.year - first.year) * 12 + day.month - first.month
+    return (day - first).days
+
+
+def trend_window(start: date, end: date, bucket: str, window: int) -> Tuple[date, date]:
+    """Dates to read for a trend over [start, end]: widened to whole buckets, plus
+    the `window - 1` buckets before it, so the first rolling averages are complete.
+
+    The last bucket is cut short at date.max. Raises ValueError if the rolling
+    window would need buckets before date.min.
+    """
+    try:
+        first = shift_buckets(bucket_start(start, bucket), bucket, -(window - 1))
+    except (OverflowError, ValueError) as exc:
+        raise ValueError("The rolling window reaches back before the first supported date") from exc
+    try:
+        last = shift_buckets(bucket_start(end, bucket), bucket, 1) - timedelta(days=1)
+    except (OverflowError, ValueError):
+        last = date.max
+    return first, last
+
+
+def lttb(xs: Sequence[float], ys: Sequence[float], threshold: int) -> List[int]:
+    """Largest-Triangle-Three-Buckets downsampling. Returns the indices of the points to keep.
+
+    Keeps the first and last point, and from each of `threshold - 2` equal slices
+    in between the point forming the largest triangle with the previously kept
+    point and the average of the next slice, which preserves peaks and troughs.
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    kept = [0]
+    size = (n - 2) / (threshold - 2)
+    previous = 0
+    for i in range(threshold - 2):
+        start = int(i * size) + 1
+        stop = int((i + 1) * size) + 1
+        next_start, next_stop = stop, min(int((i + 2) * size) + 1, n)
+        avg_x = sum(xs[next_start:next_stop]) / (next_stop - next_start)
+        avg_y = sum(ys[next_start:next_stop]) / (next_stop - next_start)
+
+        ax, ay = xs[previous], ys[previous]
+        best, best_area = start, -1.0
+        for j in range(start, stop):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        previous = best
+    kept.append(n - 1)
+    return kept
+
+
+def _daily_totals(
+    db: Session,
+    user_id: int,
+    start: date,
+    end: date,
+    group_by: Optional[str] = None
+):
+    """Per-day totals in [start, end] as (key, date, entries, mood sum/count, focus sum/count) rows.
+
+    The key is the project or tag id when grouping (an entry counts towards each
+    of its tags), otherwise None. Overall and per-project totals come from the
+    daily rollups; per-tag totals from the entries.
+    """
+    if group_by == "tag":
+        key = entry_tags.c.tag_id
+        query = db.query(
+            key,
+            Entry.date,
+            func.count(Entry.id),
+            func.sum(Entry.mood),
+            func.count(Entry.mood),
+            func.sum(Entry.focus_score),
+            func.count(Entry.focus_score),
+        ).join(entry_tags, entry_tags.c.entry_id == Entry.id).filter(
+            Entry.user_id == user_id,
+            Entry.date >= start,
+            Entry.date <= end
+        ).group_by(key, Entry.date)
+        return [tuple(row) for row in query]
+
+    columns = [
+        DailyRollup.date,
+        func.sum(DailyRollup.entry_count),
+        func.sum(DailyRollup.mood_sum),
+        func.sum(DailyRollup.entry_count),  # every entry has a mood
+        func.sum(DailyRollup.focus_sum),
+        func.sum(DailyRollup.focus_count),
+    ]
+    filters = [DailyRollup.user_id == user_id, DailyRollup.date >= start, DailyRollup.date <= end]
+    if group_by == "project":
+        query = db.query(DailyRollup.project_id, *columns).filter(
+            *filters, DailyRollup.project_id != NO_PROJECT
+        ).group_by(DailyRollup.project_id, DailyRollup.date)
+        return [tuple(row) for row in query]
+    return [(None, *row) for row in db.query(*columns).filter(*filters).group_by(DailyRollup.date)]
+
+
+def _series_points(
+    totals: List[List[int]],
+    first: date,
+    bucket: str,
+    window: int,
+    skip: int
+) -> List[Dict]:
+    """Gap-filled points with per-bucket and rolling (entry-weighted) averages.
+
+    One pass over prefix sums; the first `skip` buckets only feed the rolling window.
+    """
+    prefix = [[0] * 5]
+    for bucket_totals in totals:
+        prefix.append([a + b for a, b in zip(prefix[-1], bucket_totals)])
+
+    def average(sums: List[int], total: int, count: int) -> Optional[float]:
+        return sums[total] / sums[count] if sums[count] else None
+
+    points = []
+    for i in range(skip, len(totals)):
+        rolling = [a - b for a, b in zip(prefix[i + 1], prefix[max(0, i + 1 - window)])]
+        current = totals[i]
+        points.append({
+            "date": shift_buckets(first, bucket, i).isoformat(),
+            "entry_count": current[ENTRIES],
+            "average_mood": average(current, MOOD_SUM, MOOD_COUNT),
+            "average_focus": average(current, FOCUS_SUM, FOCUS_COUNT),
+            "rolling_mood": average(rolling, MOOD_SUM, MOOD_COUNT),
+            "rolling_focus": average(rolling, FOCUS_SUM, FOCUS_COUNT),
+        })
+    return points
+
+
+def downsample(points: List[Dict], metric: str, max_points: int) -> Tuple[List[Dict], bool]:
+    """Reduce points to at most `max_points` with LTTB on the rolling `metric`.
+
+    Returns (points, downsampled). A downsampled series only keeps buckets that
+    have a value, since gaps can't be represented by a subset of points.
+    """
+    if len(points) <= max_points:
+        return points, False
+    field = f"rolling_{metric}"
+    valued = [(i, point[field]) for i, point in enumerate(points) if point[field] is not None]
+    if len(valued) <= max_points:
+        return [points[i] for i, _ in valued], True
+    kept = lttb([i for i, _ in valued], [value for _, value in valued], max_points)
+    return [points[valued[k][0]] for k in kept], True
+
+
+def get_trend(
+    db: Session,
+    user_id: int,
+    start: date,
+    end: date,
+    bucket: str = "day",
+    window: int = 1,
+    metric: str = "mood",
+    max_points: int = 365,
+    group_by: Optional[str] = None,
+    limit: int = 10
+) -> Dict:
+    """Mood and focus trend over [start, end] in day, week or month buckets.
+
+    Every bucket in the range is present (empty ones have an entry_count of 0 and
+    no averages). `rolling_*` averages cover the last `window` buckets, weighted
+    by entries, including buckets before `start`. Series longer than `max_points`
+    are downsampled with LTTB. With `group_by` ("project" or "tag"), also returns
+    one series for each of the `limit` projects or tags with most entries in range.
+    """
+    first, last = trend_window(start, end, bucket, window)
+    skip = window - 1
+    size = bucket_index(last, first, bucket) + 1
+
+    def build(rows) -> Dict[Optional[int], List[List[int]]]:
+        series: Dict[Optional[int], List[List[int]]] = {}
+        for key, day, *values in rows:
+            totals = series.setdefault(key, [[0] * 5 for _ in range(size)])
+            bucket_totals = totals[bucket_index(day, first, bucket)]
+            for field, value in enumerate(values):
+                bucket_totals[field] += value or 0
+        return series
+
+    def render(totals: List[List[int]]) -> Dict:
+        points, downsampled = downsample(_series_points(totals, first, bucket, window, skip), metric, max_points)
+        return {"downsampled": downsampled, "points": points}
+
+    empty = [[0] * 5 for _ in range(size)]
+    overall = build(_daily_totals(db, user_id, first, last)).get(None, empty)
+    result = {
+        "bucket": bucket,
+        "window": window,
+        "date_from": shift_buckets(first, bucket, skip).isoformat(),
+        "date_to": last.isoformat(),
+        **render(overall),
+    }
+
+    if group_by is not None:
+        grouped = build(_daily_totals(db, user_id, first, last, group_by))
+        entry_counts = {
+            key: sum(bucket_totals[ENTRIES] for bucket_totals in totals[skip:])
+            for key, totals in grouped.items()
+        }
+        top = sorted((key for key, count in entry_counts.items() if count), key=lambda key: (-entry_counts[key], key))[:limit]
+        model = Project if group_by == "project" else Tag
+        names = dict(db.query(model.id, model.name).filter(model.id.in_(top))) if top else {}
+        result["series"] = [
+            {"id": key, "name": names.get(key), "entry_count": entry_counts[key], **render(grouped[key])}
+            for key in top
+        ]
+    return result
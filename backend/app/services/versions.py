@@ -0,0 +1,27 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from typing import Optional
+from app.db.models.user import User
+
+users_table = User.__table__
+
+
+def bump_data_version(db: Session, user_id: int) -> None:
+    """Mark the user's data as changed. Call inside the writing transaction, before commit.
+
+    The increment happens in SQL, so concurrent writers never lose a bump. It
+    also locks the user's row until commit: entry writes call it first, before
+    reading anything, so one user's writes run one at a time and each reads
+    the state the previous one committed.
+    """
+    db.execute(
+        update(users_table).where(users_table.c.id == user_id).values(
+            data_version=users_table.c.data_version + 1,
+            # Diary writes are not account changes; keep users.updated_at as it is
+            updated_at=users_table.c.updated_at
+        )
+    )
+
+
+def get_data_version(db: Session, user_id: int) -> Optional[int]:
+    return db.scalar(select(users_table.c.data_version).where(users_table.c.id == user_id))
@@ -3,7 +3,19 @@ from fastapi.testclient import TestClient
 from app.main import app
 from app.db.session import SessionLocal
 from app.db.models.user import User
-from app.core.security import get_password_hash
+import asyncio
+import time
+from datetime import timedelta
+from app.core.security import (
+    get_password_hash,
+    create_access_token,
+    create_refresh_token,
+    decode_token,
+    token_cache,
+    PasswordHasherPool,
+    PasswordHashingBusy
+)
+from app.core.auth import principal_cache
 
 client = TestClient(app)
 
@@ -88,3 +100,77 @@ def test_get_me(test_user):
     assert response.status_code == 200
     assert response.json()["email"] == "test@example.com"
 
+
+def login_token():
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"email": "test@example.com", "password": "testpassword"}
+    )
+    return response.json()["access_token"]
+
+
+def test_principal_cache_skips_user_lookup(test_user):
+    principal_cache.clear()
+    headers = {"Authorization": f"Bearer {login_token()}"}
+    
+    hits = principal_cache.hits
+    assert client.get("/api/v1/tags", headers=headers).status_code == 200
+    assert client.get("/api/v1/tags", headers=headers).status_code == 200
+    assert principal_cache.hits == hits + 1
+
+
+def test_principal_cache_invalidated_on_password_change_and_delete(test_user, db):
+    principal_cache.clear()
+    headers = {"Authorization": f"Bearer {login_token()}"}
+    client.get("/api/v1/tags", headers=headers)
+    assert len(principal_cache) == 1
+    
+    test_user.password_hash = get_password_hash("newpassword")
+    db.commit()
+    assert len(principal_cache) == 0
+    
+    client.get("/api/v1/tags", headers=headers)
+    db.delete(test_user)
+    db.commit()
+    assert client.get("/api/v1/tags", headers=headers).status_code == 401
+
+
+def test_token_cache_hits_and_type_check():
+    token_cache.clear()
+    refresh = create_refresh_token(42)
+    
+    assert decode_token(refresh, token_type="refresh")["sub"] == "42"
+    hits = token_cache.hits
+    assert decode_token(refresh, token_type="refresh")["sub"] == "42"
+    assert token_cache.hits == hits + 1
+    
+    # A cached token is still rejected for the wrong type
+    assert decode_token(refresh, token_type="access") is None
+
+
+def test_token_cache_rejects_expired_tokens(monkeypatch):
+    token_cache.clear()
+    token = create_access_token(42, expires_delta=timedelta(minutes=1))
+    assert decode_token(token) is not None
+    
+    # Still cached, but past its exp
+    later = time.time() + 120
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert decode_token(token) is None
+    assert decode_token("not-a-jwt") is None
+
+
+def test_password_pool_runs_off_loop_and_limits_queue():
+    pool = PasswordHasherPool(workers=2, max_pending=2)
+    
+    async def hash_three():
+        return await asyncio.gather(
+            *(pool.run(get_password_hash, "secret") for _ in range(3)),
+            return_exceptions=True
+        )
+    
+    results = asyncio.run(hash_three())
+    assert sum(isinstance(r, str) for r in results) == 2
+    assert sum(isinstance(r, PasswordHashingBusy) for r in results) == 1
+    assert pool.stats()["completed"] == 2
+    assert pool.stats()["rejected"] == 1
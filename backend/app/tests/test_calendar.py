@@ -0,0 +1,138 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.db.session import SessionLocal
+from app.db.models.user import User
+from app.core.security import get_password_hash
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def test_user(db):
+    user = User(
+        email="test@example.com",
+        password_hash=get_password_hash("testpassword")
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def auth_token(test_user):
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"email": "test@example.com", "password": "testpassword"}
+    )
+    return response.json()["access_token"]
+
+
+def create_entry(auth_token, entry_date, mood=3):
+    client.post(
+        "/api/v1/entries",
+        json={"date": entry_date, "mood": mood},
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+
+
+def test_calendar_month_boundaries(auth_token):
+    for entry_date, mood in [("2024-11-30", 1), ("2024-12-01", 2), ("2024-12-01", 4), ("2024-12-31", 5), ("2025-01-01", 1)]:
+        create_entry(auth_token, entry_date, mood)
+    
+    response = client.get(
+        "/api/v1/calendar/month",
+        params={"year": 2024, "month": 12},
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+    assert response.status_code == 200
+    days = {day["date"]: day for day in response.json()["days"]}
+    assert len(days) == 31
+    assert days["2024-12-01"]["entry_count"] == 2
+    assert days["2024-12-01"]["average_mood"] == 3
+    assert days["2024-12-31"]["entry_count"] == 1
+    assert sum(day["entry_count"] for day in days.values()) == 3
+
+
+def test_calendar_month_rejects_invalid_month(auth_token):
+    response = client.get(
+        "/api/v1/calendar/month",
+        params={"year": 2024, "month": 13},
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+    assert response.status_code == 422
+
+
+def test_calendar_at_the_end_of_the_calendar(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    client.post("/api/v1/entries", json={"date": "9999-12-31", "mood": 4}, headers=headers)
+
+    response = client.get("/api/v1/calendar/month", params={"year": 9999, "month": 12}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["days"][-1]["entry_count"] == 1
+
+    response = client.get("/api/v1/calendar/range", params={"from": "9999-01-01", "to": "9999-12-31"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["entry_counts"] == [1]
+
+    response = client.get("/api/v1/calendar/month", params={"year": 10000, "month": 1}, headers=headers)
+    assert response.status_code == 422
+
+
+def test_calendar_range_columnar(auth_token):
+    for entry_date, mood in [("2024-12-31", 2), ("2025-01-02", 4), ("2025-01-02", 5), ("2025-03-01", 3)]:
+        create_entry(auth_token, entry_date, mood)
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    
+    response = client.get(
+        "/api/v1/calendar/range",
+        params={"from": "2025-01-01", "to": "2025-03-01"},
+        headers=headers
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "start": "2025-01-01",
+        "end": "2025-03-01",
+        "offsets": [1, 59],
+        "entry_counts": [2, 1],
+        "average_moods": [4.5, 3.0],
+    }
+    
+    year = client.get("/api/v1/calendar/year", params={"year": 2024}, headers=headers).json()
+    assert year["offsets"] == [365]
+    
+    too_long = client.get(
+        "/api/v1/calendar/range",
+        params={"from": "2024-01-01", "to": "2025-06-01"},
+        headers=headers
+    )
+    assert too_long.status_code == 400
+
+
+def test_calendar_filters_by_several_tags(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for tags, mood in ((["a", "b"], 2), (["a"], 4), (["b"], 5)):
+        client.post("/api/v1/entries", json={"date": "2025-01-10", "mood": mood, "tags": tags}, headers=headers)
+
+    def day(**params):
+        response = client.get(
+            "/api/v1/calendar/month", params={"year": 2025, "month": 1, **params}, headers=headers
+        )
+        assert response.status_code == 200
+        tenth = response.json()["days"][9]
+        return tenth["entry_count"], tenth["average_mood"]
+
+    assert day() == (3, pytest.approx(11 / 3))
+    assert day(tags="a,b") == (1, 2)
+    assert day(tags="a,b", tag_mode="any") == (3, pytest.approx(11 / 3))
+    assert day(tag="a") == (2, 3)
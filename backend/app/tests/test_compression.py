@@ -0,0 +1,100 @@
+import gzip
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.compression import choose_encoding
+from app.db.session import SessionLocal
+from app.db.models.user import User
+from app.core.security import get_password_hash
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def test_user(db):
+    user = User(
+        email="test@example.com",
+        password_hash=get_password_hash("testpassword")
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def auth_token(test_user):
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"email": "test@example.com", "password": "testpassword"}
+    )
+    return response.json()["access_token"]
+
+
+def create_entries(headers, count=20):
+    for day in range(1, count + 1):
+        client.post(
+            "/api/v1/entries",
+            json={"date": f"2025-01-{day:02d}", "title": f"Entry {day}", "body": "Worked on things. " * 10, "mood": 3},
+            headers=headers
+        )
+
+
+def test_large_json_is_gzipped(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    create_entries(headers)
+
+    identity = client.get("/api/v1/entries", headers={**headers, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+
+    with client.stream("GET", "/api/v1/entries", headers={**headers, "Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(raw) < len(identity.content)
+    assert gzip.decompress(raw) == identity.content
+    assert response.headers["etag"] == "W/" + identity.headers["etag"]
+
+    revalidated = client.get(
+        "/api/v1/entries",
+        headers={**headers, "Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
+
+
+def test_small_responses_are_not_compressed(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}", "Accept-Encoding": "gzip"}
+    response = client.get("/api/v1/entries", headers=headers)
+    assert response.json() == []
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_streamed_ndjson_is_compressed(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    create_entries(headers)
+
+    with client.stream(
+        "GET", "/api/v1/entries?stream=true", headers={**headers, "Accept-Encoding": "gzip"}
+    ) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert len(gzip.decompress(raw).splitlines()) == 20
+
+
+def test_choose_encoding():
+    assert choose_encoding("gzip, deflate", ("br", "gzip")) == "gzip"
+    assert choose_encoding("gzip;q=0.5, br", ("br", "gzip")) == "br"
+    assert choose_encoding("br;q=0, *", ("br", "gzip")) == "gzip"
+    assert choose_encoding("gzip;q=0", ("gzip",)) is None
+    assert choose_encoding("", ("gzip",)) is None
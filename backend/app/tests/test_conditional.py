@@ -0,0 +1,164 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.db.session import SessionLocal
+from app.db.models.user import User
+from app.core.security import get_password_hash
+from app.tests.utils import count_queries
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def test_user(db):
+    user = User(
+        email="test@example.com",
+        password_hash=get_password_hash("testpassword")
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def auth_token(test_user):
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"email": "test@example.com", "password": "testpassword"}
+    )
+    return response.json()["access_token"]
+
+
+def etag_of(path, headers, **params):
+    response = client.get(path, params=params, headers=headers)
+    assert response.status_code == 200
+    return response.headers["etag"]
+
+
+def assert_not_modified(path, headers, etag, **params):
+    response = client.get(path, params=params, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def assert_modified(path, headers, etag, **params):
+    response = client.get(path, params=params, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_not_modified_skips_the_endpoint_queries(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    client.post("/api/v1/entries", json={"date": "2025-01-01", "mood": 3}, headers=headers)
+    etag = etag_of("/api/v1/entries", headers)
+
+    with count_queries() as counter:
+        assert_not_modified("/api/v1/entries", headers, etag)
+    # only the data version lookup; the principal comes from cache
+    assert counter.count == 1
+
+    response = client.get("/api/v1/entries", headers={**headers, "If-None-Match": f'W/{etag.removeprefix("W/")}, "other"'})
+    assert response.status_code == 304
+
+
+def test_etag_depends_on_query(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    etag = etag_of("/api/v1/calendar/month", headers, year=2025, month=1)
+
+    assert etag_of("/api/v1/calendar/month", headers, year=2025, month=2) != etag
+    assert_not_modified("/api/v1/calendar/month", headers, etag, month=1, year=2025)
+
+
+def test_entry_writes_invalidate_dependent_reads(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    reads = [
+        ("/api/v1/entries", {}),
+        ("/api/v1/calendar/month", {"year": 2025, "month": 1}),
+        ("/api/v1/insights/summary", {}),
+        ("/api/v1/insights/mood-trend", {}),
+    ]
+
+    def snapshot():
+        return [etag_of(path, headers, **params) for path, params in reads]
+
+    etags = snapshot()
+    entry = client.post("/api/v1/entries", json={"date": "2025-01-01", "mood": 3}, headers=headers).json()
+    for (path, params), etag in zip(reads, etags):
+        assert_modified(path, headers, etag, **params)
+
+    etags = snapshot()
+    detail = etag_of(f"/api/v1/entries/{entry['id']}", headers)
+    client.put(f"/api/v1/entries/{entry['id']}", json={"mood": 5}, headers=headers)
+    for (path, params), etag in zip(reads, etags):
+        assert_modified(path, headers, etag, **params)
+    assert_modified(f"/api/v1/entries/{entry['id']}", headers, detail)
+
+    etags = snapshot()
+    client.delete(f"/api/v1/entries/{entry['id']}", headers=headers)
+    for (path, params), etag in zip(reads, etags):
+        assert_modified(path, headers, etag, **params)
+
+
+def test_project_and_tag_writes_invalidate(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    etag = etag_of("/api/v1/projects", headers)
+    project = client.post("/api/v1/projects", json={"name": "Diary"}, headers=headers).json()
+    assert_modified("/api/v1/projects", headers, etag)
+
+    etag = etag_of("/api/v1/projects", headers)
+    client.put(f"/api/v1/projects/{project['id']}", json={"name": "Renamed"}, headers=headers)
+    assert_modified("/api/v1/projects", headers, etag)
+
+    etag = etag_of("/api/v1/projects", headers)
+    client.delete(f"/api/v1/projects/{project['id']}", headers=headers)
+    assert_modified("/api/v1/projects", headers, etag)
+
+    etag = etag_of("/api/v1/tags", headers)
+    tag = client.post("/api/v1/tags", json={"name": "python"}, headers=headers).json()
+    assert_modified("/api/v1/tags", headers, etag)
+
+    etag = etag_of("/api/v1/tags", headers)
+    client.delete(f"/api/v1/tags/{tag['id']}", headers=headers)
+    assert_modified("/api/v1/tags", headers, etag)
+
+
+def test_import_invalidates(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    etag = etag_of("/api/v1/entries", headers)
+
+    client.post(
+        "/api/v1/entries/import",
+        files={"file": ("entries.jsonl", b'{"date": "2025-01-01", "mood": 4}\n')},
+        headers=headers
+    )
+    assert_modified("/api/v1/entries", headers, etag)
+
+
+def test_other_users_writes_do_not_invalidate(auth_token, db):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    etag = etag_of("/api/v1/entries", headers)
+
+    client.post("/api/v1/auth/register", json={"email": "other@example.com", "password": "otherpassword"})
+    other_token = client.post(
+        "/api/v1/auth/login",
+        json={"email": "other@example.com", "password": "otherpassword"}
+    ).json()["access_token"]
+    client.post(
+        "/api/v1/entries",
+        json={"date": "2025-01-01", "mood": 3},
+        headers={"Authorization": f"Bearer {other_token}"}
+    )
+
+    assert_not_modified("/api/v1/entries", headers, etag)
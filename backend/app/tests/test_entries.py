@@ -1,9 +1,17 @@
+import json
 import pytest
+from typing import List
+from fastapi.responses import JSONResponse
 from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
 from app.main import app
 from app.db.session import SessionLocal
 from app.db.models.user import User
 from app.core.security import get_password_hash
+from app.schemas.entry import EntryResponse
+from app.services.entries import filter_entries
+from app.services.transfer import IMPORT_BATCH_SIZE
+from app.tests.utils import count_queries
 
 client = TestClient(app)
 
@@ -155,3 +163,342 @@ def test_delete_entry(auth_token):
     )
     assert get_response.status_code == 404
 
+
+def test_get_entries_paginated(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for day in ["2025-01-25", "2025-01-26", "2025-01-26", "2025-01-27", "2025-01-27"]:
+        client.post(
+            "/api/v1/entries",
+            json={"date": day, "title": f"Entry {day}", "mood": 3},
+            headers=headers
+        )
+    
+    full = client.get("/api/v1/entries", headers=headers).json()
+    
+    # Walk the list two entries at a time following X-Next-Cursor
+    seen = []
+    params = {"limit": 2}
+    while True:
+        response = client.get("/api/v1/entries", params=params, headers=headers)
+        assert response.status_code == 200
+        assert len(response.json()) <= 2
+        seen.extend(entry["id"] for entry in response.json())
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if not next_cursor:
+            break
+        params = {"limit": 2, "cursor": next_cursor}
+    
+    assert seen == [entry["id"] for entry in full]
+
+
+def test_cursor_survives_deleted_anchor(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for i in range(5):
+        client.post("/api/v1/entries", json={"date": "2025-05-01", "title": f"Same day {i}", "mood": 3}, headers=headers)
+    full = [entry["id"] for entry in client.get("/api/v1/entries", headers=headers).json()]
+
+    response = client.get("/api/v1/entries", params={"limit": 2}, headers=headers)
+    assert [entry["id"] for entry in response.json()] == full[:2]
+    client.delete(f"/api/v1/entries/{full[1]}", headers=headers)
+
+    response = client.get(
+        "/api/v1/entries",
+        params={"limit": 10, "cursor": response.headers["X-Next-Cursor"]},
+        headers=headers
+    )
+    assert [entry["id"] for entry in response.json()] == full[2:]
+
+
+def test_get_entries_invalid_cursor(auth_token):
+    response = client.get(
+        "/api/v1/entries",
+        params={"cursor": "not-a-cursor"},
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+    assert response.status_code == 400
+
+
+def test_get_entries_stream(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for day in ["2025-01-26", "2025-01-27"]:
+        client.post(
+            "/api/v1/entries",
+            json={"date": day, "title": f"Entry {day}", "mood": 3},
+            headers=headers
+        )
+    
+    response = client.get("/api/v1/entries", params={"stream": "true"}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [entry["date"] for entry in lines] == ["2025-01-27", "2025-01-26"]
+
+    # A stream is never paged, so a limit would be silently ignored
+    response = client.get("/api/v1/entries", params={"stream": "true", "limit": 1}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_get_entries_constant_query_count(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    project = client.post(
+        "/api/v1/projects",
+        json={"name": "Query Count"},
+        headers=headers
+    ).json()
+    
+    def create_entries(count):
+        for i in range(count):
+            client.post(
+                "/api/v1/entries",
+                json={
+                    "date": "2025-01-27",
+                    "title": f"Entry {i}",
+                    "mood": 3,
+                    "project_id": project["id"],
+                    "tags": [f"tag-{i}", "shared"]
+                },
+                headers=headers
+            )
+    
+    def list_query_count():
+        with count_queries() as counter:
+            response = client.get("/api/v1/entries", headers=headers)
+        assert response.status_code == 200
+        return counter.count, len(response.json())
+    
+    create_entries(1)
+    few_queries, few_entries = list_query_count()
+    
+    create_entries(5)
+    many_queries, many_entries = list_query_count()
+    
+    assert many_entries > few_entries
+    assert many_queries == few_queries
+
+
+def test_entry_detail_query_count(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    entry = client.post(
+        "/api/v1/entries",
+        json={"date": "2025-01-27", "mood": 3, "tags": ["a", "b", "c"]},
+        headers=headers
+    ).json()
+    
+    with count_queries() as counter:
+        response = client.get(f"/api/v1/entries/{entry['id']}", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()["tags"]) == 3
+    # data version for the ETag, entry with joined project, tags; the user
+    # comes from the principal cache
+    assert counter.count == 3
+
+
+def test_update_entry_tags(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    entry = client.post(
+        "/api/v1/entries",
+        json={"date": "2025-01-27", "mood": 3, "tags": ["python", "sql"]},
+        headers=headers
+    ).json()
+    
+    response = client.put(
+        f"/api/v1/entries/{entry['id']}",
+        json={"tags": ["sql", "react", "react"]},
+        headers=headers
+    )
+    assert response.status_code == 200
+    assert sorted(tag["name"] for tag in response.json()["tags"]) == ["react", "sql"]
+    
+    # Existing tags are reused rather than duplicated
+    tags = client.get("/api/v1/tags", headers=headers).json()
+    assert sorted(tag["name"] for tag in tags) == ["python", "react", "sql"]
+
+
+def test_create_entry_tag_queries_constant(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    
+    def create_query_count(tags):
+        with count_queries() as counter:
+            response = client.post(
+                "/api/v1/entries",
+                json={"date": "2025-01-27", "mood": 3, "tags": tags},
+                headers=headers
+            )
+        assert response.status_code == 201
+        assert len(response.json()["tags"]) == len(tags)
+        return counter.count
+    
+    # Warm up so per-user bookkeeping rows already exist for both measurements
+    create_query_count(["warm-up"])
+    assert create_query_count(["one"]) == create_query_count([f"tag-{i}" for i in range(8)])
+
+
+def test_import_entries_jsonl(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    lines = [
+        json.dumps({"date": "2025-01-01", "title": "First", "mood": 4, "tags": ["import", "a"]}),
+        "{not json",
+        json.dumps({"date": "2025-01-02", "title": "Missing mood"}),
+        "",
+        json.dumps({"date": "2025-01-03", "title": "Third", "mood": 2, "tags": ["import"]}),
+        json.dumps({"date": "2025-01-04", "mood": 3, "project_id": 999}),
+    ]
+    
+    response = client.post(
+        "/api/v1/entries/import",
+        files={"file": ("entries.jsonl", "\n".join(lines).encode(), "application/x-ndjson")},
+        headers=headers
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert report["imported"] == 2
+    assert report["failed"] == 3
+    assert [error["line"] for error in report["errors"]] == [2, 3, 6]
+    
+    entries = client.get("/api/v1/entries", headers=headers).json()
+    assert [entry["title"] for entry in entries] == ["Third", "First"]
+    assert sorted(tag["name"] for tag in entries[1]["tags"]) == ["a", "import"]
+
+
+def test_import_rejects_non_utf8_before_committing(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    # More valid rows than one import batch, then an invalid byte
+    lines = [json.dumps({"date": "2025-02-01", "mood": 3}) for _ in range(IMPORT_BATCH_SIZE + 1)]
+    content = "\n".join(lines).encode() + b"\n\xff\n"
+
+    response = client.post(
+        "/api/v1/entries/import",
+        files={"file": ("entries.jsonl", content, "application/x-ndjson")},
+        headers=headers
+    )
+    assert response.status_code == 400
+    assert client.get("/api/v1/entries", headers=headers).json() == []
+
+
+def test_export_and_reimport_csv(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    client.post(
+        "/api/v1/entries",
+        json={"date": "2025-01-27", "title": "Exported, with comma", "mood": 4, "tags": ["x", "y"]},
+        headers=headers
+    )
+    
+    export = client.get("/api/v1/entries/export", params={"format": "csv"}, headers=headers)
+    assert export.status_code == 200
+    assert export.headers["content-type"].startswith("text/csv")
+    assert export.text.splitlines()[0].startswith("id,date,title")
+    
+    response = client.post(
+        "/api/v1/entries/import",
+        files={"file": ("entries.csv", export.content, "text/csv")},
+        headers=headers
+    )
+    assert response.json()["imported"] == 1
+    
+    exported = client.get("/api/v1/entries/export", headers=headers)
+    records = [json.loads(line) for line in exported.text.splitlines()]
+    assert len(records) == 2
+    assert all(record["title"] == "Exported, with comma" for record in records)
+    assert all(sorted(record["tags"]) == ["x", "y"] for record in records)
+
+
+def test_import_csv_with_byte_order_mark(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    content = "date,title,mood,tags\r\n2025-01-28,From Excel,4,a;b\r\n".encode("utf-8-sig")
+
+    response = client.post(
+        "/api/v1/entries/import",
+        files={"file": ("entries.csv", content, "text/csv")},
+        headers=headers
+    )
+    assert response.json() == {"imported": 1, "failed": 0, "errors": []}
+    [entry] = client.get("/api/v1/entries", headers=headers).json()
+    assert entry["title"] == "From Excel"
+
+
+def test_list_serialization_matches_response_model(auth_token, db):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    client.post(
+        "/api/v1/entries",
+        json={"date": "2025-02-01", "title": "Café ☕ \"quoted\"", "mood": 4, "tags": ["ünïcode"]},
+        headers=headers
+    )
+    client.post("/api/v1/entries", json={"date": "2025-02-02", "mood": 2}, headers=headers)
+
+    response = client.get("/api/v1/entries", headers=headers)
+    assert response.headers["content-type"] == "application/json"
+    assert "etag" in response.headers
+
+    user_id = db.query(User.id).filter(User.email == "test@example.com").scalar()
+    adapter = TypeAdapter(List[EntryResponse])
+    expected = JSONResponse(adapter.dump_python(
+        adapter.validate_python(filter_entries(db, user_id), from_attributes=True), mode="json"
+    )).body
+    assert response.content == expected
+
+
+def test_sparse_fieldset(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    body = "word " * 100
+    client.post(
+        "/api/v1/entries",
+        json={"date": "2025-03-01", "title": "Sparse", "body": body, "mood": 4, "tags": ["a"]},
+        headers=headers
+    )
+
+    response = client.get("/api/v1/entries?fields=id,date,title,mood,excerpt", headers=headers)
+    assert response.status_code == 200
+    [entry] = response.json()
+    assert set(entry) == {"id", "date", "title", "mood", "excerpt"}
+    assert entry["excerpt"].endswith("…")
+    assert len(entry["excerpt"]) <= 161
+    assert body.startswith(entry["excerpt"][:-1])
+
+    with count_queries() as queries:
+        response = client.get("/api/v1/entries?fields=title,tags", headers=headers)
+    [entry] = response.json()
+    assert set(entry) == {"title", "tags"}
+    assert [tag["name"] for tag in entry["tags"]] == ["a"]
+    assert not any("entries.body" in statement for statement in queries.statements)
+
+
+def test_sparse_fieldset_pagination_and_errors(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for day in (1, 2, 3):
+        client.post("/api/v1/entries", json={"date": f"2025-04-0{day}", "mood": day}, headers=headers)
+
+    response = client.get("/api/v1/entries?fields=mood&limit=2", headers=headers)
+    assert response.json() == [{"mood": 3}, {"mood": 2}]
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(f"/api/v1/entries?fields=mood&limit=2&cursor={cursor}", headers=headers)
+    assert response.json() == [{"mood": 1}]
+
+    streamed = client.get("/api/v1/entries?fields=date&stream=true", headers=headers)
+    assert [json.loads(line) for line in streamed.text.splitlines()] == [
+        {"date": "2025-04-03"}, {"date": "2025-04-02"}, {"date": "2025-04-01"}
+    ]
+
+    response = client.get("/api/v1/entries?fields=title,password_hash", headers=headers)
+    assert response.status_code == 400
+    assert "password_hash" in response.json()["detail"]
+
+
+def test_filter_by_several_tags(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for day, tags in ((1, ["a", "b"]), (2, ["a"]), (3, ["b", "c"]), (4, [])):
+        client.post("/api/v1/entries", json={"date": f"2025-05-0{day}", "mood": 3, "tags": tags}, headers=headers)
+
+    def dates(**params):
+        response = client.get("/api/v1/entries", params=params, headers=headers)
+        assert response.status_code == 200
+        return [entry["date"][-2:] for entry in response.json()]
+
+    assert dates(tags="a,b") == ["01"]
+    assert dates(tags="a,b", tag_mode="any") == ["03", "02", "01"]
+    assert dates(tags="a,missing") == []
+    assert dates(tags="a, missing", tag_mode="any") == ["02", "01"]
+    # The single-tag filter combines with the list
+    assert dates(tag="c", tags="b") == ["03"]
+    assert dates(tags="b", tag_mode="any", limit=1) == ["03"]
+    assert client.get("/api/v1/entries", params={"tags": "a", "tag_mode": "some"}, headers=headers).status_code == 422
@@ -0,0 +1,228 @@
+import fnmatch
+import threading
+import time
+import pytest
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.cache import MemoryCacheBackend, RedisCacheBackend
+from app.db.session import SessionLocal
+from app.db.models.user import User
+from app.core.security import get_password_hash
+from app.services.insight_cache import insight_cache, months_between
+from app.tests.utils import count_queries
+
+client = TestClient(app)
+
+
+class LocalRedis:
+    """In-process stand-in for the subset of the redis-py client the backend uses."""
+
+    def __init__(self):
+        self.data = {}
+        self.threads = set()
+
+    def _live(self, name):
+        item = self.data.get(name)
+        if item is not None and item[1] is not None and item[1] <= time.monotonic():
+            del self.data[name]
+            return None
+        return item
+
+    def get(self, name):
+        self.threads.add(threading.current_thread().name)
+        item = self._live(name)
+        return item[0] if item else None
+
+    def mget(self, names):
+        return [self.get(name) for name in names]
+
+    def set(self, name, value, ex=None, nx=False):
+        if nx and self._live(name) is not None:
+            return None
+        value = value if isinstance(value, bytes) else str(value).encode()
+        self.data[name] = (value, time.monotonic() + ex if ex else None)
+        return True
+
+    def incr(self, name):
+        item = self._live(name)
+        value = int(item[0]) + 1 if item else 1
+        self.data[name] = (str(value).encode(), item[1] if item else None)
+        return value
+
+    def pipeline(self):
+        client = self
+
+        class Pipeline:
+            def __init__(self):
+                self.calls = []
+
+            def __getattr__(self, method):
+                return lambda *args, **kwargs: self.calls.append((method, args, kwargs))
+
+            def execute(self):
+                return [getattr(client, method)(*args, **kwargs) for method, args, kwargs in self.calls]
+
+        return Pipeline()
+
+    def scan_iter(self, match):
+        return [name for name in list(self.data) if fnmatch.fnmatch(name, match)]
+
+    def delete(self, *names):
+        for name in names:
+            self.data.pop(name, None)
+
+
+@pytest.fixture(params=["memory", "redis"], autouse=True)
+def cache_backend(request, monkeypatch):
+    if request.param == "redis":
+        backend = RedisCacheBackend(LocalRedis(), counter_ttl=3600)
+    else:
+        backend = MemoryCacheBackend(maxsize=1000, counter_ttl=3600)
+    monkeypatch.setattr(insight_cache, "backend", backend)
+    monkeypatch.setattr(insight_cache, "ttl", 600)
+    return backend
+
+
+@pytest.fixture
+def db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def test_user(db):
+    user = User(
+        email="test@example.com",
+        password_hash=get_password_hash("testpassword")
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def auth_token(test_user):
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"email": "test@example.com", "password": "testpassword"}
+    )
+    return response.json()["access_token"]
+
+
+def queries_for(path, headers, **params):
+    """SQL statements a GET runs. A cache hit costs only the ETag version lookup."""
+    with count_queries() as counter:
+        response = client.get(path, params=params, headers=headers)
+    assert response.status_code == 200
+    return counter.count
+
+
+def test_months_between():
+    assert months_between(date(2024, 11, 15), date(2025, 2, 1)) == ["m:2024-11", "m:2024-12", "m:2025-01", "m:2025-02"]
+    assert months_between(date(2025, 3, 1), date(2025, 3, 31)) == ["m:2025-03"]
+
+
+def test_editing_an_entry_evicts_only_its_month(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    march = client.post("/api/v1/entries", json={"date": "2025-03-10", "mood": 2}, headers=headers).json()
+    client.post("/api/v1/entries", json={"date": "2025-05-10", "mood": 4}, headers=headers)
+
+    for month in (3, 5):
+        assert queries_for("/api/v1/calendar/month", headers, year=2025, month=month) > 1
+        assert queries_for("/api/v1/calendar/month", headers, year=2025, month=month) == 1
+    assert queries_for("/api/v1/calendar/month", headers, year=2025, month=3, project_id=0) > 1
+
+    client.put(f"/api/v1/entries/{march['id']}", json={"mood": 5}, headers=headers)
+
+    assert queries_for("/api/v1/calendar/month", headers, year=2025, month=5) == 1
+    assert queries_for("/api/v1/calendar/month", headers, year=2025, month=3) > 1
+    assert queries_for("/api/v1/calendar/month", headers, year=2025, month=3, project_id=0) > 1
+    days = client.get("/api/v1/calendar/month", params={"year": 2025, "month": 3}, headers=headers).json()["days"]
+    assert days[9]["average_mood"] == 5
+
+
+def test_moving_an_entry_evicts_old_and_new_months(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    entry = client.post("/api/v1/entries", json={"date": "2025-03-10", "mood": 2}, headers=headers).json()
+    for month in (3, 4, 5):
+        queries_for("/api/v1/calendar/month", headers, year=2025, month=month)
+
+    client.put(f"/api/v1/entries/{entry['id']}", json={"date": "2025-04-02"}, headers=headers)
+
+    assert queries_for("/api/v1/calendar/month", headers, year=2025, month=3) > 1
+    assert queries_for("/api/v1/calendar/month", headers, year=2025, month=4) > 1
+    assert queries_for("/api/v1/calendar/month", headers, year=2025, month=5) == 1
+    march = client.get("/api/v1/calendar/month", params={"year": 2025, "month": 3}, headers=headers).json()
+    assert sum(day["entry_count"] for day in march["days"]) == 0
+
+
+def test_year_and_range_views_follow_their_months(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    entry = client.post("/api/v1/entries", json={"date": "2024-12-20", "mood": 3}, headers=headers).json()
+    queries_for("/api/v1/calendar/year", headers, year=2024)
+    queries_for("/api/v1/calendar/year", headers, year=2023)
+    queries_for("/api/v1/calendar/range", headers, **{"from": "2025-01-01", "to": "2025-02-28"})
+
+    client.delete(f"/api/v1/entries/{entry['id']}", headers=headers)
+
+    assert queries_for("/api/v1/calendar/year", headers, year=2024) > 1
+    assert queries_for("/api/v1/calendar/year", headers, year=2023) == 1
+    assert queries_for("/api/v1/calendar/range", headers, **{"from": "2025-01-01", "to": "2025-02-28"}) == 1
+    assert client.get("/api/v1/calendar/year", params={"year": 2024}, headers=headers).json()["entry_counts"] == []
+
+
+def test_trend_windows_are_evicted_only_when_covered(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    today = date.today()
+    recent = client.post("/api/v1/entries", json={"date": today.isoformat(), "mood": 3}, headers=headers).json()
+    old = client.post("/api/v1/entries", json={"date": "2020-06-15", "mood": 3}, headers=headers).json()
+    queries_for("/api/v1/insights/mood-trend", headers, days=7)
+    queries_for("/api/v1/insights/summary", headers)
+
+    client.put(f"/api/v1/entries/{old['id']}", json={"mood": 1}, headers=headers)
+    assert queries_for("/api/v1/insights/mood-trend", headers, days=7) == 1
+    assert queries_for("/api/v1/insights/summary", headers) > 1
+
+    client.put(f"/api/v1/entries/{recent['id']}", json={"mood": 5}, headers=headers)
+    assert queries_for("/api/v1/insights/mood-trend", headers, days=7) > 1
+    trend = client.get("/api/v1/insights/mood-trend", params={"days": 7}, headers=headers).json()
+    assert trend[-1]["average_mood"] == 5
+
+
+def test_deleting_a_project_evicts_the_users_cache(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    project = client.post("/api/v1/projects", json={"name": "Diary"}, headers=headers).json()
+    client.post("/api/v1/entries", json={"date": "2025-03-10", "mood": 2, "project_id": project["id"]}, headers=headers)
+    params = {"year": 2025, "month": 3, "project_id": project["id"]}
+    queries_for("/api/v1/calendar/month", headers, **params)
+
+    client.delete(f"/api/v1/projects/{project['id']}", headers=headers)
+
+    assert queries_for("/api/v1/calendar/month", headers, **params) > 1
+    days = client.get("/api/v1/calendar/month", params=params, headers=headers).json()["days"]
+    assert sum(day["entry_count"] for day in days) == 0
+
+
+def test_lost_counters_never_resurrect_stale_values(cache_backend):
+    keys = ["gen:1:m:2025-03"]
+    first = cache_backend.get_counters(keys)
+    cache_backend.incr(keys[0])
+    assert cache_backend.get_counters(keys)[0] == first[0] + 1
+    cache_backend.clear()
+    assert cache_backend.get_counters(keys)[0] not in (first[0], first[0] + 1)
+
+
+def test_redis_calls_stay_off_the_event_loop(cache_backend, auth_token):
+    if not isinstance(cache_backend, RedisCacheBackend):
+        pytest.skip("only the redis backend blocks")
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    client.post("/api/v1/entries", json={"date": "2025-03-05", "mood": 3}, headers=headers)
+    client.get("/api/v1/calendar/month", params={"year": 2025, "month": 3}, headers=headers)
+
+    assert cache_backend.client.threads
+    assert all(name.startswith("AnyIO worker thread") for name in cache_backend.client.threads)
@@ -0,0 +1,283 @@
+import pytest
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+from app.main import app
+from app.db.session import SessionLocal
+from app.db.models.user import User
+from app.core.security import get_password_hash
+from app.services.insights import calculate_streak, rebuild_user_summary, record_entry_changes, get_user_summary, EntryStats
+from app.services.trends import lttb
+from app.api.insights import MAX_TREND_DAYS
+from app.schemas.entry import EntryCreate
+import app.api.entries as entries_api
+from app.tests.utils import count_queries
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def test_user(db):
+    user = User(
+        email="test@example.com",
+        password_hash=get_password_hash("testpassword")
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def auth_token(test_user):
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"email": "test@example.com", "password": "testpassword"}
+    )
+    return response.json()["access_token"]
+
+
+def days_ago(n):
+    return (date.today() - timedelta(days=n)).isoformat()
+
+
+def create_entry(auth_token, entry_date, mood=3):
+    response = client.post(
+        "/api/v1/entries",
+        json={"date": entry_date, "mood": mood},
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+    return response.json()
+
+
+def get_summary(auth_token):
+    response = client.get(
+        "/api/v1/insights/summary",
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_streak_counts_back_from_today(auth_token):
+    for n in [0, 1, 1, 2, 4]:
+        create_entry(auth_token, days_ago(n))
+    
+    assert get_summary(auth_token)["streak"] == 3
+
+
+def test_streak_starts_yesterday_without_entry_today(auth_token):
+    for n in [1, 2]:
+        create_entry(auth_token, days_ago(n))
+    
+    assert get_summary(auth_token)["streak"] == 2
+
+
+def test_streak_follows_updates_and_deletes(auth_token, test_user, db):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    entries = [create_entry(auth_token, days_ago(n)) for n in [0, 1, 2, 3]]
+    assert get_summary(auth_token)["streak"] == 4
+    
+    # Deleting a middle day splits the run
+    client.delete(f"/api/v1/entries/{entries[2]['id']}", headers=headers)
+    assert get_summary(auth_token)["streak"] == 2
+    
+    # Moving today's entry back fills the gap again, but today is now empty
+    client.put(f"/api/v1/entries/{entries[0]['id']}", json={"date": days_ago(2)}, headers=headers)
+    assert get_summary(auth_token)["streak"] == 3
+    assert calculate_streak(db, test_user.id) == 3
+
+
+def test_streak_ignores_old_entries(auth_token, test_user, db):
+    for n in [5, 6, 7]:
+        create_entry(auth_token, days_ago(n))
+    
+    assert get_summary(auth_token)["streak"] == 0
+    assert calculate_streak(db, test_user.id) == 0
+    assert calculate_streak(db, test_user.id, today=date.today() - timedelta(days=5)) == 3
+
+
+def test_summary_totals_track_writes(auth_token, test_user, db):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    first = client.post(
+        "/api/v1/entries",
+        json={"date": days_ago(10), "mood": 2, "focus_score": 6},
+        headers=headers
+    ).json()
+    second = create_entry(auth_token, days_ago(3), mood=4)
+    create_entry(auth_token, days_ago(0), mood=5)
+    
+    summary = get_summary(auth_token)
+    assert summary["total_entries"] == 3
+    assert summary["average_mood"] == pytest.approx(11 / 3)
+    assert summary["average_focus"] == 6
+    assert summary["first_entry_date"] == days_ago(10)
+    assert summary["last_entry_date"] == days_ago(0)
+    
+    client.put(f"/api/v1/entries/{second['id']}", json={"mood": 1}, headers=headers)
+    client.delete(f"/api/v1/entries/{first['id']}", headers=headers)
+    
+    summary = get_summary(auth_token)
+    assert summary["total_entries"] == 2
+    assert summary["average_mood"] == 3
+    assert summary["average_focus"] is None
+    assert summary["first_entry_date"] == days_ago(3)
+    
+    # The maintained row matches a rebuild from scratch
+    rebuilt = rebuild_user_summary(db, test_user.id)
+    assert (rebuilt.total_entries, rebuilt.mood_sum, rebuilt.first_entry_date) == (2, 6, date.today() - timedelta(days=3))
+
+
+def test_summary_counters_survive_interleaved_writers(db, test_user):
+    other = SessionLocal()
+    try:
+        # Both sessions hold the row before either writes
+        stale = get_user_summary(db, test_user.id)
+        get_user_summary(other, test_user.id)
+        assert stale.total_entries == 0
+
+        record_entry_changes(other, test_user.id, added=[EntryStats(date(2025, 1, 1), 4, 6)])
+        other.commit()
+        summary = record_entry_changes(db, test_user.id, added=[EntryStats(date(2025, 1, 2), 2, None)])
+        db.commit()
+    finally:
+        other.close()
+
+    assert (summary.total_entries, summary.mood_sum, summary.focus_sum, summary.focus_count) == (2, 6, 6, 1)
+
+
+def test_entry_writes_lock_the_user_first(db, test_user):
+    # The streak is recomputed inside the write, so the user's row lock must come
+    # before any read (SQLite serializes writers anyway; PostgreSQL needs the lock)
+    with count_queries() as queries:
+        entries_api._create_entry(db, test_user.id, EntryCreate(date=date.today(), mood=3))
+    assert queries.statements[0].lstrip().upper().startswith("UPDATE USERS")
+
+
+def get_trends(auth_token, **params):
+    response = client.get(
+        "/api/v1/insights/trends",
+        params=params,
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_trend_fills_gaps_and_rolls(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    client.post("/api/v1/entries", json={"date": "2025-01-01", "mood": 2, "focus_score": 4}, headers=headers)
+    client.post("/api/v1/entries", json={"date": "2025-01-01", "mood": 4}, headers=headers)
+    client.post("/api/v1/entries", json={"date": "2025-01-03", "mood": 5, "focus_score": 8}, headers=headers)
+
+    trend = get_trends(auth_token, **{"from": "2025-01-01", "to": "2025-01-04", "window": 3})
+    assert [point["date"] for point in trend["points"]] == ["2025-01-01", "2025-01-02", "2025-01-03", "2025-01-04"]
+    assert [point["entry_count"] for point in trend["points"]] == [2, 0, 1, 0]
+    assert [point["average_mood"] for point in trend["points"]] == [3, None, 5, None]
+    assert trend["points"][0]["average_focus"] == 4
+    # Entry-weighted over the last three days
+    assert [point["rolling_mood"] for point in trend["points"]] == [3, 3, pytest.approx(11 / 3), 5]
+    assert trend["points"][2]["rolling_focus"] == 6
+    assert not trend["downsampled"]
+
+
+def test_trend_buckets_and_lookback(auth_token):
+    for entry_date, mood in (("2024-12-30", 1), ("2025-01-05", 3), ("2025-01-06", 5), ("2025-02-10", 4)):
+        create_entry(auth_token, entry_date, mood=mood)
+
+    weekly = get_trends(auth_token, **{"from": "2025-01-01", "to": "2025-01-12", "bucket": "week", "window": 2})
+    # Widened to whole ISO weeks; the rolling window reaches back before 'from'
+    assert weekly["date_from"] == "2024-12-30"
+    assert [(point["date"], point["entry_count"]) for point in weekly["points"]] == [("2024-12-30", 2), ("2025-01-06", 1)]
+    assert weekly["points"][0]["rolling_mood"] == 2
+    assert weekly["points"][1]["rolling_mood"] == 3
+
+    monthly = get_trends(auth_token, **{"from": "2025-01-15", "to": "2025-03-01", "bucket": "month"})
+    assert [(point["date"], point["entry_count"]) for point in monthly["points"]] == [
+        ("2025-01-01", 2), ("2025-02-01", 1), ("2025-03-01", 0)
+    ]
+
+
+def test_trend_series_per_project_and_tag(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    project = client.post("/api/v1/projects", json={"name": "Compiler"}, headers=headers).json()
+    client.post(
+        "/api/v1/entries",
+        json={"date": "2025-01-01", "mood": 2, "project_id": project["id"], "tags": ["rust", "perf"]},
+        headers=headers
+    )
+    client.post("/api/v1/entries", json={"date": "2025-01-02", "mood": 4, "tags": ["rust"]}, headers=headers)
+
+    by_tag = get_trends(auth_token, **{"from": "2025-01-01", "to": "2025-01-02", "group_by": "tag"})
+    assert [(series["name"], series["entry_count"]) for series in by_tag["series"]] == [("rust", 2), ("perf", 1)]
+    assert [point["average_mood"] for point in by_tag["series"][1]["points"]] == [2, None]
+
+    by_project = get_trends(auth_token, **{"from": "2025-01-01", "to": "2025-01-02", "group_by": "project"})
+    [series] = by_project["series"]
+    assert (series["id"], series["name"]) == (project["id"], "Compiler")
+
+    client.put(f"/api/v1/projects/{project['id']}", json={"name": "Parser"}, headers=headers)
+    by_project = get_trends(auth_token, **{"from": "2025-01-01", "to": "2025-01-02", "group_by": "project"})
+    assert by_project["series"][0]["name"] == "Parser"
+
+
+def test_trend_downsamples_long_ranges(auth_token):
+    start = date(2020, 1, 1)
+    for offset in range(0, 1500, 25):
+        create_entry(auth_token, (start + timedelta(days=offset)).isoformat(), mood=1 + offset % 5)
+
+    trend = get_trends(auth_token, **{"from": "2020-01-01", "to": "2024-12-31", "max_points": 20, "window": 30})
+    assert trend["downsampled"]
+    assert len(trend["points"]) == 20
+    assert all(point["rolling_mood"] is not None for point in trend["points"])
+
+    response = client.get(
+        "/api/v1/insights/trends",
+        params={"from": "2025-01-02", "to": "2025-01-01"},
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+    assert response.status_code == 400
+
+
+def test_lttb_keeps_extremes():
+    ys = [0.0] * 100
+    ys[37], ys[71] = 10.0, -10.0
+    kept = lttb(list(range(100)), ys, 10)
+    assert len(kept) == 10
+    assert kept[0] == 0 and kept[-1] == 99
+    assert 37 in kept and 71 in kept
+
+
+def test_trend_at_the_calendar_edges(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    response = client.get(
+        "/api/v1/insights/trends",
+        params={"from": "0001-01-05", "to": "0001-03-01", "bucket": "week", "window": 5},
+        headers=headers
+    )
+    assert response.status_code == 400
+
+    trend = get_trends(auth_token, **{"from": "9999-11-01", "to": "9999-12-31", "bucket": "month"})
+    assert [point["date"] for point in trend["points"]] == ["9999-11-01", "9999-12-01"]
+    trend = get_trends(auth_token, **{"from": "9999-12-20", "to": "9999-12-31", "bucket": "week"})
+    assert trend["date_to"] == "9999-12-31"
+    assert get_trends(auth_token, to="0001-01-02", days=30)["date_from"] == "0001-01-01"
+
+
+def test_trend_accepts_the_longest_default_range(auth_token):
+    trend = get_trends(auth_token, days=MAX_TREND_DAYS - 1, bucket="month")
+    assert trend["date_to"] >= (date.today() + timedelta(days=1)).isoformat()
+    response = client.get(
+        "/api/v1/insights/trends",
+        params={"days": MAX_TREND_DAYS},
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+    assert response.status_code == 422
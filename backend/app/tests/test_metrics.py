@@ -0,0 +1,104 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.metrics import MetricsRegistry, http_requests, http_request_queries
+from app.db.session import SessionLocal, engine
+from app.db.models.user import User
+from app.core.security import get_password_hash
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def test_user(db):
+    user = User(
+        email="test@example.com",
+        password_hash=get_password_hash("testpassword")
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def auth_token(test_user):
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"email": "test@example.com", "password": "testpassword"}
+    )
+    return response.json()["access_token"]
+
+
+def test_metrics_exposition_format():
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert "# TYPE http_requests_total counter" in body
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert 'cache_hits_total{cache="principal"}' in body
+    assert 'db_pool_in_use{engine="sync"}' in body
+    assert "password_hash_workers" in body
+
+
+def test_requests_are_labelled_by_route_template(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    route = "/api/v1/entries/{entry_id}"
+    before_404 = http_requests.value(method="GET", route=route, status="404")
+    before_queries = http_request_queries.count(method="GET", route=route)
+
+    client.get("/api/v1/entries/12345", headers=headers)
+    client.get("/api/v1/entries/67890", headers=headers)
+
+    assert http_requests.value(method="GET", route=route, status="404") == before_404 + 2
+    assert http_request_queries.count(method="GET", route=route) == before_queries + 2
+    body = client.get("/metrics").text
+    assert 'http_requests_total{method="GET",route="/api/v1/entries/{entry_id}",status="404"}' in body
+    assert "/api/v1/entries/12345" not in body
+
+
+def test_queries_are_counted_per_request(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    client.post("/api/v1/entries", json={"date": "2024-01-01", "mood": 3}, headers=headers)
+
+    body = client.get("/metrics").text
+    sums = [
+        line for line in body.splitlines()
+        if line.startswith('http_request_db_queries_sum{method="POST",route="/api/v1/entries"}')
+    ]
+    assert sums and float(sums[0].split()[-1]) > 0
+    assert 'db_query_duration_seconds_count{engine="async"}' in body
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Test latency.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    histogram.observe(5, route="/a")
+
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{route="/a"} 3' in lines
+    assert 'latency_seconds_sum{route="/a"} 5.55' in lines
+
+
+def test_failed_statements_leave_no_timing_state():
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.exec_driver_sql("SELECT * FROM no_such_table")
+        assert conn.exec_driver_sql("SELECT 1").scalar() == 1
+        assert not any(key.endswith("_started") for key in conn.info)
@@ -0,0 +1,113 @@
+import logging
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.config import settings
+from app.core.profiling import parameter_shape, explain_executor
+from app.db.session import SessionLocal
+from app.db.models.user import User
+from app.core.security import get_password_hash
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def test_user(db):
+    user = User(
+        email="test@example.com",
+        password_hash=get_password_hash("testpassword")
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def auth_token(test_user):
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"email": "test@example.com", "password": "testpassword"}
+    )
+    return response.json()["access_token"]
+
+
+@pytest.fixture
+def profiling_header(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_HEADER", "X-Profile")
+
+
+def test_profiling_header_is_off_by_default(auth_token):
+    response = client.get("/api/v1/entries", headers={"Authorization": f"Bearer {auth_token}", "X-Profile": "1"})
+    assert "server-timing" not in response.headers
+
+
+def test_server_timing_only_when_requested(auth_token, profiling_header):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    response = client.get("/api/v1/entries", headers=headers)
+    assert "server-timing" not in response.headers
+
+    response = client.get("/api/v1/entries", headers={**headers, "X-Profile": "1"})
+    assert response.status_code == 200
+    timing = response.headers["server-timing"]
+    metrics = {part.split(";")[0] for part in timing.split(", ")}
+    assert {"db", "auth", "app", "serialize", "total"} <= metrics
+    assert 'queries"' in timing
+
+
+def test_profiled_request_logs_statements(auth_token, profiling_header, caplog):
+    caplog.set_level(logging.INFO, logger="app.core.profiling")
+    client.get(
+        "/api/v1/entries",
+        params={"date_from": "2024-01-01"},
+        headers={"Authorization": f"Bearer {auth_token}", "X-Profile": "1"}
+    )
+
+    messages = [record.getMessage() for record in caplog.records if record.name == "app.core.profiling"]
+    assert messages[0].startswith("GET /api/v1/entries:")
+    assert any("FROM entries" in message and "date" in message for message in messages[1:])
+    assert "2024-01-01" not in "\n".join(messages)
+
+
+def test_slow_queries_are_logged(auth_token, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 0.0001)
+    caplog.set_level(logging.WARNING, logger="app.slow_queries")
+
+    client.get("/api/v1/entries", headers={"Authorization": f"Bearer {auth_token}"})
+
+    slow = [record.getMessage() for record in caplog.records if record.name == "app.slow_queries"]
+    assert any("FROM entries" in message for message in slow)
+    assert not any("Plan:" in message for message in slow)
+
+
+def test_slow_query_plans_are_fetched_off_the_request(auth_token, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 0.0001)
+    monkeypatch.setattr(settings, "SLOW_QUERY_EXPLAIN", True)
+    caplog.set_level(logging.WARNING, logger="app.slow_queries")
+
+    client.get("/api/v1/entries", headers={"Authorization": f"Bearer {auth_token}"})
+    # One worker, so this returns once every queued plan has been logged
+    explain_executor.submit(lambda: None).result()
+
+    planned = [
+        record for record in caplog.records
+        if record.name == "app.slow_queries" and "FROM entries" in record.getMessage() and "Plan:" in record.getMessage()
+    ]
+    assert planned
+    assert all(record.threadName.startswith("explain") for record in planned)
+
+
+def test_parameter_shape_hides_values():
+    assert parameter_shape({"user_id": 1, "name": "secret"}) == "{user_id: int, name: str}"
+    assert parameter_shape((1, "secret")) == "(int, str)"
+    assert parameter_shape([(1, "a"), (2, "b")], executemany=True) == "2 x (int, str)"
@@ -0,0 +1,92 @@
+import pytest
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+from app.main import app
+from app.db.session import SessionLocal
+from app.db.models.user import User
+from app.core.security import get_password_hash
+from app.services.projects import get_project_activity, sparkline_weeks, SPARKLINE_WEEKS
+from app.tests.utils import count_queries
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def test_user(db):
+    user = User(
+        email="test@example.com",
+        password_hash=get_password_hash("testpassword")
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def auth_token(test_user):
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"email": "test@example.com", "password": "testpassword"}
+    )
+    return response.json()["access_token"]
+
+
+def test_project_activity(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    active = client.post("/api/v1/projects", json={"name": "Active"}, headers=headers).json()
+    today = date.today()
+    for days_ago, mood in ((0, 4), (1, 2), (7, 3), (200, 5)):
+        client.post(
+            "/api/v1/entries",
+            json={"date": (today - timedelta(days=days_ago)).isoformat(), "mood": mood, "project_id": active["id"]},
+            headers=headers
+        )
+    client.post("/api/v1/entries", json={"date": today.isoformat(), "mood": 1}, headers=headers)
+    idle = client.post("/api/v1/projects", json={"name": "Idle"}, headers=headers).json()
+
+    response = client.get("/api/v1/projects/activity", headers=headers)
+    assert response.status_code == 200
+    newest, oldest = response.json()
+    assert newest["id"] == idle["id"]
+    assert (newest["entry_count"], newest["last_entry_date"], newest["average_mood"]) == (0, None, None)
+    assert newest["weekly_entries"] == [0] * SPARKLINE_WEEKS
+
+    assert oldest["name"] == "Active"
+    assert oldest["entry_count"] == 4
+    assert oldest["last_entry_date"] == today.isoformat()
+    assert oldest["average_mood"] == pytest.approx(3.5)
+    assert oldest["sparkline_start"] == sparkline_weeks(today)[0].isoformat()
+    # The 200-day-old entry is outside the sparkline
+    assert sum(oldest["weekly_entries"]) == 3
+    weeks = sparkline_weeks(today)
+    expected = [
+        sum(1 for days_ago in (0, 1, 7) if start <= today - timedelta(days=days_ago) < start + timedelta(weeks=1))
+        for start in weeks
+    ]
+    assert oldest["weekly_entries"] == expected
+
+
+def test_project_activity_is_one_query(auth_token, test_user, db):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for i in range(5):
+        project = client.post("/api/v1/projects", json={"name": f"P{i}"}, headers=headers).json()
+        client.post("/api/v1/entries", json={"date": "2025-01-01", "mood": 3, "project_id": project["id"]}, headers=headers)
+
+    with count_queries() as counter:
+        get_project_activity(db, test_user.id)
+    assert counter.count == 1
+
+    # Creating a project shows up despite the cached result
+    assert len(client.get("/api/v1/projects/activity", headers=headers).json()) == 5
+    client.post("/api/v1/projects", json={"name": "New"}, headers=headers)
+    assert len(client.get("/api/v1/projects/activity", headers=headers).json()) == 6
@@ -0,0 +1,154 @@
+import threading
+import time
+import pytest
+from datetime import date
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from app.main import app
+from app.db.session import SessionLocal
+from app.db.models.user import User
+from app.db.models.daily_rollup import DailyRollup, NO_PROJECT
+from app.core.security import get_password_hash
+from app.services.rollups import check_rollups, rebuild_rollups
+from app.schemas.entry import EntryUpdate
+import app.api.entries as entries_api
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def test_user(db):
+    user = User(
+        email="test@example.com",
+        password_hash=get_password_hash("testpassword")
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def auth_token(test_user):
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"email": "test@example.com", "password": "testpassword"}
+    )
+    return response.json()["access_token"]
+
+
+def rollups(db, user_id):
+    return {
+        (row.date, row.project_id): (row.entry_count, row.mood_sum, row.focus_sum, row.focus_count)
+        for row in db.query(DailyRollup).filter(DailyRollup.user_id == user_id).populate_existing()
+    }
+
+
+def test_rollups_follow_entry_writes(auth_token, test_user, db):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    project = client.post("/api/v1/projects", json={"name": "Alpha"}, headers=headers).json()
+    first = client.post(
+        "/api/v1/entries",
+        json={"date": "2025-01-01", "mood": 2, "focus_score": 6, "project_id": project["id"]},
+        headers=headers
+    ).json()
+    second = client.post("/api/v1/entries", json={"date": "2025-01-01", "mood": 4}, headers=headers).json()
+
+    assert rollups(db, test_user.id) == {
+        (date(2025, 1, 1), project["id"]): (1, 2, 6, 1),
+        (date(2025, 1, 1), NO_PROJECT): (1, 4, 0, 0),
+    }
+
+    # Moving date and project moves the totals; the emptied rows go away
+    client.put(f"/api/v1/entries/{first['id']}", json={"date": "2025-01-02", "project_id": 0}, headers=headers)
+    client.put(f"/api/v1/entries/{second['id']}", json={"mood": 5}, headers=headers)
+    assert rollups(db, test_user.id) == {
+        (date(2025, 1, 1), NO_PROJECT): (1, 5, 0, 0),
+        (date(2025, 1, 2), NO_PROJECT): (1, 2, 6, 1),
+    }
+
+    client.delete(f"/api/v1/entries/{second['id']}", headers=headers)
+    assert rollups(db, test_user.id) == {(date(2025, 1, 2), NO_PROJECT): (1, 2, 6, 1)}
+    assert check_rollups(db, test_user.id) == []
+
+
+def test_concurrent_updates_of_one_entry(auth_token, test_user, db, monkeypatch):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    entry = client.post("/api/v1/entries", json={"date": "2025-01-01", "mood": 3}, headers=headers).json()
+
+    # Hold the first update open after it has read the entry, while the second one starts
+    first_inside = threading.Event()
+    record_entry_changes = entries_api.record_entry_changes
+
+    def paused(*args, **kwargs):
+        if not first_inside.is_set():
+            first_inside.set()
+            time.sleep(0.5)
+        return record_entry_changes(*args, **kwargs)
+
+    monkeypatch.setattr(entries_api, "record_entry_changes", paused)
+
+    def move_to(day):
+        session = SessionLocal()
+        try:
+            entries_api._update_entry(session, test_user.id, entry["id"], EntryUpdate(date=day))
+        finally:
+            session.close()
+
+    first = threading.Thread(target=move_to, args=(date(2025, 2, 1),))
+    first.start()
+    first_inside.wait(5)
+    move_to(date(2025, 3, 1))
+    first.join()
+
+    assert rollups(db, test_user.id) == {(date(2025, 3, 1), NO_PROJECT): (1, 3, 0, 0)}
+    assert check_rollups(db, test_user.id) == []
+
+
+def test_rollups_follow_project_delete_and_import(auth_token, test_user, db):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    project = client.post("/api/v1/projects", json={"name": "Alpha"}, headers=headers).json()
+    client.post("/api/v1/entries", json={"date": "2025-01-01", "mood": 3, "project_id": project["id"]}, headers=headers)
+    client.post("/api/v1/entries", json={"date": "2025-01-01", "mood": 1}, headers=headers)
+
+    client.delete(f"/api/v1/projects/{project['id']}", headers=headers)
+    assert rollups(db, test_user.id) == {(date(2025, 1, 1), NO_PROJECT): (2, 4, 0, 0)}
+
+    client.post(
+        "/api/v1/entries/import",
+        files={"file": ("entries.jsonl", b'{"date": "2025-01-03", "mood": 5, "focus_score": 7}\n', "application/x-ndjson")},
+        headers=headers
+    )
+    assert check_rollups(db, test_user.id) == []
+
+    calendar = client.get("/api/v1/calendar/month", params={"year": 2025, "month": 1}, headers=headers).json()
+    assert [(day["entry_count"], day["average_mood"]) for day in calendar["days"][:3]] == [(2, 2), (0, None), (1, 5)]
+
+
+def test_check_and_rebuild_rollups(auth_token, test_user, db):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    client.post("/api/v1/entries", json={"date": "2025-01-01", "mood": 3}, headers=headers)
+    client.post("/api/v1/entries", json={"date": "2025-01-05", "mood": 4}, headers=headers)
+
+    db.execute(update(DailyRollup).where(DailyRollup.date == date(2025, 1, 5)).values(mood_sum=40))
+    db.add(DailyRollup(user_id=test_user.id, date=date(2025, 1, 9), project_id=NO_PROJECT, entry_count=1, mood_sum=1))
+    db.commit()
+
+    mismatches = check_rollups(db, test_user.id)
+    assert [(m.date, m.expected, m.actual) for m in mismatches] == [
+        (date(2025, 1, 5), (1, 4, 0, 0), (1, 40, 0, 0)),
+        (date(2025, 1, 9), (0, 0, 0, 0), (1, 1, 0, 0)),
+    ]
+
+    rebuild_rollups(db, test_user.id)
+    db.commit()
+    assert check_rollups(db, test_user.id) == []
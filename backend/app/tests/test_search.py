@@ -0,0 +1,150 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.db.session import SessionLocal
+from app.db.models.user import User
+from app.core.security import get_password_hash
+from app.services.search import InvertedIndex, make_snippet, escape_headline, search_index_cache, MARK_START, MARK_STOP
+from app.tests.utils import count_queries
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def fresh_search_index_cache():
+    # Each test starts a new database, where user ids and data versions repeat
+    search_index_cache.clear()
+
+
+@pytest.fixture
+def db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def test_user(db):
+    user = User(
+        email="test@example.com",
+        password_hash=get_password_hash("testpassword")
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def auth_token(test_user):
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"email": "test@example.com", "password": "testpassword"}
+    )
+    return response.json()["access_token"]
+
+
+def create_entry(auth_token, **fields):
+    payload = {"date": "2025-01-27", "mood": 3}
+    payload.update(fields)
+    response = client.post(
+        "/api/v1/entries",
+        json=payload,
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+    return response.json()
+
+
+def test_search_ranks_title_matches_first(auth_token):
+    body_match = create_entry(auth_token, title="Tuesday", body="Refactored the parser today")
+    title_match = create_entry(auth_token, title="Parser rewrite", body="Long day")
+    create_entry(auth_token, title="Unrelated", body="Nothing to see")
+    
+    response = client.get(
+        "/api/v1/search",
+        params={"q": "parser"},
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+    assert response.status_code == 200
+    results = response.json()
+    assert [r["entry"]["id"] for r in results] == [title_match["id"], body_match["id"]]
+    assert results[0]["rank"] > results[1]["rank"]
+    assert "<mark>parser</mark>" in results[1]["snippet"]
+
+
+def test_search_covers_looking_ahead_and_prefixes(auth_token):
+    entry = create_entry(auth_token, title="Wrap-up", looking_ahead="Start migrating the deployment scripts")
+    
+    response = client.get(
+        "/api/v1/search",
+        params={"q": "deploy migrate"},
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+    assert [r["entry"]["id"] for r in response.json()] == [entry["id"]]
+    
+    # The list filter uses the same matcher
+    response = client.get(
+        "/api/v1/entries",
+        params={"search": "deploy"},
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+    assert [e["id"] for e in response.json()] == [entry["id"]]
+
+
+def test_search_index_is_reused_until_a_write(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    first = create_entry(auth_token, title="Cache warmup")
+    params = {"search": "cache", "fields": "id"}
+    assert [e["id"] for e in client.get("/api/v1/entries", params=params, headers=headers).json()] == [first["id"]]
+
+    # The cached index answers without reading entry text again
+    with count_queries() as queries:
+        response = client.get("/api/v1/entries", params=params, headers=headers)
+    assert [e["id"] for e in response.json()] == [first["id"]]
+    assert not any("entries.body" in statement for statement in queries.statements)
+
+    second = create_entry(auth_token, date="2025-01-28", body="Cache invalidation")
+    response = client.get("/api/v1/entries", params=params, headers=headers)
+    assert [e["id"] for e in response.json()] == [second["id"], first["id"]]
+
+
+def test_search_matches_non_ascii_words(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    japanese = create_entry(auth_token, title="メモ", body="日本語 の 勉強")
+    accented = create_entry(auth_token, title="Café rewrite", body="Naïve parser")
+
+    for q, entry in (("日本語", japanese), ("café", accented), ("naïve", accented)):
+        response = client.get("/api/v1/search", params={"q": q}, headers=headers)
+        assert [r["entry"]["id"] for r in response.json()] == [entry["id"]], q
+        response = client.get("/api/v1/entries", params={"search": q}, headers=headers)
+        assert [e["id"] for e in response.json()] == [entry["id"]], q
+
+    response = client.get("/api/v1/search", params={"q": "日本語"}, headers=headers)
+    assert "<mark>日本語</mark>" in response.json()[0]["snippet"]
+
+
+def test_inverted_index_requires_every_term():
+    index = InvertedIndex()
+    index.add(1, title="Fixing tests", body="flaky database tests")
+    index.add(2, title="Database tuning", body=None)
+    
+    assert set(index.search(["database"])) == {1, 2}
+    assert set(index.search(["database", "test"])) == {1}
+    assert index.search(["missing"]) == {}
+
+
+def test_make_snippet_highlights_matches():
+    snippet = make_snippet("Spent the morning fixing tests and more tests", ["test"])
+    assert snippet.count("<mark>") == 2
+
+
+def test_snippets_escape_entry_markup():
+    snippet = make_snippet('Tests <img src=x onerror="alert(1)"> & more tests', ["test"])
+    assert "<img" not in snippet
+    assert "&lt;img" in snippet and "&amp;" in snippet
+    assert snippet.count("<mark>") == 2
+
+    headline = escape_headline(f"a {MARK_START}<script>{MARK_STOP} b")
+    assert headline == "a <mark>&lt;script&gt;</mark> b"
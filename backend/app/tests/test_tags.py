@@ -0,0 +1,104 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.db.session import SessionLocal
+from app.db.models.user import User
+from app.core.security import get_password_hash
+from app.services.tags import TagIndex, get_tag_stats, tag_index_cache
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def test_user(db):
+    user = User(
+        email="test@example.com",
+        password_hash=get_password_hash("testpassword")
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def auth_token(test_user):
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"email": "test@example.com", "password": "testpassword"}
+    )
+    return response.json()["access_token"]
+
+
+def create_tagged_entries(headers):
+    for day, tags in ((1, ["Python", "pytest"]), (2, ["python"]), (3, ["pydantic", "Python"]), (4, ["rust"])):
+        client.post("/api/v1/entries", json={"date": f"2025-01-0{day}", "mood": 3, "tags": tags}, headers=headers)
+
+
+def test_tag_stats(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    create_tagged_entries(headers)
+    client.post("/api/v1/tags", json={"name": "unused"}, headers=headers)
+
+    response = client.get("/api/v1/tags/stats", headers=headers)
+    assert response.status_code == 200
+    assert [(tag["name"], tag["usage_count"], tag["last_used"]) for tag in response.json()] == [
+        ("Python", 2, "2025-01-03"),
+        ("pydantic", 1, "2025-01-03"),
+        ("pytest", 1, "2025-01-01"),
+        ("python", 1, "2025-01-02"),
+        ("rust", 1, "2025-01-04"),
+        ("unused", 0, None),
+    ]
+
+
+def test_autocomplete_ranks_prefix_matches_by_usage(auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    create_tagged_entries(headers)
+
+    def complete(q, limit=10):
+        response = client.get("/api/v1/tags/autocomplete", params={"q": q, "limit": limit}, headers=headers)
+        assert response.status_code == 200
+        return [tag["name"] for tag in response.json()]
+
+    assert complete("py") == ["Python", "pydantic", "pytest", "python"]
+    assert complete("PYT", limit=2) == ["Python", "pytest"]
+    assert complete("x") == []
+    assert len(complete("")) == 5
+
+    # Writes rebuild the index: a new tag, and entries changing usage
+    client.post("/api/v1/tags", json={"name": "pyramid"}, headers=headers)
+    assert "pyramid" in complete("pyr")
+    for day in (5, 6, 7):
+        client.post("/api/v1/entries", json={"date": f"2025-01-0{day}", "mood": 3, "tags": ["pytest"]}, headers=headers)
+    assert complete("py", limit=1) == ["pytest"]
+
+
+def test_autocomplete_without_index_cache_uses_prefix_query(auth_token, monkeypatch):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    create_tagged_entries(headers)
+    client.post("/api/v1/tags", json={"name": "py_100%"}, headers=headers)
+    monkeypatch.setattr(tag_index_cache, "maxsize", 0)
+
+    response = client.get("/api/v1/tags/autocomplete", params={"q": "PYT", "limit": 2}, headers=headers)
+    assert [tag["name"] for tag in response.json()] == ["Python", "pytest"]
+    response = client.get("/api/v1/tags/autocomplete", params={"q": "py_1"}, headers=headers)
+    assert [tag["name"] for tag in response.json()] == ["py_100%"]
+
+
+def test_tag_index_matches_prefix_query(auth_token, test_user, db):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    create_tagged_entries(headers)
+
+    index = TagIndex(get_tag_stats(db, test_user.id))
+    for prefix in ("", "p", "py", "pyt", "python", "r", "z"):
+        assert index.complete(prefix, 3) == get_tag_stats(db, test_user.id, prefix=prefix, limit=3)
@@ -0,0 +1,31 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from app.db.session import engine, async_engine
+
+
+class QueryCounter:
+    """Collects the SQL statements executed on the engines."""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries():
+    """Count SQL statements executed inside the block."""
+    counter = QueryCounter()
+    engines = (engine, async_engine.sync_engine)
+    for target in engines:
+        event.listen(target, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", counter)
@@ -0,0 +1,61 @@
+"""Microbenchmark of per-request authentication overhead, with and without caches.
+
+Times decode_token on its own (cold python-jose verification vs. a token cache
+hit), then an authenticated endpoint with the token and principal caches
+enabled vs. disabled.
+
+Usage (from the backend directory):
+    python scripts/bench_auth.py [--iterations 2000]
+"""
+import argparse
+import random
+
+import benchmark_utils
+
+benchmark_utils.configure()
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.auth import principal_cache
+from app.core.security import create_access_token, decode_token, token_cache
+from app.db.session import SessionLocal
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    token = create_access_token(1)
+
+    def uncached_decode():
+        token_cache.clear()
+        decode_token(token)
+
+    benchmark_utils.report("decode_token, uncached", benchmark_utils.time_calls(uncached_decode, args.iterations))
+    benchmark_utils.report("decode_token, cached", benchmark_utils.time_calls(lambda: decode_token(token), args.iterations))
+
+    db = SessionLocal()
+    user_id = benchmark_utils.seed_diary(db, f"bench-auth-{random.random()}@example.com", 0)
+    db.close()
+
+    client = TestClient(app)
+    headers = benchmark_utils.auth_headers(user_id)
+
+    def request():
+        client.get("/api/v1/tags", headers=headers).raise_for_status()
+
+    def uncached_request():
+        token_cache.clear()
+        principal_cache.clear()
+        request()
+
+    requests = max(1, args.iterations // 4)
+    benchmark_utils.report("GET /tags, caches cleared each time", benchmark_utils.time_calls(uncached_request, requests))
+    benchmark_utils.report("GET /tags, caches warm", benchmark_utils.time_calls(request, requests))
+    print(f"token cache: {token_cache.stats()}")
+    print(f"principal cache: {principal_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
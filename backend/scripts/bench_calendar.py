@@ -0,0 +1,93 @@
+"""Benchmark GET /api/v1/calendar/month on a large synthetic diary.
+
+Compares the old EXTRACT(year/month) predicate on entries with an inclusive
+date range that can use the (user_id, date) index. The service now reads the
+daily rollups instead, so that read is timed separately, followed by
+end-to-end latency for the endpoint.
+
+Usage (from the backend directory):
+    python scripts/bench_calendar.py [--entries 20000] [--requests 200]
+"""
+import argparse
+import random
+
+import benchmark_utils
+
+benchmark_utils.configure()
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+from app.main import app
+from app.db.session import SessionLocal
+from app.db.models.entry import Entry
+from app.services.calendar import get_calendar_month_data, month_bounds
+
+
+def legacy_month_query(db, user_id, year, month):
+    """The pre-index query: EXTRACT() on the column defeats any date index."""
+    return db.query(
+        Entry.date,
+        func.count(Entry.id),
+        func.avg(Entry.mood)
+    ).filter(
+        Entry.user_id == user_id,
+        func.extract('year', Entry.date) == year,
+        func.extract('month', Entry.date) == month
+    ).group_by(Entry.date).all()
+
+
+def range_month_query(db, user_id, year, month):
+    """The same aggregate over an inclusive date range, served by the (user_id, date) index."""
+    start, end = month_bounds(year, month)
+    return db.query(
+        Entry.date,
+        func.count(Entry.id),
+        func.avg(Entry.mood)
+    ).filter(
+        Entry.user_id == user_id,
+        Entry.date >= start,
+        Entry.date <= end
+    ).group_by(Entry.date).all()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    user_id = benchmark_utils.seed_diary(db, f"bench-calendar-{random.random()}@example.com", args.entries)
+    first, last = db.query(func.min(Entry.date), func.max(Entry.date)).filter(Entry.user_id == user_id).one()
+    months = [(y, m) for y in range(first.year, last.year + 1) for m in range(1, 13)]
+    rng = random.Random(1)
+    picks = iter(lambda: rng.choice(months), None)
+
+    print(f"{args.entries} entries, {len(months)} months")
+    benchmark_utils.report(
+        "before: EXTRACT(year/month) query",
+        benchmark_utils.time_calls(lambda: legacy_month_query(db, user_id, *next(picks)), args.requests)
+    )
+    benchmark_utils.report(
+        "after: inclusive date range query",
+        benchmark_utils.time_calls(lambda: range_month_query(db, user_id, *next(picks)), args.requests)
+    )
+    benchmark_utils.report(
+        "daily rollups (get_calendar_month_data)",
+        benchmark_utils.time_calls(lambda: get_calendar_month_data(db, user_id, *next(picks)), args.requests)
+    )
+
+    client = TestClient(app)
+    headers = benchmark_utils.auth_headers(user_id)
+
+    def request():
+        year, month = next(picks)
+        response = client.get("/api/v1/calendar/month", params={"year": year, "month": month}, headers=headers)
+        response.raise_for_status()
+
+    benchmark_utils.report("GET /calendar/month", benchmark_utils.time_calls(request, args.requests))
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
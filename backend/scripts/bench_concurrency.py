@@ -0,0 +1,110 @@
+"""Load test: request throughput with 1, 10 and 100 concurrent clients.
+
+Starts a uvicorn server for the current tree and, with --before REF, another
+for a git worktree checked out at REF (e.g. the commit before the async data
+layer), then has N clients loop over a mix of read endpoints and reports
+requests/s and latency for each concurrency level.
+
+Usage (from the backend directory):
+    python scripts/bench_concurrency.py [--before HEAD~1] [--entries 2000] [--seconds 10]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import benchmark_utils
+
+DATABASE_URL = benchmark_utils.configure()
+
+import httpx
+from bench_login_load import free_port, wait_until_up
+from app.db.session import SessionLocal
+
+PATHS = (
+    "/api/v1/entries?limit=20",
+    "/api/v1/insights/summary",
+    "/api/v1/projects",
+    "/api/v1/tags",
+)
+CONCURRENCY = (1, 10, 100)
+
+
+async def run_load(base_url: str, headers, clients: int, seconds: float):
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, timeout=30, limits=limits) as client:
+        await wait_until_up(client)
+        deadline = time.perf_counter() + seconds
+        latencies = []
+        errors = 0
+
+        async def client_loop(offset: int):
+            nonlocal errors
+            i = offset
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(PATHS[i % len(PATHS)])
+                    ok = response.status_code == 200
+                except httpx.TransportError:
+                    ok = False
+                latencies.append(time.perf_counter() - started)
+                if not ok:
+                    errors += 1
+                i += 1
+
+        await asyncio.gather(*(client_loop(i) for i in range(clients)))
+        return latencies, errors
+
+
+def run_tree(label: str, backend_dir: str, headers, args) -> None:
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=backend_dir,
+        env=dict(os.environ, DATABASE_URL=DATABASE_URL),
+    )
+    try:
+        for clients in CONCURRENCY:
+            latencies, errors = asyncio.run(
+                run_load(f"http://127.0.0.1:{port}", headers, clients, args.seconds)
+            )
+            benchmark_utils.report(f"{label}: {clients} clients", latencies)
+            print(f"{'':<40} throughput: {len(latencies) / args.seconds:.1f} req/s, errors: {errors}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--before", metavar="REF", help="git ref to compare against")
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--seconds", type=float, default=10, help="duration per concurrency level")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user_id = benchmark_utils.seed_diary(db, "bench-concurrency@example.com", args.entries, n_tags=20, tags_per_entry=2)
+    finally:
+        db.close()
+    headers = benchmark_utils.auth_headers(user_id)
+
+    if args.before:
+        worktree = tempfile.mkdtemp(prefix="devdiary-before-")
+        subprocess.run(["git", "worktree", "add", "--detach", worktree, args.before], check=True)
+        try:
+            run_tree(f"before ({args.before})", os.path.join(worktree, "backend"), headers, args)
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", worktree], check=True)
+            shutil.rmtree(worktree, ignore_errors=True)
+
+    run_tree("after", benchmark_utils.BACKEND_DIR, headers, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Load test: latency of unrelated requests while logins hammer bcrypt.
+
+Starts a uvicorn server twice, once hashing inline on the event loop
+(PASSWORD_HASH_WORKERS=0, the old behaviour) and once with the worker pool,
+then runs concurrent login loops while probing GET /health and reports the
+probe's p50/p99.
+
+Usage (from the backend directory):
+    python scripts/bench_login_load.py [--logins 8] [--seconds 10] [--workers 4]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import benchmark_utils
+
+DATABASE_URL = benchmark_utils.configure()
+
+import httpx
+
+EMAIL = "bench-login@example.com"
+PASSWORD = "bench-password"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_up(client: httpx.AsyncClient) -> None:
+    for _ in range(100):
+        try:
+            await client.get("/health")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+async def run_load(base_url: str, logins: int, seconds: float):
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        await wait_until_up(client)
+        await client.post("/api/v1/auth/register", json={"email": EMAIL, "password": PASSWORD})
+
+        deadline = time.perf_counter() + seconds
+        completed = 0
+        probes = []
+
+        async def login_loop():
+            nonlocal completed
+            while time.perf_counter() < deadline:
+                response = await client.post("/api/v1/auth/login", json={"email": EMAIL, "password": PASSWORD})
+                if response.status_code == 200:
+                    completed += 1
+
+        async def probe_loop():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                await client.get("/health")
+                probes.append(time.perf_counter() - started)
+                await asyncio.sleep(0.02)
+
+        await asyncio.gather(probe_loop(), *(login_loop() for _ in range(logins)))
+        return probes, completed
+
+
+def run_mode(label: str, workers: int, args) -> None:
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=DATABASE_URL, PASSWORD_HASH_WORKERS=str(workers))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=benchmark_utils.BACKEND_DIR,
+        env=env,
+    )
+    try:
+        probes, completed = asyncio.run(run_load(f"http://127.0.0.1:{port}", args.logins, args.seconds))
+    finally:
+        server.terminate()
+        server.wait()
+    benchmark_utils.report(f"{label}: GET /health", probes)
+    print(f"{'':<40} logins completed: {completed} ({completed / args.seconds:.1f}/s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=8, help="concurrent login loops")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--workers", type=int, default=4, help="hashing pool size for the 'after' run")
+    args = parser.parse_args()
+
+    run_mode("before: inline bcrypt", 0, args)
+    run_mode(f"after: {args.workers}-thread hashing pool", args.workers, args)
+
+
+if __name__ == "__main__":
+    main()
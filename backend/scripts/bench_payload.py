@@ -0,0 +1,67 @@
+"""Benchmark bytes on the wire for the entries list: full vs sparse fieldset, identity vs compressed.
+
+Requests the list as EntriesPage needs it (fields=id,date,title,mood,excerpt)
+and in full, each with every encoding the server offers, and reports response
+size as sent and latency. Brotli is only measured if the brotli package is
+installed.
+
+Usage (from the backend directory):
+    python scripts/bench_payload.py [--entries 1000] [--repeat 20]
+"""
+import argparse
+import random
+
+import benchmark_utils
+
+benchmark_utils.configure()
+
+from fastapi.testclient import TestClient
+from app.core.compression import available_encodings
+from app.db.session import SessionLocal
+from app.main import app
+
+VARIANTS = {
+    "full": "/api/v1/entries",
+    "sparse": "/api/v1/entries?fields=id,date,title,mood,excerpt",
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user_id = benchmark_utils.seed_diary(
+            db, f"bench-payload-{random.random()}@example.com", args.entries, n_tags=20, tags_per_entry=2
+        )
+    finally:
+        db.close()
+
+    client = TestClient(app)
+    headers = benchmark_utils.auth_headers(user_id)
+    baseline = None
+    print(f"{args.entries} entries")
+    for variant, url in VARIANTS.items():
+        for encoding in ("identity", *reversed(available_encodings())):
+            request_headers = {**headers, "Accept-Encoding": encoding}
+
+            def fetch():
+                with client.stream("GET", url, headers=request_headers) as response:
+                    response.read()
+                    return response
+
+            response = fetch()
+            assert response.status_code == 200, response.text
+            assert response.headers.get("content-encoding", "identity") == encoding
+            wire = response.num_bytes_downloaded
+            baseline = baseline or wire
+            samples = benchmark_utils.time_calls(fetch, args.repeat)
+            benchmark_utils.report(f"{variant} / {encoding}", samples)
+            print(f"{'':<40} {wire / 1024:9.1f} KiB on the wire ({wire / baseline:6.1%} of full / identity)")
+
+
+if __name__ == "__main__":
+    main()
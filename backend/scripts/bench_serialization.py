@@ -0,0 +1,67 @@
+"""Benchmark list serialization: FastAPI's response_model path vs json_list_response.
+
+For 1k and 10k entries, serializes the same loaded ORM objects both ways,
+checks the bytes are identical and reports the time each takes. Loading the
+entries is excluded; it is the same for both paths.
+
+Usage (from the backend directory):
+    python scripts/bench_serialization.py [--sizes 1000 10000] [--repeat 20]
+"""
+import argparse
+import asyncio
+import random
+
+import benchmark_utils
+
+benchmark_utils.configure()
+
+from typing import List
+from fastapi.routing import serialize_response
+from fastapi.responses import JSONResponse
+from fastapi.utils import create_response_field
+from app.core.serialization import json_list_response
+from app.db.session import SessionLocal
+from app.schemas.entry import EntryResponse
+from app.services.entries import filter_entries
+
+response_field = create_response_field(name="Response_get_entries", type_=List[EntryResponse])
+
+
+def response_model_path(entries) -> bytes:
+    """What FastAPI does for `response_model=List[EntryResponse]`: validate, dump to dicts, json.dumps."""
+    content = asyncio.run(serialize_response(field=response_field, response_content=entries, is_coroutine=True))
+    return JSONResponse(content).body
+
+
+def fast_path(entries) -> bytes:
+    return json_list_response(EntryResponse, entries).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        for size in args.sizes:
+            user_id = benchmark_utils.seed_diary(
+                db, f"bench-serialization-{random.random()}@example.com", size, n_tags=20, tags_per_entry=2
+            )
+            entries = filter_entries(db, user_id)
+            assert response_model_path(entries) == fast_path(entries), "outputs differ"
+
+            repeat = max(3, args.repeat * 1000 // size)
+            print(f"{size} entries, {len(fast_path(entries)) / 1024:.0f} KiB of JSON")
+            before = benchmark_utils.time_calls(lambda: response_model_path(entries), repeat)
+            after = benchmark_utils.time_calls(lambda: fast_path(entries), repeat)
+            benchmark_utils.report("before: response_model + json.dumps", before)
+            benchmark_utils.report("after: TypeAdapter.dump_json", after)
+            print(f"{'':<40} speedup: {benchmark_utils.percentile(before, 50) / benchmark_utils.percentile(after, 50):.2f}x")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark tag autocomplete: in-memory sorted index vs indexed prefix query.
+
+Seeds a diary with many tags, then times TagIndex.complete (the hot path of
+GET /api/v1/tags/autocomplete), the SQL prefix query used when the index cache
+is disabled, and the endpoint end to end, for prefixes of one to four characters.
+
+Usage (from the backend directory):
+    python scripts/bench_tag_autocomplete.py [--entries 10000] [--tags 2000] [--repeat 200]
+"""
+import argparse
+import random
+
+import benchmark_utils
+
+benchmark_utils.configure()
+
+from fastapi.testclient import TestClient
+from app.db.session import SessionLocal
+from app.main import app
+from app.services.tags import TagIndex, get_tag_stats
+
+LIMIT = 10
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=10000)
+    parser.add_argument("--tags", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user_id = benchmark_utils.seed_diary(
+            db, f"bench-autocomplete-{random.random()}@example.com", args.entries,
+            n_tags=args.tags, tags_per_entry=3
+        )
+        stats = get_tag_stats(db, user_id)
+        index = TagIndex(stats)
+        print(f"{args.entries} entries, {len(index)} tags")
+        benchmark_utils.report("build TagIndex", benchmark_utils.time_calls(lambda: TagIndex(stats), 20))
+
+        client = TestClient(app)
+        headers = benchmark_utils.auth_headers(user_id)
+        for prefix in ("t", "tag-1", "tag-19", "tag-199"):
+            matches = len(index.complete(prefix, len(index)))
+            print(f"prefix {prefix!r}: {matches} matches")
+            benchmark_utils.report("  TagIndex.complete", benchmark_utils.time_calls(
+                lambda: index.complete(prefix, LIMIT), args.repeat
+            ))
+            benchmark_utils.report("  SQL prefix query", benchmark_utils.time_calls(
+                lambda: get_tag_stats(db, user_id, prefix=prefix, limit=LIMIT), args.repeat
+            ))
+            benchmark_utils.report("  GET /tags/autocomplete", benchmark_utils.time_calls(
+                lambda: client.get("/api/v1/tags/autocomplete", params={"q": prefix, "limit": LIMIT}, headers=headers),
+                args.repeat
+            ))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
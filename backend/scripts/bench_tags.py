@@ -0,0 +1,100 @@
+"""Benchmark multi-tag entry filtering on a diary with 50 tags and 10k entries.
+
+Compares the old join-based filter (which needs DISTINCT or GROUP BY/HAVING to
+combine several tags) with the semi-join posting-list filter used by
+app.services.entries, for one to five tags in "all" and "any" mode, for the
+full result and for a first page. On the
+scratch SQLite database it also times the new filter without the
+(tag_id, entry_id) index.
+
+Usage (from the backend directory):
+    python scripts/bench_tags.py [--entries 10000] [--other-users 4] [--repeat 30]
+"""
+import argparse
+import os
+import random
+
+import benchmark_utils
+
+scratch = "DATABASE_URL" not in os.environ
+benchmark_utils.configure()
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import load_only
+from app.db.session import SessionLocal, engine
+from app.db.models.entry import Entry
+from app.db.models.tag import Tag
+from app.services.entries import build_entries_query
+
+N_TAGS = 50
+TAGS_PER_ENTRY = 3
+PAGE_SIZE = 50
+
+
+def legacy_query(db, user_id, names, mode):
+    """Join entries to their tags; combining tags then needs DISTINCT or GROUP BY/HAVING."""
+    query = db.query(Entry).options(load_only(Entry.id)).join(Entry.tags).filter(Entry.user_id == user_id, Tag.name.in_(names))
+    if mode == "all":
+        query = query.group_by(Entry.id, Entry.date).having(func.count(Tag.id) == len(names))
+    else:
+        query = query.distinct()
+    return query.order_by(Entry.date.desc(), Entry.id.desc())
+
+
+def new_query(db, user_id, names, mode):
+    return build_entries_query(db, user_id, tags=names, tag_mode=mode, fields=("id",))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=10000)
+    parser.add_argument("--other-users", type=int, default=4, help="users with the same diary size sharing the tables")
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user_ids = [
+            benchmark_utils.seed_diary(
+                db, f"bench-tags-{random.random()}@example.com", args.entries,
+                n_tags=N_TAGS, tags_per_entry=TAGS_PER_ENTRY, seed=i
+            )
+            for i in range(args.other_users + 1)
+        ]
+        user_id = user_ids[-1]
+        print(f"{args.entries} entries, {N_TAGS} tags, {TAGS_PER_ENTRY} per entry; {len(user_ids)} users")
+
+        cases = [(mode, [f"tag-{i}" for i in range(count)]) for mode in ("all", "any") for count in (1, 2, 3, 5)]
+        for mode, names in cases:
+            legacy = [entry.id for entry in legacy_query(db, user_id, names, mode)]
+            new = [entry.id for entry in new_query(db, user_id, names, mode)]
+            assert legacy == new, f"results differ for {mode} {names}"
+            print(f"{mode} of {len(names)} tag(s): {len(new)} entries")
+            benchmark_utils.report("  before: join + DISTINCT/HAVING", benchmark_utils.time_calls(
+                lambda: legacy_query(db, user_id, names, mode).all(), args.repeat
+            ))
+            benchmark_utils.report("  after: posting-list semi-joins", benchmark_utils.time_calls(
+                lambda: new_query(db, user_id, names, mode).all(), args.repeat
+            ))
+            benchmark_utils.report(f"  before, first page of {PAGE_SIZE}", benchmark_utils.time_calls(
+                lambda: legacy_query(db, user_id, names, mode).limit(PAGE_SIZE).all(), args.repeat
+            ))
+            benchmark_utils.report(f"  after, first page of {PAGE_SIZE}", benchmark_utils.time_calls(
+                lambda: new_query(db, user_id, names, mode).limit(PAGE_SIZE).all(), args.repeat
+            ))
+
+        if scratch:
+            db.close()
+            with engine.begin() as conn:
+                conn.execute(text("DROP INDEX ix_entry_tags_tag_id_entry_id"))
+            print("without the (tag_id, entry_id) index")
+            for mode, names in cases:
+                benchmark_utils.report(f"  {mode} of {len(names)} tag(s)", benchmark_utils.time_calls(
+                    lambda: new_query(db, user_id, names, mode).all(), args.repeat
+                ))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
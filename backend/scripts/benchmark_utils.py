@@ -0,0 +1,138 @@
+"""Shared helpers for the benchmark scripts in this directory.
+
+Benchmarks run against DATABASE_URL when it is set (the database must already be
+migrated), otherwise against a throwaway SQLite file. Call configure() before
+importing anything from app, since settings are read at import time.
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def configure() -> str:
+    """Point the app at the benchmark database and create tables if it is a scratch one."""
+    sys.path.insert(0, BACKEND_DIR)
+    scratch = "DATABASE_URL" not in os.environ
+    if scratch:
+        path = os.path.join(tempfile.mkdtemp(prefix="devdiary-bench-"), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+
+    if scratch:
+        from app.db.base import Base
+        from app.db.session import engine
+        import app.db.models  # noqa: F401  (register tables)
+        Base.metadata.create_all(engine)
+    return os.environ["DATABASE_URL"]
+
+
+def seed_diary(
+    db,
+    email: str,
+    n_entries: int,
+    n_projects: int = 5,
+    n_tags: int = 0,
+    tags_per_entry: int = 0,
+    start: Optional[date] = None,
+    seed: int = 0
+) -> int:
+    """Create a user with a synthetic diary spread over consecutive days. Returns the user id."""
+    from sqlalchemy import insert
+    from app.db.models.user import User
+    from app.db.models.project import Project
+    from app.db.models.entry import Entry
+    from app.db.models.tag import Tag
+    from app.db.models.entry_tag import entry_tags
+    from app.services.insights import rebuild_user_summary
+    from app.services.rollups import rebuild_rollups
+
+    rng = random.Random(seed)
+    user = User(email=email, password_hash="not-a-real-hash")
+    db.add(user)
+    db.flush()
+
+    project_ids = [
+        db.execute(insert(Project.__table__).values(user_id=user.id, name=f"Project {i}").returning(Project.__table__.c.id)).scalar()
+        for i in range(n_projects)
+    ]
+    tag_ids = [
+        db.execute(insert(Tag.__table__).values(user_id=user.id, name=f"tag-{i}").returning(Tag.__table__.c.id)).scalar()
+        for i in range(n_tags)
+    ]
+
+    start = start or date.today() - timedelta(days=int(n_entries / 1.5))
+    batch = 5000
+    for offset in range(0, n_entries, batch):
+        rows = []
+        for i in range(offset, min(offset + batch, n_entries)):
+            rows.append({
+                "user_id": user.id,
+                "project_id": rng.choice(project_ids) if project_ids and rng.random() < 0.7 else None,
+                "date": start + timedelta(days=int(i / 1.5)),
+                "title": f"Entry {i}",
+                "body": " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 120))),
+                "mood": rng.randint(1, 5),
+                "focus_score": rng.randint(1, 10) if rng.random() < 0.6 else None,
+            })
+        ids = db.execute(
+            insert(Entry.__table__).returning(Entry.__table__.c.id, sort_by_parameter_order=True),
+            rows
+        ).scalars().all()
+        if tag_ids and tags_per_entry:
+            db.execute(insert(entry_tags), [
+                {"entry_id": entry_id, "tag_id": tag_id}
+                for entry_id in ids
+                for tag_id in rng.sample(tag_ids, tags_per_entry)
+            ])
+        db.commit()
+
+    rebuild_user_summary(db, user.id)
+    rebuild_rollups(db, user.id)
+    db.commit()
+    return user.id
+
+
+def auth_headers(user_id: int) -> Dict[str, str]:
+    from app.core.security import create_access_token
+    return {"Authorization": f"Bearer {create_access_token(user_id)}"}
+
+
+def time_calls(fn: Callable[[], object], repeat: int, warmup: int = 3) -> List[float]:
+    """Run fn repeatedly and return wall-clock durations in seconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def report(label: str, samples: List[float]) -> None:
+    """Print p50/p99/mean in milliseconds."""
+    print(
+        f"{label:<40} n={len(samples):<5} "
+        f"p50={percentile(samples, 50) * 1000:8.3f}ms "
+        f"p99={percentile(samples, 99) * 1000:8.3f}ms "
+        f"mean={statistics.mean(samples) * 1000:8.3f}ms"
+    )
+
+
+WORDS = (
+    "refactor deploy bug fix test review api database query index cache react "
+    "hook component migration schema release sprint standup pairing docs "
+    "performance latency memory profile async worker queue retry timeout"
+).split()
@@ -0,0 +1,66 @@
+"""Check or recompute daily_rollups rows from the entries table.
+
+Usage (from the backend directory):
+    python scripts/rebuild_rollups.py --check      # report users whose rollups drifted
+    python scripts/rebuild_rollups.py              # rebuild every user's rollups
+    python scripts/rebuild_rollups.py --user-id 42 [--check]
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+# Add the parent directory to the path so we can import app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import SessionLocal
+from app.db.models.user import User
+from app.services.rollups import check_rollups, rebuild_rollups
+from app.services.versions import bump_data_version
+from app.services.insight_cache import insight_cache
+
+# Mismatching rows printed per user with --check
+SHOWN_MISMATCHES = 5
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user-id", type=int, help="only check or rebuild this user's rollups")
+    parser.add_argument("--check", action="store_true", help="report differences without changing anything")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.user_id is not None:
+            user_ids = [args.user_id]
+        else:
+            user_ids = [user_id for (user_id,) in db.query(User.id).order_by(User.id)]
+
+        if args.check:
+            drifted = 0
+            for user_id in user_ids:
+                mismatches = check_rollups(db, user_id)
+                if mismatches:
+                    drifted += 1
+                    print(f"user {user_id}: {len(mismatches)} rollup rows differ")
+                    for mismatch in mismatches[:SHOWN_MISMATCHES]:
+                        print(
+                            f"  {mismatch.date} project={mismatch.project_id} "
+                            f"expected={mismatch.expected} actual={mismatch.actual}"
+                        )
+            print(f"Checked {len(user_ids)} users, {drifted} with drifted rollups")
+            sys.exit(1 if drifted else 0)
+
+        for user_id in user_ids:
+            rebuild_rollups(db, user_id)
+            # Corrected rollups must not be served from ETags or a shared cache
+            bump_data_version(db, user_id)
+            db.commit()
+            asyncio.run(insight_cache.invalidate_user(user_id))
+        print(f"Rebuilt rollups for {len(user_ids)} users")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Recompute user_summaries rows from the entries table.
+
+Usage (from the backend directory):
+    python scripts/rebuild_summaries.py            # every user
+    python scripts/rebuild_summaries.py --user-id 42
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+# Add the parent directory to the path so we can import app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import SessionLocal
+from app.db.models.user import User
+from app.services.insights import rebuild_user_summary
+from app.services.versions import bump_data_version
+from app.services.insight_cache import insight_cache
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user-id", type=int, help="only rebuild this user's summary")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.user_id is not None:
+            user_ids = [args.user_id]
+        else:
+            user_ids = [user_id for (user_id,) in db.query(User.id).order_by(User.id)]
+
+        for user_id in user_ids:
+            rebuild_user_summary(db, user_id)
+            # A corrected summary must not be served from ETags or a shared cache
+            bump_data_version(db, user_id)
+            db.commit()
+            asyncio.run(insight_cache.invalidate_user(user_id))
+        print(f"Rebuilt {len(user_ids)} user summaries")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()